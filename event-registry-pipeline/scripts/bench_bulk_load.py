@@ -0,0 +1,100 @@
+"""Benchmark for loading events_raw/events_rejected with COPY vs INSERT.
+
+Usage (from the project root, against a scratch database):
+
+    python scripts/bench_bulk_load.py --events 20000 --repeat 3
+
+Every round creates a pipeline run, writes the same synthetic events (a
+quarter of them rejected) with each ``INGESTION_BULK_LOAD`` mode and rolls
+the transaction back, so the database is left unchanged apart from consumed
+sequence values.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from erp.db.client import get_connection
+from erp.ingestion.upsert import BULK_LOAD_MODES, write_raw, write_rejected
+from erp.models import RawEvent, RejectDecision
+
+
+def _events(count: int, seed: int) -> List[RawEvent]:
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    events = []
+    for seq in range(1, count + 1):
+        payload = {
+            "service_request_id": f"{seq}-2026",
+            "requested_datetime": (start + timedelta(minutes=seq)).isoformat(),
+            "lat": 50.9 + rng.uniform(-0.05, 0.05),
+            "long": 6.95 + rng.uniform(-0.05, 0.05),
+            "service_name": "Wilder Müll",
+            "title": "Meldung",
+            "description": f"Glasscherben auf dem Radweg Nr. {rng.randint(1, count)}",
+            "address_string": "50667 Köln",
+            "status": "open",
+            "media_url": f"https://example.com/files/2026-01/{seq}.jpg",
+        }
+        events.append(RawEvent.model_validate({**payload, "payload": payload}))
+    return events
+
+
+def _load(events: List[RawEvent], rejects: List[RejectDecision], bulk_load: str) -> float:
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "insert into pipeline_runs (status) values ('running') returning run_id"
+            )
+            run_id = cursor.fetchone()[0]
+            started = time.perf_counter()
+            raw = write_raw(run_id, events, cursor=cursor, bulk_load=bulk_load)
+            write_rejected(
+                run_id,
+                rejects,
+                raw_id_by_srid=raw.raw_id_by_srid,
+                raw_id_by_event_id=raw.raw_id_by_event_id,
+                cursor=cursor,
+                bulk_load=bulk_load,
+            )
+            elapsed = time.perf_counter() - started
+        conn.rollback()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1311)
+    args = parser.parse_args()
+
+    events = _events(args.events, args.seed)
+    rejects = [
+        RejectDecision(
+            raw_event=event, reason="duplicate_strict", details={"duplicate_of": "1-2026"}
+        )
+        for event in events[::4]
+    ]
+
+    best: dict[str, float] = {}
+    for _ in range(args.repeat):
+        for bulk_load in BULK_LOAD_MODES:
+            elapsed = _load(events, rejects, bulk_load)
+            best[bulk_load] = min(best.get(bulk_load, float("inf")), elapsed)
+
+    rows = len(events) + len(rejects)
+    for bulk_load, elapsed in best.items():
+        print(
+            f"{bulk_load:<8} {rows / elapsed:>12,.0f} rows/s  "
+            f"({elapsed * 1000:.1f} ms best of {args.repeat})"
+        )
+    print(f"{'speedup':<8} {best['insert'] / best['copy']:>12.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Microbenchmark for quality-gate text normalization and gate throughput.
+
+Usage (from the project root, no database needed):
+
+    python scripts/bench_quality_gate.py --events 20000 --repeat 5
+
+Compares the previous per-check normalization (three URL/whitespace passes
+with uncompiled ``re.sub`` patterns) with a single ``NormalizedText`` pass,
+then reports end-to-end ``QualityGate.evaluate_batch`` events/sec.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List
+
+from erp.ingestion.quality_gate import QualityGate, load_category_map
+from erp.models import RawEvent
+from erp.utils.text import SPAM_TERMS, NormalizedText
+
+
+_PHRASES = [
+    "Glasscherben auf dem Radweg",
+    "Ampel defekt",
+    "Müll am Straßenrand",
+    "Schlagloch   in der Fahrbahn, bitte reparieren",
+    "Fahrrad seit Wochen abgestellt https://example.com/foto.jpg",
+    "www.example.com/bild",
+    "test",
+]
+
+
+def _legacy_text(description: str, min_chars: int = 3) -> tuple[bool, bool, str]:
+    """The pre-NormalizedText path: link-only, spam and duplicate-key normalization."""
+
+    def normalize(text: str) -> str:
+        return re.sub(r"\s+", " ", re.sub(r"https?://\S+|www\.\S+", "", text)).strip()
+
+    cleaned = re.sub(r"[^\w\s]", "", normalize(description))
+    link_only = len(cleaned) < min_chars
+    spam = normalize(description).lower() in SPAM_TERMS
+    key = normalize(description).lower()
+    return link_only, spam, key
+
+
+def _new_text(description: str, min_chars: int = 3) -> tuple[bool, bool, str]:
+    text = NormalizedText.from_text(description, link_only_min_chars=min_chars)
+    return text.link_only, text.spam, text.dedupe
+
+
+def _events(count: int, seed: int) -> List[RawEvent]:
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    events = []
+    for seq in range(1, count + 1):
+        description = f"{rng.choice(_PHRASES)} Nr. {rng.randint(1, count // 4 or 1)}"
+        payload = {
+            "service_request_id": f"{seq}-2026",
+            "requested_datetime": (start + timedelta(minutes=seq)).isoformat(),
+            "lat": 50.9 + rng.uniform(-0.05, 0.05),
+            "long": 6.95 + rng.uniform(-0.05, 0.05),
+            "service_name": "Wilder Müll",
+            "title": "Meldung",
+            "description": description,
+            "address_string": "50667 Köln",
+            "status": "open",
+        }
+        events.append(RawEvent.model_validate({**payload, "payload": payload}))
+    return events
+
+
+def _best_rate(label: str, count: int, repeat: int, body: Callable[[], object]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body()
+        best = min(best, time.perf_counter() - started)
+    rate = count / best if best > 0 else 0.0
+    print(f"{label:<32} {rate:>12,.0f} events/s  ({best * 1000:.1f} ms best of {repeat})")
+    return rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1311)
+    args = parser.parse_args()
+
+    events = _events(args.events, args.seed)
+    descriptions = [event.description or "" for event in events]
+    assert [_legacy_text(d) for d in descriptions] == [_new_text(d) for d in descriptions]
+
+    legacy = _best_rate(
+        "text: legacy three-pass",
+        len(descriptions),
+        args.repeat,
+        lambda: [_legacy_text(d) for d in descriptions],
+    )
+    single = _best_rate(
+        "text: NormalizedText",
+        len(descriptions),
+        args.repeat,
+        lambda: [_new_text(d) for d in descriptions],
+    )
+    print(f"{'text speedup':<32} {single / legacy:>12.2f}x")
+
+    category_map = load_category_map()
+    _best_rate(
+        "gate: evaluate_batch",
+        len(events),
+        args.repeat,
+        lambda: QualityGate(category_map=category_map).evaluate_batch(events),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,8 @@ create table if not exists public.pipeline_runs (
   staged_count int not null default 0,
   inserted_count int not null default 0,
   updated_count int not null default 0,
+  unchanged_count int not null default 0,
+  skipped_unchanged_count int not null default 0,
   rejected_count int not null default 0,
   phase1_enqueued int not null default 0,
   phase2_enqueued int not null default 0,
@@ -23,6 +25,8 @@ create table if not exists public.pipeline_runs (
   last_accepted_service_request_id varchar(20),
   min_accepted_requested_at timestamptz,
   max_accepted_requested_at timestamptz,
+  missing_cache_hit_count int not null default 0,
+  missing_cache_miss_count int not null default 0,
   error_json jsonb
 );
 
@@ -97,6 +101,9 @@ create table if not exists public.events (
   is_flagged_abuse boolean not null default false,
   skip_llm boolean not null default false,
 
+  dedupe_key varchar(64),
+  near_duplicate_of varchar(20),
+
   constraint valid_coordinates check (
     lat >= -90 and lat <= 90 and lon >= -180 and lon <= 180
   )
@@ -107,10 +114,64 @@ create index if not exists idx_events_status on public.events(status);
 create index if not exists idx_events_year on public.events(year);
 create index if not exists idx_events_category on public.events(category);
 create index if not exists idx_events_subcategory on public.events(subcategory);
+create index if not exists idx_events_dedupe_key_requested_at
+  on public.events(dedupe_key, requested_at)
+  where dedupe_key is not null;
 create index if not exists idx_events_location on public.events using gist (
   ll_to_earth(lat::double precision, lon::double precision)
 );
 
+create table if not exists public.event_minhash (
+  service_request_id varchar(20) primary key
+    references public.events(service_request_id) on delete cascade,
+  requested_at timestamptz not null,
+  signature bigint[] not null,
+  band_hashes bigint[] not null,
+  created_at timestamptz not null default now(),
+  updated_at timestamptz not null default now()
+);
+
+create index if not exists idx_event_minhash_band_hashes
+  on public.event_minhash using gin (band_hashes);
+create index if not exists idx_event_minhash_requested_at
+  on public.event_minhash(requested_at);
+
+create table if not exists public.missing_service_request_ids (
+  service_request_id varchar(20) primary key,
+  year smallint not null,
+  sequence_number integer not null,
+  first_seen_at timestamptz not null default now(),
+  last_probed_at timestamptz not null default now(),
+  probe_count int not null default 1,
+  next_probe_at timestamptz not null
+);
+
+create index if not exists idx_missing_srid_next_probe_at
+  on public.missing_service_request_ids(next_probe_at);
+
+create table if not exists public.backfill_chunks (
+  year smallint not null,
+  chunk_start integer not null,
+  chunk_end integer not null,
+  run_id bigint references public.pipeline_runs(run_id),
+  completed_at timestamptz not null default now(),
+  requested_count int not null default 0,
+  fetched_count int not null default 0,
+  missing_count int not null default 0,
+  accepted_count int not null default 0,
+  rejected_count int not null default 0,
+  duration_ms int,
+  primary key (year, chunk_start, chunk_end)
+);
+
+create table if not exists public.event_payload_hashes (
+  service_request_id varchar(20) primary key,
+  payload_hash char(64) not null,
+  gate_fingerprint char(64),
+  run_id bigint references public.pipeline_runs(run_id),
+  updated_at timestamptz not null default now()
+);
+
 create table if not exists public.event_phase1_labels (
   label_id bigserial primary key,
   service_request_id varchar(20) not null references public.events(service_request_id),
@@ -129,6 +190,8 @@ create table if not exists public.event_phase1_labels (
 );
 
 create index if not exists idx_p1_latest on public.event_phase1_labels(service_request_id, created_at desc);
+create index if not exists idx_p1_cache
+  on public.event_phase1_labels(input_hash, prompt_version, model);
 
 create table if not exists public.event_phase2_labels (
   label_id bigserial primary key,
@@ -148,6 +211,8 @@ create table if not exists public.event_phase2_labels (
 );
 
 create index if not exists idx_p2_latest on public.event_phase2_labels(service_request_id, created_at desc);
+create index if not exists idx_p2_cache
+  on public.event_phase2_labels(input_hash, prompt_version, model);
 
 create table if not exists public.labeling_runs (
   label_run_id bigserial primary key,
@@ -166,6 +231,11 @@ create table if not exists public.labeling_runs (
   inserted_count int not null default 0,
   skipped_count int not null default 0,
   failed_count int not null default 0,
+  cache_hit_count int not null default 0,
+  cache_miss_count int not null default 0,
+  prompt_token_count bigint not null default 0,
+  output_token_count bigint not null default 0,
+  tokens_per_event numeric(10,1),
 
   first_labeled_service_request_id varchar(20),
   last_labeled_service_request_id varchar(20),
@@ -182,6 +252,35 @@ create index if not exists idx_labeling_runs_status_started_at
 create index if not exists idx_labeling_runs_phase_prompt_started_at
   on public.labeling_runs(phase, prompt_version, started_at desc);
 
+create table if not exists public.labeling_batch_jobs (
+  batch_job_id bigserial primary key,
+  phase text not null check (phase in ('phase1','phase2')),
+  label_run_id bigint not null references public.labeling_runs(label_run_id),
+  model text not null,
+  prompt_version text not null,
+  status text not null default 'prepared'
+    check (status in ('prepared','submitted','completed','ingested','failed')),
+  created_at timestamptz not null default now(),
+  submitted_at timestamptz,
+  completed_at timestamptz,
+  ingested_at timestamptz,
+
+  request_count int not null,
+  request_file text not null,
+  input_file text,
+  batch_name text,
+  provider_state text,
+  result_file text,
+
+  inserted_count int not null default 0,
+  skipped_count int not null default 0,
+  failed_count int not null default 0,
+  error_json jsonb
+);
+
+create index if not exists idx_labeling_batch_jobs_status
+  on public.labeling_batch_jobs(status, batch_job_id);
+
 create or replace view public.v_bike_events as
 with
 p1 as (
@@ -0,0 +1,19 @@
+-- Migration 009: Negative cache of service_request_ids that returned 404
+-- Gap-fill skips IDs whose next re-probe is not due yet (exponential backoff).
+
+create table if not exists public.missing_service_request_ids (
+  service_request_id varchar(20) primary key,
+  year smallint not null,
+  sequence_number integer not null,
+  first_seen_at timestamptz not null default now(),
+  last_probed_at timestamptz not null default now(),
+  probe_count int not null default 1,
+  next_probe_at timestamptz not null
+);
+
+create index if not exists idx_missing_srid_next_probe_at
+  on public.missing_service_request_ids(next_probe_at);
+
+alter table public.pipeline_runs
+  add column if not exists missing_cache_hit_count int not null default 0,
+  add column if not exists missing_cache_miss_count int not null default 0;
@@ -0,0 +1,17 @@
+-- Migration 010: Checkpoints for the resumable ID-range backfill
+-- One row per completed (year, chunk_start, chunk_end) range; re-runs skip them.
+
+create table if not exists public.backfill_chunks (
+  year smallint not null,
+  chunk_start integer not null,
+  chunk_end integer not null,
+  run_id bigint references public.pipeline_runs(run_id),
+  completed_at timestamptz not null default now(),
+  requested_count int not null default 0,
+  fetched_count int not null default 0,
+  missing_count int not null default 0,
+  accepted_count int not null default 0,
+  rejected_count int not null default 0,
+  duration_ms int,
+  primary key (year, chunk_start, chunk_end)
+);
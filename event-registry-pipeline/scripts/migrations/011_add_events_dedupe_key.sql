@@ -0,0 +1,23 @@
+-- Migration 011: Persisted strict-duplicate key on events
+-- dedupe_key = sha256(normalized description || chr(31) || round(lat, 4) || chr(31) || round(lon, 4)),
+-- computed in Python by erp.utils.hashing.dedupe_key. The backfill below mirrors
+-- normalize_for_dedupe(); rows whose text only differs under Unicode whitespace or
+-- case rules are corrected the next time the event is re-fetched.
+
+alter table public.events
+  add column if not exists dedupe_key varchar(64);
+
+update public.events
+set dedupe_key = encode(sha256(convert_to(
+  lower(btrim(regexp_replace(
+    regexp_replace(coalesce(description, ''), 'https?://\S+|www\.\S+', '', 'g'),
+    '\s+', ' ', 'g'
+  )))
+  || chr(31) || round(lat, 4)::text
+  || chr(31) || round(lon, 4)::text,
+  'UTF8')), 'hex')
+where has_description and dedupe_key is null;
+
+create index if not exists idx_events_dedupe_key_requested_at
+  on public.events(dedupe_key, requested_at)
+  where dedupe_key is not null;
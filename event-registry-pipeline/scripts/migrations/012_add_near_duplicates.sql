@@ -0,0 +1,23 @@
+-- Migration 012: MinHash/LSH near-duplicate detection
+-- event_minhash holds one MinHash signature per described event plus its LSH band
+-- hashes (computed in Python by erp.ingestion.near_duplicate). Events that share a
+-- band hash are candidate pairs; the GIN index serves `band_hashes @> array[...]`.
+-- Rows are written on the next ingestion of each event; no SQL backfill.
+
+alter table public.events
+  add column if not exists near_duplicate_of varchar(20);
+
+create table if not exists public.event_minhash (
+  service_request_id varchar(20) primary key
+    references public.events(service_request_id) on delete cascade,
+  requested_at timestamptz not null,
+  signature bigint[] not null,
+  band_hashes bigint[] not null,
+  created_at timestamptz not null default now(),
+  updated_at timestamptz not null default now()
+);
+
+create index if not exists idx_event_minhash_band_hashes
+  on public.event_minhash using gin (band_hashes);
+create index if not exists idx_event_minhash_requested_at
+  on public.event_minhash(requested_at);
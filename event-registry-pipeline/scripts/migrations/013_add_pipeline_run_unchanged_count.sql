@@ -0,0 +1,6 @@
+-- Migration 013: count canonical events a run saw unchanged
+-- With INGESTION_UPSERT_MODE=merge, events whose columns all match the stored row
+-- are not rewritten; they are counted here instead of in updated_count.
+
+alter table public.pipeline_runs
+  add column if not exists unchanged_count int not null default 0;
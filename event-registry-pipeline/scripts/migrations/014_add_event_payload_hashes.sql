@@ -0,0 +1,11 @@
+-- Migration 014: Payload hashes for change capture
+-- One row per service_request_id with the SHA-256 of the last processed payload.
+-- Fetched events whose payload hash matches are skipped before raw staging,
+-- gating and upsert, and counted in pipeline_runs.unchanged_count.
+
+create table if not exists public.event_payload_hashes (
+  service_request_id varchar(20) primary key,
+  payload_hash char(64) not null,
+  run_id bigint references public.pipeline_runs(run_id),
+  updated_at timestamptz not null default now()
+);
@@ -0,0 +1,13 @@
+-- Migration 015: Cross-run label cache lookups
+-- Labeling reuses a stored label with the same (prompt_version, model, input_hash)
+-- instead of calling the LLM; these indexes serve that lookup and labeling_runs
+-- records how often it hit.
+
+create index if not exists idx_p1_cache
+  on public.event_phase1_labels(input_hash, prompt_version, model);
+create index if not exists idx_p2_cache
+  on public.event_phase2_labels(input_hash, prompt_version, model);
+
+alter table public.labeling_runs
+  add column if not exists cache_hit_count int not null default 0,
+  add column if not exists cache_miss_count int not null default 0;
@@ -0,0 +1,9 @@
+-- Migration 016: Token usage per labeling run
+-- Gemini reports billed tokens per request (usageMetadata); labeling_runs
+-- records the run's totals and the tokens per event sent to the LLM, which is
+-- what packing several events into one request reduces.
+
+alter table public.labeling_runs
+  add column if not exists prompt_token_count bigint not null default 0,
+  add column if not exists output_token_count bigint not null default 0,
+  add column if not exists tokens_per_event numeric(10,1);
@@ -0,0 +1,33 @@
+-- Migration 017: Offline labeling through the Gemini Batch API
+-- One row per batch job. Every step (request file written, file uploaded,
+-- batch created, batch finished, results ingested) is recorded before the
+-- next one starts, so submission and ingestion resume after a crash.
+
+create table if not exists public.labeling_batch_jobs (
+  batch_job_id bigserial primary key,
+  phase text not null check (phase in ('phase1','phase2')),
+  label_run_id bigint not null references public.labeling_runs(label_run_id),
+  model text not null,
+  prompt_version text not null,
+  status text not null default 'prepared'
+    check (status in ('prepared','submitted','completed','ingested','failed')),
+  created_at timestamptz not null default now(),
+  submitted_at timestamptz,
+  completed_at timestamptz,
+  ingested_at timestamptz,
+
+  request_count int not null,
+  request_file text not null,
+  input_file text,
+  batch_name text,
+  provider_state text,
+  result_file text,
+
+  inserted_count int not null default 0,
+  skipped_count int not null default 0,
+  failed_count int not null default 0,
+  error_json jsonb
+);
+
+create index if not exists idx_labeling_batch_jobs_status
+  on public.labeling_batch_jobs(status, batch_job_id);
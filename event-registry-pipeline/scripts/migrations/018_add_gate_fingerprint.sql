@@ -0,0 +1,8 @@
+-- Migration 018: Gate fingerprint for change capture
+-- A stored payload hash only skips an event if it was gated by the same
+-- quality gate: the fingerprint covers the category map, the gate settings and
+-- GATE_VERSION. Rows written before this migration have no fingerprint and are
+-- gated once more.
+
+alter table public.event_payload_hashes
+  add column if not exists gate_fingerprint char(64);
@@ -0,0 +1,7 @@
+-- Migration 019: count events change capture skipped before staging
+-- With INGESTION_SKIP_UNCHANGED, events re-fetched with the payload hash and gate
+-- fingerprint they were last processed with are dropped before staging and gating.
+-- They are counted here, separately from unchanged_count (rows the merge upsert left as-is).
+
+alter table public.pipeline_runs
+  add column if not exists skipped_unchanged_count int not null default 0;
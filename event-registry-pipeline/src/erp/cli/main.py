@@ -9,8 +9,10 @@ import typer
 
 from erp.config import Settings
 from erp.db.client import db_cursor
-from erp.ingestion.runner import run_ingestion
+from erp.ingestion.backfill import run_backfill
+from erp.ingestion.runner import run_ingestion, run_repair
 from erp.utils.time import parse_requested_at
+from erp.labeling.batch import resume_jobs, submit_job
 from erp.labeling.phase1.runner import run as run_phase1
 from erp.labeling.phase2.runner import run as run_phase2
 from erp.utils.logging import configure_logging, get_logger
@@ -20,11 +22,13 @@ app = typer.Typer(help="Event Registry Pipeline CLI")
 ingest_app = typer.Typer(help="Ingestion commands")
 phase1_app = typer.Typer(help="Phase 1 labeling commands")
 phase2_app = typer.Typer(help="Phase 2 labeling commands")
+batch_app = typer.Typer(help="Offline batch labeling (Gemini Batch API)")
 db_app = typer.Typer(help="Database utilities")
 
 app.add_typer(ingest_app, name="ingest")
 app.add_typer(phase1_app, name="phase1")
 app.add_typer(phase2_app, name="phase2")
+app.add_typer(batch_app, name="batch")
 app.add_typer(db_app, name="db")
 
 logger = get_logger(__name__)
@@ -46,6 +50,16 @@ def ingest_run(
         None, help="Max gap-fill IDs to fetch (overrides env)"
     ),
     no_gap_fill: bool = typer.Option(False, help="Disable gap-fill for this run"),
+    shard_hours: Optional[int] = typer.Option(
+        None, help="Fetch the window as concurrent shards of this many hours"
+    ),
+    gap_fill_mode: Optional[str] = typer.Option(
+        None, help="Gap-fill mode: window or frontier (overrides env)"
+    ),
+    stream: bool = typer.Option(False, help="Write the window in micro-batches as it is fetched"),
+    gate_workers: Optional[int] = typer.Option(
+        None, help="Processes for the quality gate (default from INGESTION_GATE_WORKERS)"
+    ),
 ) -> None:
     """Run ingestion for a date window."""
     run_ingestion(
@@ -54,6 +68,10 @@ def ingest_run(
         dry_run=dry_run,
         gap_fill_limit=gap_fill_limit,
         enable_gap_fill=not no_gap_fill,
+        shard_hours=shard_hours,
+        gap_fill_mode=gap_fill_mode,
+        stream=stream,
+        gate_workers=gate_workers,
     )
 
 
@@ -67,6 +85,10 @@ def ingest_auto(
     gap_fill_limit: Optional[int] = typer.Option(
         None, help="Max gap-fill IDs to fetch (overrides env)"
     ),
+    gap_fill_mode: Optional[str] = typer.Option(
+        None, help="Gap-fill mode: window or frontier (overrides env)"
+    ),
+    stream: bool = typer.Option(False, help="Write the window in micro-batches as it is fetched"),
 ) -> None:
     """Run ingestion using a DB-derived window (for cron)."""
     settings = Settings()
@@ -108,6 +130,8 @@ def ingest_auto(
         dry_run=dry_run,
         gap_fill_limit=gap_fill_limit,
         enable_gap_fill=not no_gap_fill,
+        gap_fill_mode=gap_fill_mode,
+        stream=stream,
     )
 
 
@@ -115,12 +139,58 @@ def ingest_auto(
 def ingest_backfill(
     year: int = typer.Option(..., help="Year to backfill"),
     dry_run: bool = typer.Option(False, help="Do not write to DB"),
+    chunk_size: Optional[int] = typer.Option(
+        None, help="IDs per checkpointed chunk (default from BACKFILL_CHUNK_SIZE)"
+    ),
+    workers: Optional[int] = typer.Option(
+        None, help="Chunks fetched concurrently (default from BACKFILL_WORKERS)"
+    ),
+    max_sequence: Optional[int] = typer.Option(
+        None, help="Highest sequence number to fetch (default: probe the frontier)"
+    ),
+    restart: bool = typer.Option(False, help="Forget existing checkpoints for the year"),
+    by_date: bool = typer.Option(False, help="Fetch day shards by date instead of ID range"),
+    shard_hours: Optional[int] = typer.Option(
+        None, help="Shard size in hours for --by-date (default from OPEN311_SHARD_HOURS)"
+    ),
+    gate_workers: Optional[int] = typer.Option(
+        None, help="Processes for the quality gate (default from INGESTION_GATE_WORKERS)"
+    ),
+) -> None:
+    """Backfill a full year as resumable, checkpointed ID-range chunks."""
+    if by_date:
+        settings = Settings()
+        start = date(year, 1, 1).isoformat()
+        end = date(year + 1, 1, 1).isoformat()
+        logger.info("backfill.start", extra={"year": year})
+        run_ingestion(
+            since=start,
+            until=end,
+            dry_run=dry_run,
+            shard_hours=shard_hours or settings.open311_shard_hours,
+            gate_workers=gate_workers,
+        )
+        return
+
+    run_backfill(
+        year=year,
+        dry_run=dry_run,
+        chunk_size=chunk_size,
+        workers=workers,
+        max_sequence=max_sequence,
+        restart=restart,
+        gate_workers=gate_workers,
+    )
+
+
+@ingest_app.command("repair")
+def ingest_repair(
+    year: int = typer.Option(..., help="Year whose sequence holes should be fetched"),
+    dry_run: bool = typer.Option(False, help="Do not write to DB"),
+    limit: Optional[int] = typer.Option(None, help="Max hole IDs to fetch"),
 ) -> None:
-    """Backfill a full year using ID-based fetches (skeleton)."""
-    start = date(year, 1, 1).isoformat()
-    end = date(year, 12, 31).isoformat()
-    logger.info("backfill.start", extra={"year": year})
-    run_ingestion(since=start, until=end, dry_run=dry_run)
+    """Fetch only missing sequence numbers below the known frontier of a year."""
+    run_repair(year=year, dry_run=dry_run, limit=limit)
 
 
 @phase1_app.command("run")
@@ -131,9 +201,22 @@ def phase1_run(
         None, help="Prompt version (default from PHASE1_PROMPT_VERSION)"
     ),
     model_id: Optional[str] = typer.Option(None, help="Model ID (default from GEMINI_MODEL_ID)"),
+    concurrency: Optional[int] = typer.Option(
+        None, help="LLM requests in flight (default from LABELING_CONCURRENCY)"
+    ),
+    pack_size: Optional[int] = typer.Option(
+        None, help="Events per LLM request (default from LABELING_PACK_SIZE)"
+    ),
 ) -> None:
     """Run Phase 1 bike-related labeling."""
-    run_phase1(limit=limit, dry_run=dry_run, prompt_version=prompt_version, model_id=model_id)
+    run_phase1(
+        limit=limit,
+        dry_run=dry_run,
+        prompt_version=prompt_version,
+        model_id=model_id,
+        concurrency=concurrency,
+        pack_size=pack_size,
+    )
 
 
 @phase2_app.command("run")
@@ -144,9 +227,63 @@ def phase2_run(
         None, help="Prompt version (default from PHASE2_PROMPT_VERSION)"
     ),
     model_id: Optional[str] = typer.Option(None, help="Model ID (default from GEMINI_MODEL_ID)"),
+    concurrency: Optional[int] = typer.Option(
+        None, help="LLM requests in flight (default from LABELING_CONCURRENCY)"
+    ),
+    pack_size: Optional[int] = typer.Option(
+        None, help="Events per LLM request (default from LABELING_PACK_SIZE)"
+    ),
 ) -> None:
     """Run Phase 2 issue categorization."""
-    run_phase2(limit=limit, dry_run=dry_run, prompt_version=prompt_version, model_id=model_id)
+    run_phase2(
+        limit=limit,
+        dry_run=dry_run,
+        prompt_version=prompt_version,
+        model_id=model_id,
+        concurrency=concurrency,
+        pack_size=pack_size,
+    )
+
+
+@batch_app.command("submit")
+def batch_submit(
+    phase: str = typer.Option(..., help="phase1 or phase2"),
+    limit: Optional[int] = typer.Option(None, help="Max events to label"),
+    prompt_version: Optional[str] = typer.Option(
+        None, help="Prompt version (default from PHASE1_/PHASE2_PROMPT_VERSION)"
+    ),
+    model_id: Optional[str] = typer.Option(None, help="Model ID (default from GEMINI_MODEL_ID)"),
+    relabel: bool = typer.Option(
+        False, help="Also select events labeled by other prompt versions"
+    ),
+) -> None:
+    """Write a batch request file for the phase's events and submit it."""
+    if phase not in ("phase1", "phase2"):
+        raise typer.BadParameter("phase must be phase1 or phase2")
+    batch_job_id = submit_job(
+        phase,
+        limit=limit,
+        prompt_version=prompt_version,
+        model_id=model_id,
+        relabel=relabel,
+    )
+    if batch_job_id is None:
+        typer.echo("Nothing to label.")
+    else:
+        typer.echo(f"Submitted batch job {batch_job_id}.")
+
+
+@batch_app.command("resume")
+def batch_resume(
+    job_id: Optional[int] = typer.Option(None, help="Only this batch job (default: all open)"),
+    wait: bool = typer.Option(False, help="Poll until the jobs are ingested or failed"),
+) -> None:
+    """Submit, poll and ingest open batch jobs as far as possible."""
+    statuses = resume_jobs(batch_job_id=job_id, wait=wait)
+    if not statuses:
+        typer.echo("No open batch jobs.")
+    for batch_job_id, status in statuses.items():
+        typer.echo(f"Batch job {batch_job_id}: {status}")
 
 
 @db_app.command("check")
@@ -22,6 +22,12 @@ class Settings(BaseSettings):
     pguser: Optional[str] = Field(default=None, alias="PGUSER")
     pgpassword: Optional[str] = Field(default=None, alias="PGPASSWORD")
     pgdatabase: Optional[str] = Field(default=None, alias="PGDATABASE")
+    db_pool_enabled: bool = Field(default=True, alias="DB_POOL_ENABLED")
+    db_pool_min_size: int = Field(default=1, alias="DB_POOL_MIN_SIZE")
+    db_pool_max_size: int = Field(default=8, alias="DB_POOL_MAX_SIZE")
+    db_pool_timeout_seconds: float = Field(default=30.0, alias="DB_POOL_TIMEOUT_SECONDS")
+    db_pool_max_idle_seconds: float = Field(default=300.0, alias="DB_POOL_MAX_IDLE_SECONDS")
+    db_prepare_threshold: int = Field(default=5, alias="DB_PREPARE_THRESHOLD")
 
     # Supabase
     supabase_url: Optional[str] = Field(default=None, alias="SUPABASE_URL")
@@ -40,17 +46,55 @@ class Settings(BaseSettings):
     open311_use_extensions: bool = Field(default=True, alias="OPEN311_USE_EXTENSIONS")
     open311_max_workers: int = Field(default=10, alias="OPEN311_MAX_WORKERS")
     open311_max_retries: int = Field(default=3, alias="OPEN311_MAX_RETRIES")
+    open311_prefetch_pages: int = Field(default=4, alias="OPEN311_PREFETCH_PAGES")
+    open311_max_connections: int = Field(default=10, alias="OPEN311_MAX_CONNECTIONS")
+    open311_gap_fill_batch_size: int = Field(default=50, alias="OPEN311_GAP_FILL_BATCH_SIZE")
+    open311_shard_hours: int = Field(default=24, alias="OPEN311_SHARD_HOURS")
+    open311_shard_max_pages: int = Field(default=10, alias="OPEN311_SHARD_MAX_PAGES")
+    open311_shard_min_hours: int = Field(default=1, alias="OPEN311_SHARD_MIN_HOURS")
+
+    # Backfill
+    backfill_chunk_size: int = Field(default=500, alias="BACKFILL_CHUNK_SIZE")
+    backfill_workers: int = Field(default=4, alias="BACKFILL_WORKERS")
 
     # Ingestion
     ingestion_overlap_hours: int = Field(default=12, alias="INGESTION_OVERLAP_HOURS")
     ingestion_enable_gap_fill: bool = Field(default=True, alias="INGESTION_ENABLE_GAP_FILL")
     ingestion_gap_fill_limit: int = Field(default=5000, alias="INGESTION_GAP_FILL_LIMIT")
+    ingestion_gap_fill_mode: str = Field(default="window", alias="INGESTION_GAP_FILL_MODE")
+    ingestion_frontier_probe_width: int = Field(
+        default=20, alias="INGESTION_FRONTIER_PROBE_WIDTH"
+    )
+    ingestion_missing_reprobe_hours: int = Field(
+        default=6, alias="INGESTION_MISSING_REPROBE_HOURS"
+    )
+    ingestion_missing_reprobe_max_hours: int = Field(
+        default=720, alias="INGESTION_MISSING_REPROBE_MAX_HOURS"
+    )
+    ingestion_stream_batch_size: int = Field(default=500, alias="INGESTION_STREAM_BATCH_SIZE")
+    ingestion_stream_queue_batches: int = Field(
+        default=4, alias="INGESTION_STREAM_QUEUE_BATCHES"
+    )
+    ingestion_gate_workers: int = Field(default=1, alias="INGESTION_GATE_WORKERS")
+    ingestion_bulk_load: str = Field(default="copy", alias="INGESTION_BULK_LOAD")
+    ingestion_upsert_mode: str = Field(default="merge", alias="INGESTION_UPSERT_MODE")
+    ingestion_skip_unchanged: bool = Field(default=True, alias="INGESTION_SKIP_UNCHANGED")
     duplicate_window_hours: int = Field(default=24, alias="DUPLICATE_WINDOW_HOURS")
     duplicate_coord_precision: int = Field(default=4, alias="DUPLICATE_COORD_PRECISION")
+    duplicate_radius_meters: float = Field(default=0.0, alias="DUPLICATE_RADIUS_METERS")
     duplicate_require_service_name: bool = Field(
         default=True, alias="DUPLICATE_REQUIRE_SERVICE_NAME"
     )
     duplicate_require_address: bool = Field(default=False, alias="DUPLICATE_REQUIRE_ADDRESS")
+    near_duplicate_enabled: bool = Field(default=False, alias="NEAR_DUPLICATE_ENABLED")
+    near_duplicate_threshold: float = Field(default=0.8, alias="NEAR_DUPLICATE_THRESHOLD")
+    near_duplicate_num_perm: int = Field(default=64, alias="NEAR_DUPLICATE_NUM_PERM")
+    near_duplicate_bands: int = Field(default=16, alias="NEAR_DUPLICATE_BANDS")
+    near_duplicate_window_hours: int = Field(default=72, alias="NEAR_DUPLICATE_WINDOW_HOURS")
+    near_duplicate_max_distance_meters: float = Field(
+        default=100.0, alias="NEAR_DUPLICATE_MAX_DISTANCE_METERS"
+    )
+    near_duplicate_reuse_labels: bool = Field(default=True, alias="NEAR_DUPLICATE_REUSE_LABELS")
     link_only_min_chars: int = Field(default=3, alias="LINK_ONLY_MIN_CHARS")
 
     # LLM providers
@@ -64,6 +108,14 @@ class Settings(BaseSettings):
     gemini_max_output_tokens: int = Field(default=512, alias="GEMINI_MAX_OUTPUT_TOKENS")
     labeling_sleep_seconds: float = Field(default=0.1, alias="LABELING_SLEEP_SECONDS")
     labeling_max_retries: int = Field(default=2, alias="LABELING_MAX_RETRIES")
+    labeling_concurrency: int = Field(default=4, alias="LABELING_CONCURRENCY")
+    labeling_flush_rows: int = Field(default=50, alias="LABELING_FLUSH_ROWS")
+    labeling_flush_seconds: float = Field(default=5.0, alias="LABELING_FLUSH_SECONDS")
+    labeling_cache_enabled: bool = Field(default=True, alias="LABELING_CACHE_ENABLED")
+    labeling_cache_size: int = Field(default=10000, alias="LABELING_CACHE_SIZE")
+    labeling_pack_size: int = Field(default=1, alias="LABELING_PACK_SIZE")
+    labeling_batch_dir: str = Field(default="runs/batch", alias="LABELING_BATCH_DIR")
+    labeling_batch_poll_seconds: float = Field(default=60.0, alias="LABELING_BATCH_POLL_SECONDS")
     phase1_prompt_version: str = Field(default="p1_v006", alias="PHASE1_PROMPT_VERSION")
     phase2_prompt_version: str = Field(default="p2_v001", alias="PHASE2_PROMPT_VERSION")
     openai_api_key: Optional[str] = Field(default=None, alias="OPENAI_API_KEY")
@@ -1,5 +1,5 @@
 """Database helpers."""
 
-from erp.db.client import get_connection
+from erp.db.client import close_pools, get_connection, get_pool
 
-__all__ = ["get_connection"]
+__all__ = ["close_pools", "get_connection", "get_pool"]
@@ -1,22 +1,93 @@
 """Database connection helpers."""
 
+import atexit
+import os
+import threading
 from contextlib import contextmanager
-from typing import Iterator, Optional
+from typing import Any, Iterator, Optional
 
 import psycopg
+from psycopg_pool import ConnectionPool
 
 from erp.config import Settings
 
 
+_pools: dict[tuple[int, str], ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def connect_kwargs(settings: Settings) -> dict[str, Any]:
+    """Connection options shared by pooled and direct connections.
+
+    psycopg prepares a query server-side once it ran DB_PREPARE_THRESHOLD
+    times on a connection; a negative value disables prepared statements
+    (e.g. behind a transaction-mode PgBouncer).
+    """
+    threshold = settings.db_prepare_threshold
+    return {"prepare_threshold": threshold if threshold >= 0 else None}
+
+
 def get_connection(settings: Optional[Settings] = None) -> psycopg.Connection:
     """Create a new database connection."""
     settings = settings or Settings()
-    return psycopg.connect(settings.get_database_url())
+    return psycopg.connect(settings.get_database_url(), **connect_kwargs(settings))
+
+
+def get_pool(settings: Optional[Settings] = None) -> ConnectionPool:
+    """Return the process-wide pool for the configured database, opening it once.
+
+    Pools are per process (a forked child opens its own) and are closed at
+    exit. Borrowed connections are health-checked before use, and prepared
+    statements survive between borrows because connections are reused.
+    """
+    settings = settings or Settings()
+    conninfo = settings.get_database_url()
+    key = (os.getpid(), conninfo)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(
+                conninfo,
+                min_size=settings.db_pool_min_size,
+                max_size=max(settings.db_pool_min_size, settings.db_pool_max_size),
+                timeout=settings.db_pool_timeout_seconds,
+                max_idle=settings.db_pool_max_idle_seconds,
+                kwargs=connect_kwargs(settings),
+                check=ConnectionPool.check_connection,
+                name="erp",
+                open=True,
+            )
+            _pools[key] = pool
+    return pool
+
+
+def close_pools() -> None:
+    """Close every pool opened by this process."""
+    with _pools_lock:
+        pools = [pool for (pid, _), pool in _pools.items() if pid == os.getpid()]
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_pools)
 
 
 @contextmanager
 def db_cursor(settings: Optional[Settings] = None) -> Iterator[psycopg.Cursor]:
-    """Yield a cursor with automatic commit/rollback."""
+    """Yield a cursor with automatic commit/rollback.
+
+    The connection is borrowed from :func:`get_pool` unless DB_POOL_ENABLED
+    is false, in which case a new connection is opened and closed.
+    """
+    settings = settings or Settings()
+    if settings.db_pool_enabled:
+        # The pool commits on success and rolls back on error before taking it back.
+        with get_pool(settings).connection() as conn:
+            with conn.cursor() as cursor:
+                yield cursor
+        return
+
     conn = get_connection(settings)
     try:
         with conn.cursor() as cursor:
@@ -0,0 +1,346 @@
+"""Resumable ID-range backfill with per-chunk checkpoints."""
+
+from __future__ import annotations
+
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional
+
+from psycopg import Cursor
+
+from erp.config import Settings
+from erp.db.client import db_cursor
+from erp.ingestion.duplicate_checker import DatabaseDuplicateChecker
+from erp.ingestion.gap_fill import GapFillResult, create_client, fetch_ids, probe_frontier
+from erp.ingestion.missing_cache import filter_due, record_probes
+from erp.ingestion.quality_gate import QualityGate, gate_executor, load_category_map
+from erp.ingestion.run_log import (
+    RunCounters,
+    complete_run_failed,
+    complete_run_with_counters,
+    create_run,
+)
+from erp.ingestion.write import gate_events, skip_unchanged, write_decisions
+from erp.utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """Inclusive sequence range ``start..end`` of one year."""
+
+    year: int
+    start: int
+    end: int
+
+    def ids(self) -> List[str]:
+        return [f"{seq}-{self.year}" for seq in range(self.start, self.end + 1)]
+
+
+def plan_chunks(year: int, max_sequence: int, chunk_size: int) -> List[Chunk]:
+    """Split ``1..max_sequence`` into consecutive chunks of ``chunk_size`` IDs."""
+    size = max(1, chunk_size)
+    return [
+        Chunk(year, start, min(start + size - 1, max_sequence))
+        for start in range(1, max_sequence + 1, size)
+    ]
+
+
+def completed_chunks(cursor: Cursor, year: int) -> List[tuple[int, int]]:
+    """Checkpointed ``(start, end)`` ranges of ``year``, merged and sorted."""
+    cursor.execute(
+        "select chunk_start, chunk_end from public.backfill_chunks where year = %s",
+        (year,),
+    )
+    return merge_ranges((int(start), int(end)) for start, end in cursor.fetchall())
+
+
+def merge_ranges(ranges: Iterable[tuple[int, int]]) -> List[tuple[int, int]]:
+    """Merge inclusive ranges that overlap or touch into sorted disjoint ones."""
+    merged: List[tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def is_covered(chunk: Chunk, done: List[tuple[int, int]]) -> bool:
+    """True when ``chunk`` lies inside one of the merged ranges in ``done``.
+
+    Checkpoints are compared as ranges rather than exact boundaries, so a
+    backfill resumed with a different chunk size skips what is already done.
+    """
+    return any(start <= chunk.start and chunk.end <= end for start, end in done)
+
+
+def reset_chunks(cursor: Cursor, year: int) -> None:
+    cursor.execute("delete from public.backfill_chunks where year = %s", (year,))
+
+
+def record_chunk(
+    cursor: Cursor,
+    chunk: Chunk,
+    run_id: int,
+    requested: int,
+    result: GapFillResult,
+    accepted: int,
+    rejected: int,
+    duration_ms: int,
+) -> None:
+    cursor.execute(
+        "insert into public.backfill_chunks (year, chunk_start, chunk_end, run_id, "
+        "requested_count, fetched_count, missing_count, accepted_count, rejected_count, "
+        "duration_ms) values (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s) "
+        "on conflict (year, chunk_start, chunk_end) do update set "
+        "run_id = excluded.run_id, completed_at = now(), "
+        "requested_count = excluded.requested_count, fetched_count = excluded.fetched_count, "
+        "missing_count = excluded.missing_count, accepted_count = excluded.accepted_count, "
+        "rejected_count = excluded.rejected_count, duration_ms = excluded.duration_ms",
+        (
+            chunk.year,
+            chunk.start,
+            chunk.end,
+            run_id,
+            requested,
+            len(result.found),
+            len(result.missing),
+            accepted,
+            rejected,
+            duration_ms,
+        ),
+    )
+
+
+def run_backfill(
+    year: int,
+    dry_run: bool = False,
+    chunk_size: Optional[int] = None,
+    workers: Optional[int] = None,
+    max_sequence: Optional[int] = None,
+    restart: bool = False,
+    gate_workers: Optional[int] = None,
+) -> None:
+    """Backfill ``year`` by ID range, committing and checkpointing every chunk.
+
+    ``1..max_sequence`` (default: the probed sequence frontier) is split into
+    BACKFILL_CHUNK_SIZE chunks that a pool of BACKFILL_WORKERS fetches through
+    the batched gap-fill engine. Each fetched chunk is gated and written in its
+    own transaction together with its `backfill_chunks` checkpoint, so a killed
+    run resumes with the first unfinished chunk. Chunks with transient fetch
+    failures are written but not checkpointed, so they are retried next time.
+    With ``gate_workers`` (default INGESTION_GATE_WORKERS) > 1, chunks large
+    enough are gated on one process pool shared by the whole run.
+
+    A dry run does not touch the database: it ignores checkpoints and the
+    missing-ID cache, probes the frontier from scratch (unless
+    ``max_sequence`` is given) and only logs gate results.
+    """
+    settings = Settings()
+    chunk_size = chunk_size or settings.backfill_chunk_size
+    workers = max(1, workers or settings.backfill_workers)
+    gate_workers = max(1, gate_workers or settings.ingestion_gate_workers)
+    run_id_db: int | None = None
+    run_id_log = str(uuid.uuid4()) if dry_run else "pending"
+
+    done: List[tuple[int, int]] = []
+    last_sequence: int | None = None
+    if not dry_run:
+        with db_cursor(settings) as cursor:
+            if restart:
+                reset_chunks(cursor, year)
+            done = completed_chunks(cursor, year)
+            cursor.execute("select max(sequence_number) from events where year = %s", (year,))
+            row = cursor.fetchone()
+            last_sequence = row[0] if row else None
+
+    if max_sequence is None:
+        max_sequence, _ = probe_frontier(year, last_sequence, settings)
+    if not max_sequence:
+        logger.info("backfill.no_ids year=%s", year)
+        return
+
+    planned = plan_chunks(year, max_sequence, chunk_size)
+    chunks = [chunk for chunk in planned if not is_covered(chunk, done)]
+    logger.info(
+        "backfill.start year=%s max_seq=%s chunk_size=%s pending=%s completed=%s workers=%s",
+        year,
+        max_sequence,
+        chunk_size,
+        len(chunks),
+        len(planned) - len(chunks),
+        workers,
+    )
+    if not chunks:
+        return
+
+    if not dry_run:
+        with db_cursor(settings) as cursor:
+            run_id_db = create_run(cursor, f"{year}-01-01", f"{year + 1}-01-01")
+        run_id_log = str(run_id_db)
+
+    counters = RunCounters()
+    category_map = load_category_map()
+    executor = gate_executor(gate_workers) if gate_workers > 1 else None
+    started = time.monotonic()
+    try:
+        for chunk, ids, result, fetch_seconds in _fetch_chunks(
+            chunks, settings, workers, use_missing_cache=not dry_run
+        ):
+            write_started = time.monotonic()
+            raw_events = list(result.found.values())
+            counters.missing_cache_misses += len(ids)
+            counters.missing_cache_hits += len(chunk.ids()) - len(ids)
+
+            if dry_run:
+                gate = QualityGate(settings=settings, category_map=category_map)
+                accepts, rejects, _ = gate_events(gate, raw_events, gate_workers, executor)
+                counters.fetched += len(raw_events)
+                counters.rejected += len(rejects)
+            else:
+                if run_id_db is None:
+                    raise ValueError("run_id missing for database write")
+                with db_cursor(settings) as cursor:
+                    gate = QualityGate(
+                        settings=settings,
+                        category_map=category_map,
+                        duplicate_checker=DatabaseDuplicateChecker(cursor, settings),
+                        warm_index=True,
+                    )
+                    raw_events = skip_unchanged(
+                        cursor, settings, raw_events, counters, gate.fingerprint
+                    )
+                    accepts, rejects, review_rejects = gate_events(
+                        gate, raw_events, gate_workers, executor
+                    )
+                    write_decisions(
+                        cursor,
+                        run_id_db,
+                        raw_events,
+                        accepts,
+                        rejects + review_rejects,
+                        counters,
+                        gate.fingerprint,
+                        bulk_load=settings.ingestion_bulk_load,
+                        upsert_mode=settings.ingestion_upsert_mode,
+                    )
+                    record_probes(
+                        cursor,
+                        missing=result.missing,
+                        found=list(result.found),
+                        reprobe_hours=settings.ingestion_missing_reprobe_hours,
+                        reprobe_max_hours=settings.ingestion_missing_reprobe_max_hours,
+                    )
+                    duration_ms = int((time.monotonic() - write_started + fetch_seconds) * 1000)
+                    if not result.failed:
+                        record_chunk(
+                            cursor,
+                            chunk,
+                            run_id_db,
+                            requested=len(ids),
+                            result=result,
+                            accepted=len(accepts),
+                            rejected=len(rejects),
+                            duration_ms=duration_ms,
+                        )
+
+            write_seconds = time.monotonic() - write_started
+            total_seconds = fetch_seconds + write_seconds
+            logger.info(
+                "backfill.chunk year=%s range=%s-%s fetched=%s missing=%s failed=%s "
+                "accepted=%s rejected=%s fetch_s=%.2f write_s=%.2f events_per_s=%.1f",
+                chunk.year,
+                chunk.start,
+                chunk.end,
+                len(result.found),
+                len(result.missing),
+                len(result.failed),
+                len(accepts),
+                len(rejects),
+                fetch_seconds,
+                write_seconds,
+                len(result.found) / total_seconds if total_seconds > 0 else 0.0,
+            )
+            if result.failed:
+                logger.warning(
+                    "backfill.chunk_incomplete year=%s range=%s-%s failed=%s",
+                    chunk.year,
+                    chunk.start,
+                    chunk.end,
+                    len(result.failed),
+                )
+
+        if not dry_run and run_id_db is not None:
+            with db_cursor(settings) as cursor:
+                complete_run_with_counters(cursor, run_id_db, counters)
+
+        elapsed = time.monotonic() - started
+        logger.info(
+            "backfill.complete run_id=%s year=%s chunks=%s fetched=%s inserted=%s "
+            "updated=%s unchanged=%s skipped=%s rejected=%s events_per_s=%.1f",
+            run_id_log,
+            year,
+            len(chunks),
+            counters.fetched,
+            counters.inserted,
+            counters.updated,
+            counters.unchanged,
+            counters.skipped_unchanged,
+            counters.rejected,
+            counters.fetched / elapsed if elapsed > 0 else 0.0,
+        )
+    except Exception as exc:
+        if not dry_run and run_id_db is not None:
+            with db_cursor(settings) as cursor:
+                complete_run_failed(cursor, run_id_db, exc, fetched_count=counters.fetched)
+        logger.exception("backfill.failed run_id=%s year=%s", run_id_log, year)
+        raise
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def _fetch_chunks(
+    chunks: List[Chunk],
+    settings: Settings,
+    workers: int,
+    use_missing_cache: bool = True,
+) -> Iterator[tuple[Chunk, List[str], GapFillResult, float]]:
+    """Fetch chunks on a worker pool, yielding them in completion order.
+
+    At most ``2 * workers`` chunks are in flight so fetched-but-unwritten data
+    stays bounded. Yields ``(chunk, probed_ids, result, fetch_seconds)``.
+    Without ``use_missing_cache`` every ID is probed and no database is used.
+    """
+    client = create_client(settings)
+
+    def fetch(ids: List[str]) -> tuple[GapFillResult, float]:
+        fetch_started = time.monotonic()
+        result = fetch_ids(ids, settings, client=client)
+        return result, time.monotonic() - fetch_started
+
+    pending: dict[Future, tuple[Chunk, List[str]]] = {}
+    queue = list(reversed(chunks))
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while queue or pending:
+                while queue and len(pending) < 2 * workers:
+                    chunk = queue.pop()
+                    ids = chunk.ids()
+                    if use_missing_cache:
+                        with db_cursor(settings) as cursor:
+                            ids, _ = filter_due(cursor, ids)
+                    pending[executor.submit(fetch, ids)] = (chunk, ids)
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk, ids = pending.pop(future)
+                    result, fetch_seconds = future.result()
+                    yield chunk, ids, result, fetch_seconds
+    finally:
+        client.close()
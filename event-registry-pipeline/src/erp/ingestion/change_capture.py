@@ -0,0 +1,70 @@
+"""Payload-hash change capture for fetched events."""
+
+from __future__ import annotations
+
+from typing import List, Sequence
+
+from psycopg import Cursor
+
+from erp.models import RawEvent
+from erp.utils.hashing import payload_hash
+
+
+def filter_changed(
+    cursor: Cursor, raw_events: Sequence[RawEvent], gate_fingerprint: str
+) -> tuple[List[RawEvent], int]:
+    """Drop events already processed with this payload and this gate.
+
+    An event is unchanged only if both its payload hash and the
+    ``gate_fingerprint`` (see :func:`erp.ingestion.quality_gate.gate_fingerprint`)
+    match the ones stored for its ID. Returns ``(changed_events,
+    unchanged_count)``. Events without a service_request_id are always kept.
+    """
+    hashes = [
+        payload_hash(event.payload) if event.service_request_id else None
+        for event in raw_events
+    ]
+    ids = list({event.service_request_id for event in raw_events if event.service_request_id})
+    if not ids:
+        return list(raw_events), 0
+
+    cursor.execute(
+        "select service_request_id, payload_hash from public.event_payload_hashes "
+        "where service_request_id = any(%s) and gate_fingerprint = %s",
+        (ids, gate_fingerprint),
+    )
+    stored: dict[str, str] = dict(cursor.fetchall())
+    changed = [
+        event
+        for event, event_hash in zip(raw_events, hashes)
+        if not event.service_request_id or stored.get(event.service_request_id) != event_hash
+    ]
+    return changed, len(raw_events) - len(changed)
+
+
+def record_hashes(
+    cursor: Cursor, run_id: int, raw_events: Sequence[RawEvent], gate_fingerprint: str
+) -> None:
+    """Store the payload hash and gate fingerprint of every processed event.
+
+    The last event per ID wins.
+    """
+    hashes = {
+        event.service_request_id: payload_hash(event.payload)
+        for event in raw_events
+        if event.service_request_id
+    }
+    if not hashes:
+        return
+
+    cursor.execute(
+        "insert into public.event_payload_hashes "
+        "(service_request_id, payload_hash, gate_fingerprint, run_id) "
+        "select srid, hash, %s, %s from unnest(%s::text[], %s::text[]) as t(srid, hash) "
+        "on conflict (service_request_id) do update set "
+        "payload_hash = excluded.payload_hash, gate_fingerprint = excluded.gate_fingerprint, "
+        "run_id = excluded.run_id, updated_at = now() "
+        "where (event_payload_hashes.payload_hash, event_payload_hashes.gate_fingerprint) "
+        "is distinct from (excluded.payload_hash, excluded.gate_fingerprint)",
+        (gate_fingerprint, run_id, list(hashes), list(hashes.values())),
+    )
@@ -0,0 +1,112 @@
+"""Per-year sequence coverage for finding historical ID holes."""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional
+
+from psycopg import Cursor
+
+
+@dataclass(frozen=True)
+class SequenceCoverage:
+    """Run-length encoded set of sequence numbers seen for one year.
+
+    ``ranges`` holds sorted, non-overlapping, non-adjacent inclusive
+    ``(start, end)`` runs, so memory and hole enumeration scale with the number
+    of holes rather than with the number of sequences.
+    """
+
+    year: int
+    ranges: tuple[tuple[int, int], ...] = ()
+
+    @classmethod
+    def from_ranges(cls, year: int, ranges: Iterable[tuple[int, int]]) -> "SequenceCoverage":
+        merged: List[tuple[int, int]] = []
+        for start, end in sorted(ranges):
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return cls(year=year, ranges=tuple(merged))
+
+    @classmethod
+    def from_sequences(cls, year: int, sequences: Iterable[int]) -> "SequenceCoverage":
+        return cls.from_ranges(year, ((seq, seq) for seq in sequences))
+
+    @property
+    def max_sequence(self) -> Optional[int]:
+        return self.ranges[-1][1] if self.ranges else None
+
+    @property
+    def covered_count(self) -> int:
+        return sum(end - start + 1 for start, end in self.ranges)
+
+    def __contains__(self, sequence: object) -> bool:
+        if not isinstance(sequence, int):
+            return False
+        index = bisect_right(self.ranges, (sequence, float("inf"))) - 1
+        return index >= 0 and self.ranges[index][0] <= sequence <= self.ranges[index][1]
+
+    def hole_ranges(self, upper: Optional[int] = None) -> List[tuple[int, int]]:
+        """Return missing inclusive runs in ``1..upper`` (default: max seen)."""
+        upper = self.max_sequence if upper is None else upper
+        if upper is None:
+            return []
+
+        holes: List[tuple[int, int]] = []
+        expected = 1
+        for start, end in self.ranges:
+            if start > upper:
+                break
+            if start > expected:
+                holes.append((expected, start - 1))
+            expected = max(expected, end + 1)
+        if expected <= upper:
+            holes.append((expected, upper))
+        return holes
+
+    def iter_holes(self, upper: Optional[int] = None) -> Iterator[int]:
+        for start, end in self.hole_ranges(upper):
+            yield from range(start, end + 1)
+
+    def hole_ids(self, upper: Optional[int] = None, limit: Optional[int] = None) -> List[str]:
+        ids: List[str] = []
+        for sequence in self.iter_holes(upper):
+            if limit is not None and len(ids) >= limit:
+                break
+            ids.append(f"{sequence}-{self.year}")
+        return ids
+
+
+def load_coverage(cursor: Cursor, year: int) -> SequenceCoverage:
+    """Build coverage for ``year`` from `events` and `events_raw` in one query.
+
+    IDs staged in `events_raw` count as covered even if they were rejected:
+    they are known to exist and do not need to be fetched again.
+    """
+    cursor.execute(
+        """
+        with seqs as (
+          select sequence_number as seq
+          from public.events
+          where year = %s
+          union
+          select split_part(service_request_id, '-', 1)::int
+          from public.events_raw
+          where service_request_id like %s
+            and split_part(service_request_id, '-', 1) ~ '^[0-9]{1,9}$'
+        ),
+        islands as (
+          select seq, seq - row_number() over (order by seq) as grp
+          from seqs
+        )
+        select min(seq), max(seq)
+        from islands
+        group by grp
+        order by 1
+        """,
+        (year, f"%-{year}"),
+    )
+    return SequenceCoverage.from_ranges(year, ((int(a), int(b)) for a, b in cursor.fetchall()))
@@ -3,12 +3,24 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import List, Optional, Sequence
 
 from psycopg import Cursor
 
 from erp.config import Settings
-from erp.ingestion.quality_gate import DuplicateKey
+from erp.ingestion.near_duplicate import NearDuplicateEntry, band_hashes
+from erp.ingestion.quality_gate import DuplicateKey, DuplicateProbe, StoredDuplicate
+from erp.utils.hashing import DEDUPE_KEY_PRECISION
+
+
+# Normalize description: strip URLs first, then collapse whitespace, trim and lowercase.
+# Matches normalize_for_dedupe() in utils/text.py and the backfill of migration 011.
+_NORMALIZED_DESCRIPTION_SQL = (
+    "lower(btrim(regexp_replace(regexp_replace(coalesce(e.description, ''), "
+    "'https?://\\S+|www\\.\\S+', '', 'g'), '\\s+', ' ', 'g')))"
+)
+# Same expression as the GiST index `idx_events_location` (earthdistance).
+_EVENT_EARTH_SQL = "ll_to_earth(e.lat::double precision, e.lon::double precision)"
 
 
 class DatabaseDuplicateChecker:
@@ -18,41 +30,235 @@ class DatabaseDuplicateChecker:
         self.cursor = cursor
         self.settings = settings or Settings()
 
-    def find_duplicate(self, key: DuplicateKey, requested_at: datetime) -> Optional[str]:
+    @property
+    def _use_dedupe_key(self) -> bool:
+        # The stored key is rounded to DEDUPE_KEY_PRECISION; other precisions
+        # fall back to normalizing rows at query time.
+        return (
+            self.settings.duplicate_coord_precision == DEDUPE_KEY_PRECISION
+            and not self._radius
+        )
+
+    @property
+    def _radius(self) -> float:
+        return self.settings.duplicate_radius_meters
+
+    def find_duplicate(
+        self,
+        key: DuplicateKey,
+        requested_at: datetime,
+        service_request_id: Optional[str] = None,
+    ) -> Optional[str]:
         window = timedelta(hours=self.settings.duplicate_window_hours)
         start = requested_at - window
         end = requested_at + window
 
-        # Normalize description: strip URLs first, then collapse whitespace, then lowercase
-        # This matches the Python normalize_for_dedupe() function in utils/text.py
-        conditions = [
-            "requested_at between %s and %s",
-            "round(lat::numeric, %s) = %s",
-            "round(lon::numeric, %s) = %s",
-            "lower(regexp_replace(regexp_replace(coalesce(description, ''), 'https?://[^\\s]+', '', 'g'), '\\s+', ' ', 'g')) = %s",
-        ]
-        params: list[object] = [
-            start,
-            end,
-            self.settings.duplicate_coord_precision,
-            key.lat_round,
-            self.settings.duplicate_coord_precision,
-            key.lon_round,
-            key.description,
-        ]
+        if self._use_dedupe_key and key.dedupe_key:
+            # Index seek on (dedupe_key, requested_at).
+            conditions = ["e.dedupe_key = %s", "e.requested_at between %s and %s"]
+            params: list[object] = [key.dedupe_key, start, end]
+        elif self._radius and key.lat is not None and key.lon is not None:
+            # GiST lookup on idx_events_location, then the exact distance.
+            conditions = [
+                f"earth_box(ll_to_earth(%s, %s), %s) @> {_EVENT_EARTH_SQL}",
+                f"earth_distance(ll_to_earth(%s, %s), {_EVENT_EARTH_SQL}) <= %s",
+                "e.requested_at between %s and %s",
+                f"{_NORMALIZED_DESCRIPTION_SQL} = %s",
+            ]
+            params = [
+                key.lat,
+                key.lon,
+                self._radius,
+                key.lat,
+                key.lon,
+                self._radius,
+                start,
+                end,
+                key.description,
+            ]
+        else:
+            conditions = [
+                "e.requested_at between %s and %s",
+                "round(e.lat::numeric, %s) = %s",
+                "round(e.lon::numeric, %s) = %s",
+                f"{_NORMALIZED_DESCRIPTION_SQL} = %s",
+            ]
+            params = [
+                start,
+                end,
+                self.settings.duplicate_coord_precision,
+                key.lat_round,
+                self.settings.duplicate_coord_precision,
+                key.lon_round,
+                key.description,
+            ]
 
         if self.settings.duplicate_require_service_name and key.service_name:
-            conditions.append("service_name = %s")
+            conditions.append("e.service_name = %s")
             params.append(key.service_name)
 
         if self.settings.duplicate_require_address and key.address_string:
-            conditions.append("address_string = %s")
+            conditions.append("e.address_string = %s")
             params.append(key.address_string)
 
-        query = f"select service_request_id from events where {' and '.join(conditions)} limit 1"
+        # A re-fetched event is already in `events`; it must not match itself.
+        if service_request_id:
+            conditions.append("e.service_request_id <> %s")
+            params.append(service_request_id)
+
+        query = (
+            f"select e.service_request_id from events e where {' and '.join(conditions)} limit 1"
+        )
 
         self.cursor.execute(query, params)
         row = self.cursor.fetchone()
         if row:
             return row[0]
         return None
+
+    def find_duplicates(self, probes: Sequence[DuplicateProbe]) -> dict[DuplicateProbe, str]:
+        """Resolve all probes with one query over `unnest`-ed probe arrays."""
+        unique = list(dict.fromkeys(probes))
+        if not unique:
+            return {}
+
+        window = timedelta(hours=self.settings.duplicate_window_hours)
+        precision = self.settings.duplicate_coord_precision
+        require_service = self.settings.duplicate_require_service_name
+        require_address = self.settings.duplicate_require_address
+
+        use_key = self._use_dedupe_key and all(probe.key.dedupe_key for probe in unique)
+        if use_key:
+            match_sql = "e.dedupe_key = p.dedupe_key"
+            match_params: list[object] = []
+        elif self._radius:
+            match_sql = (
+                f"earth_box(ll_to_earth(p.lat, p.lon), %s) @> {_EVENT_EARTH_SQL} "
+                f"and earth_distance(ll_to_earth(p.lat, p.lon), {_EVENT_EARTH_SQL}) <= %s "
+                f"and {_NORMALIZED_DESCRIPTION_SQL} = p.description"
+            )
+            match_params = [self._radius, self._radius]
+        else:
+            match_sql = (
+                "round(e.lat::numeric, %s) = p.lat_round "
+                "and round(e.lon::numeric, %s) = p.lon_round "
+                f"and {_NORMALIZED_DESCRIPTION_SQL} = p.description"
+            )
+            match_params = [precision, precision]
+
+        self.cursor.execute(
+            f"""
+            select p.idx, d.service_request_id
+            from unnest(
+              %s::int[], %s::timestamptz[], %s::float8[], %s::float8[],
+              %s::text[], %s::text[], %s::text[], %s::text[], %s::text[],
+              %s::float8[], %s::float8[]
+            ) as p(idx, requested_at, lat_round, lon_round, description, dedupe_key,
+                   service_name, address_string, service_request_id, lat, lon)
+            cross join lateral (
+              select e.service_request_id
+              from events e
+              where {match_sql}
+                and e.requested_at between p.requested_at - %s and p.requested_at + %s
+                and (p.service_name is null or e.service_name = p.service_name)
+                and (p.address_string is null or e.address_string = p.address_string)
+                and e.service_request_id is distinct from p.service_request_id
+              limit 1
+            ) d
+            """,
+            (
+                list(range(len(unique))),
+                [probe.requested_at for probe in unique],
+                [probe.key.lat_round for probe in unique],
+                [probe.key.lon_round for probe in unique],
+                [probe.key.description for probe in unique],
+                [probe.key.dedupe_key for probe in unique],
+                [
+                    probe.key.service_name if require_service and probe.key.service_name else None
+                    for probe in unique
+                ],
+                [
+                    probe.key.address_string
+                    if require_address and probe.key.address_string
+                    else None
+                    for probe in unique
+                ],
+                [probe.service_request_id for probe in unique],
+                [probe.key.lat for probe in unique],
+                [probe.key.lon for probe in unique],
+                *match_params,
+                window,
+                window,
+            ),
+        )
+        return {unique[int(idx)]: srid for idx, srid in self.cursor.fetchall()}
+
+    def load_range(self, start: datetime, end: datetime) -> List[StoredDuplicate]:
+        """Load every described event in ``[start, end]`` with one range scan."""
+        self.cursor.execute(
+            "select service_request_id, requested_at, description, lat, lon, "
+            "service_name, address_string from events "
+            "where requested_at between %s and %s and has_description",
+            (start, end),
+        )
+        return [
+            StoredDuplicate(
+                service_request_id=srid,
+                requested_at=requested_at,
+                description=description or "",
+                lat=float(lat),
+                lon=float(lon),
+                service_name=service_name,
+                address_string=address_string,
+            )
+            for srid, requested_at, description, lat, lon, service_name, address_string in (
+                self.cursor.fetchall()
+            )
+        ]
+
+    def find_near_candidates(
+        self, probes: Sequence[NearDuplicateEntry]
+    ) -> dict[NearDuplicateEntry, List[NearDuplicateEntry]]:
+        """Fetch stored signatures sharing an LSH band with any probe (GIN lookup)."""
+        unique = list(dict.fromkeys(probes))
+        if not unique:
+            return {}
+
+        window = timedelta(hours=self.settings.near_duplicate_window_hours)
+        bands = self.settings.near_duplicate_bands
+        indexes: list[int] = []
+        band_values: list[int] = []
+        for idx, probe in enumerate(unique):
+            for band in band_hashes(probe.signature, bands):
+                indexes.append(idx)
+                band_values.append(band)
+
+        self.cursor.execute(
+            """
+            select distinct p.idx, e.service_request_id, m.requested_at, e.lat, e.lon,
+                   e.service_name, m.signature
+            from unnest(%s::int[], %s::int8[]) as p(idx, band)
+            join public.event_minhash m on m.band_hashes @> array[p.band]
+            join events e on e.service_request_id = m.service_request_id
+            where m.requested_at between %s and %s
+            """,
+            (
+                indexes,
+                band_values,
+                min(probe.requested_at for probe in unique) - window,
+                max(probe.requested_at for probe in unique),
+            ),
+        )
+        found: dict[NearDuplicateEntry, List[NearDuplicateEntry]] = {}
+        for idx, srid, requested_at, lat, lon, service_name, signature in self.cursor.fetchall():
+            found.setdefault(unique[int(idx)], []).append(
+                NearDuplicateEntry(
+                    service_request_id=srid,
+                    requested_at=requested_at,
+                    lat=float(lat),
+                    lon=float(lon),
+                    service_name=service_name,
+                    signature=tuple(int(value) for value in signature),
+                )
+            )
+        return found
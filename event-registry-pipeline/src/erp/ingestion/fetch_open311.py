@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
-from typing import List, Optional
+from collections import deque
+from typing import AsyncIterator, List, Optional
 
+import asyncio
 import time
 
 import httpx
@@ -21,46 +23,164 @@ def fetch_window(
     until: str,
     settings: Optional[Settings] = None,
 ) -> List[RawEvent]:
-    """Fetch a date window from the Open311 API."""
+    """Fetch a date window from the Open311 API.
+
+    With ``OPEN311_PREFETCH_PAGES`` > 1 the pages are fetched concurrently via
+    :func:`stream_window`; otherwise pages are walked one after another.
+    """
     settings = settings or Settings()
+    if settings.open311_prefetch_pages > 1:
+        return asyncio.run(_collect_window(since, until, settings))
+
     logger.info("fetch_window.start", extra={"since": since, "until": until})
 
+    with httpx.Client(timeout=settings.open311_timeout_seconds) as client:
+        events, _ = fetch_pages(client, since, until, settings)
+
+    logger.info("fetch_window.complete count=%s", len(events))
+    return events
+
+
+def fetch_pages(
+    client: httpx.Client,
+    since: str,
+    until: str,
+    settings: Settings,
+    start_page: int = 1,
+    max_pages: Optional[int] = None,
+) -> tuple[List[RawEvent], bool]:
+    """Walk window pages sequentially on an existing client.
+
+    Returns ``(events, truncated)`` where ``truncated`` is True when ``max_pages``
+    full pages were read and more pages may follow.
+    """
     url = f"{settings.open311_base_url}/requests.json"
-    page = 1
+    page = start_page
     events: List[RawEvent] = []
 
-    with httpx.Client(timeout=settings.open311_timeout_seconds) as client:
-        while True:
-            params: dict[str, str | int] = {
-                "start_date": since,
-                "end_date": until,
-                "page": page,
-            }
-            if settings.open311_use_extensions:
-                params["extensions"] = "true"
+    while True:
+        params = _window_params(since, until, page, settings)
+        response = _get_with_retry(
+            client,
+            url,
+            params=params,
+            retries=settings.open311_max_retries,
+        )
+        response.raise_for_status()
+        payload = response.json()
 
-            response = _get_with_retry(
-                client,
-                url,
-                params=params,
-                retries=settings.open311_max_retries,
+        if not payload:
+            return events, False
+
+        for item in payload:
+            events.append(_to_raw_event(item))
+
+        if len(payload) < settings.open311_page_size:
+            return events, False
+
+        if max_pages is not None and page - start_page + 1 >= max_pages:
+            return events, True
+
+        page += 1
+
+
+async def stream_window(
+    since: str,
+    until: str,
+    settings: Optional[Settings] = None,
+    prefetch_pages: Optional[int] = None,
+    client: Optional[httpx.AsyncClient] = None,
+) -> AsyncIterator[RawEvent]:
+    """Stream a date window from the Open311 API as an async generator.
+
+    Up to ``prefetch_pages`` page requests are kept in flight while the current
+    page is decoded and yielded. The total page count is unknown upfront, so a
+    short (or empty) page ends the stream and any outstanding prefetches are
+    cancelled.
+    """
+    settings = settings or Settings()
+    depth = max(1, prefetch_pages or settings.open311_prefetch_pages)
+    url = f"{settings.open311_base_url}/requests.json"
+    logger.info(
+        "stream_window.start since=%s until=%s prefetch_pages=%s", since, until, depth
+    )
+
+    owns_client = client is None
+    if client is None:
+        client = httpx.AsyncClient(timeout=settings.open311_timeout_seconds)
+
+    pending: deque[asyncio.Task[list[dict]]] = deque()
+    next_page = 1
+
+    def schedule() -> None:
+        nonlocal next_page
+        params = _window_params(since, until, next_page, settings)
+        pending.append(
+            asyncio.create_task(
+                _fetch_page_async(client, url, params, settings.open311_max_retries)
             )
-            response.raise_for_status()
-            payload = response.json()
+        )
+        next_page += 1
 
+    count = 0
+    try:
+        for _ in range(depth):
+            schedule()
+
+        while pending:
+            payload = await pending.popleft()
             if not payload:
                 break
 
+            is_last = len(payload) < settings.open311_page_size
+            if not is_last:
+                schedule()
+
             for item in payload:
-                events.append(_to_raw_event(item))
+                count += 1
+                yield _to_raw_event(item)
 
-            if len(payload) < settings.open311_page_size:
+            if is_last:
                 break
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        if owns_client:
+            await client.aclose()
 
-            page += 1
+    logger.info("stream_window.complete count=%s pages=%s", count, next_page - 1)
 
-    logger.info("fetch_window.complete count=%s", len(events))
-    return events
+
+async def _collect_window(since: str, until: str, settings: Settings) -> List[RawEvent]:
+    return [event async for event in stream_window(since, until, settings)]
+
+
+def _window_params(
+    since: str,
+    until: str,
+    page: int,
+    settings: Settings,
+) -> dict[str, str | int]:
+    params: dict[str, str | int] = {
+        "start_date": since,
+        "end_date": until,
+        "page": page,
+    }
+    if settings.open311_use_extensions:
+        params["extensions"] = "true"
+    return params
+
+
+async def _fetch_page_async(
+    client: httpx.AsyncClient,
+    url: str,
+    params: dict,
+    retries: int,
+) -> list[dict]:
+    response = await _get_with_retry_async(client, url, params=params, retries=retries)
+    response.raise_for_status()
+    return response.json()
 
 
 def fetch_by_id(
@@ -122,3 +242,26 @@ def _get_with_retry(
             if attempt > retries:
                 raise
             time.sleep(min(2**attempt, 8))
+
+
+async def _get_with_retry_async(
+    client: httpx.AsyncClient,
+    url: str,
+    params: Optional[dict] = None,
+    retries: int = 3,
+) -> httpx.Response:
+    """Async GET with the same retry and backoff policy as `_get_with_retry`."""
+    attempt = 0
+    while True:
+        try:
+            response = await client.get(url, params=params)
+            if response.status_code >= 500 and attempt < retries:
+                attempt += 1
+                await asyncio.sleep(min(2**attempt, 8))
+                continue
+            return response
+        except httpx.RequestError:
+            attempt += 1
+            if attempt > retries:
+                raise
+            await asyncio.sleep(min(2**attempt, 8))
@@ -0,0 +1,251 @@
+"""Batched ID gap-fill over a shared keep-alive client."""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional, Sequence
+
+import httpx
+
+from erp.config import Settings
+from erp.ingestion.fetch_open311 import _get_with_retry, _to_raw_event
+from erp.ingestion.incremental import probe_sequence_frontier
+from erp.models import RawEvent
+from erp.utils.logging import get_logger
+from erp.utils.time import parse_service_request_id
+
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class GapFillResult:
+    """Outcome of a gap-fill fetch, split per service_request_id."""
+
+    found: dict[str, RawEvent] = field(default_factory=dict)
+    missing: list[str] = field(default_factory=list)  # 404 / not returned by the API
+    failed: list[str] = field(default_factory=list)  # transient errors, worth retrying
+
+    def merge(self, other: "GapFillResult") -> None:
+        self.found.update(other.found)
+        self.missing.extend(other.missing)
+        self.failed.extend(other.failed)
+
+
+@dataclass
+class GapFillStats:
+    """Per-run gap-fill counters."""
+
+    missing_404: int = 0
+    failed: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+
+def create_client(settings: Settings) -> httpx.Client:
+    """Create a pooled keep-alive client bounded to OPEN311_MAX_CONNECTIONS."""
+    limits = httpx.Limits(
+        max_connections=settings.open311_max_connections,
+        max_keepalive_connections=settings.open311_max_connections,
+    )
+    return httpx.Client(timeout=settings.open311_timeout_seconds, limits=limits)
+
+
+def fetch_ids(
+    service_request_ids: Sequence[str],
+    settings: Optional[Settings] = None,
+    client: Optional[httpx.Client] = None,
+) -> GapFillResult:
+    """Fetch many service_request_ids with multi-ID `requests.json` queries.
+
+    IDs are packed into comma-separated batches of OPEN311_GAP_FILL_BATCH_SIZE
+    (at most OPEN311_PAGE_SIZE) and fetched concurrently over one shared client.
+    Batches that fail, that the API answers with IDs that were not requested, or
+    whose response fills the whole page fall back to per-ID lookups (for the
+    IDs not returned) so every ID ends up as either found, missing (404) or
+    failed (transient).
+    """
+    settings = settings or Settings()
+    ids = list(dict.fromkeys(service_request_ids))
+    result = GapFillResult()
+    if not ids:
+        return result
+
+    batch_size = _batch_size(settings)
+    batches = [ids[i : i + batch_size] for i in range(0, len(ids), batch_size)]
+
+    owns_client = client is None
+    if client is None:
+        client = create_client(settings)
+
+    try:
+        workers = max(1, min(settings.open311_max_workers, len(batches)))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for partial in executor.map(
+                    lambda batch: _fetch_batch(client, batch, settings), batches
+                ):
+                    result.merge(partial)
+        else:
+            for batch in batches:
+                result.merge(_fetch_batch(client, batch, settings))
+    finally:
+        if owns_client:
+            client.close()
+
+    logger.info(
+        "gap_fill.fetch_ids requested=%s batches=%s found=%s missing=%s failed=%s",
+        len(ids),
+        len(batches),
+        len(result.found),
+        len(result.missing),
+        len(result.failed),
+    )
+    return result
+
+
+def probe_frontier(
+    year: int,
+    known_sequence: Optional[int],
+    settings: Optional[Settings] = None,
+    client: Optional[httpx.Client] = None,
+) -> tuple[Optional[int], dict[str, RawEvent]]:
+    """Find the current max sequence for ``year`` beyond ``known_sequence``.
+
+    Each probe asks for a block of INGESTION_FRONTIER_PROBE_WIDTH consecutive
+    IDs in one multi-ID request, so short runs of 404s do not stop the search.
+    Returns ``(max_sequence, events_found_while_probing)``.
+    """
+    settings = settings or Settings()
+    width = max(1, settings.ingestion_frontier_probe_width)
+    found: dict[str, RawEvent] = {}
+    max_found: Optional[int] = None
+    probes = 0
+
+    owns_client = client is None
+    if client is None:
+        client = create_client(settings)
+
+    def is_present(sequence: int) -> bool:
+        nonlocal max_found, probes
+        probes += 1
+        block = [f"{seq}-{year}" for seq in range(sequence, sequence + width)]
+        result = GapFillResult()
+        batch_size = _batch_size(settings)
+        for start in range(0, len(block), batch_size):
+            result.merge(_fetch_batch(client, block[start : start + batch_size], settings))
+        found.update(result.found)
+        sequences = [parse_service_request_id(srid)[1] or 0 for srid in result.found]
+        if sequences:
+            max_found = max([max_found or 0, *sequences])
+        return bool(sequences)
+
+    try:
+        frontier = probe_sequence_frontier(known_sequence, is_present)
+    finally:
+        if owns_client:
+            client.close()
+
+    candidates = [value for value in (frontier, max_found, known_sequence) if value]
+    max_sequence = max(candidates) if candidates else None
+    logger.info(
+        "gap_fill.frontier year=%s known=%s frontier=%s probes=%s",
+        year,
+        known_sequence,
+        max_sequence,
+        probes,
+    )
+    return max_sequence, found
+
+
+def _batch_size(settings: Settings) -> int:
+    """IDs per multi-ID request: one page at most, so a single response can hold them all."""
+    return max(1, min(settings.open311_gap_fill_batch_size, settings.open311_page_size))
+
+
+def _fetch_batch(client: httpx.Client, ids: list[str], settings: Settings) -> GapFillResult:
+    if len(ids) == 1:
+        return _fetch_individually(client, ids, settings)
+
+    url = f"{settings.open311_base_url}/requests.json"
+    params: dict[str, str] = {"service_request_id": ",".join(ids), "limit": str(len(ids))}
+    if settings.open311_use_extensions:
+        params["extensions"] = "true"
+
+    try:
+        response = _get_with_retry(
+            client,
+            url,
+            params=params,
+            retries=settings.open311_max_retries,
+        )
+        response.raise_for_status()
+        payload = response.json()
+    except (httpx.HTTPError, ValueError) as exc:
+        logger.warning(
+            "gap_fill.batch_failed size=%s first=%s error=%s", len(ids), ids[0], exc
+        )
+        return _fetch_individually(client, ids, settings)
+
+    requested = set(ids)
+    returned: dict[str, RawEvent] = {}
+    for item in payload or []:
+        event = _to_raw_event(item)
+        if event.service_request_id:
+            returned[event.service_request_id] = event
+
+    unexpected = set(returned) - requested
+    if unexpected:
+        # The filter was ignored (e.g. the API fell back to a default listing);
+        # absence from this response says nothing about the requested IDs.
+        logger.warning(
+            "gap_fill.batch_filter_ignored size=%s unexpected=%s", len(ids), len(unexpected)
+        )
+        return _fetch_individually(client, ids, settings)
+
+    absent = [srid for srid in ids if srid not in returned]
+    if absent and len(payload) >= len(ids):
+        # A full page may have cut the response short (e.g. several rows per ID);
+        # only a per-ID lookup tells whether the absent IDs exist.
+        logger.warning(
+            "gap_fill.batch_page_full size=%s absent=%s", len(ids), len(absent)
+        )
+        result = GapFillResult(found=returned)
+        result.merge(_fetch_individually(client, absent, settings))
+        return result
+
+    return GapFillResult(found=returned, missing=absent)
+
+
+def _fetch_individually(
+    client: httpx.Client,
+    ids: list[str],
+    settings: Settings,
+) -> GapFillResult:
+    result = GapFillResult()
+    for service_request_id in ids:
+        url = f"{settings.open311_base_url}/requests/{service_request_id}.json"
+        try:
+            response = _get_with_retry(
+                client,
+                url,
+                params=None,
+                retries=settings.open311_max_retries,
+            )
+            if response.status_code == 404:
+                result.missing.append(service_request_id)
+                continue
+            response.raise_for_status()
+            payload = response.json()
+        except (httpx.HTTPError, ValueError) as exc:
+            logger.warning("gap_fill.id_failed id=%s error=%s", service_request_id, exc)
+            result.failed.append(service_request_id)
+            continue
+
+        if not payload:
+            result.missing.append(service_request_id)
+            continue
+
+        result.found[service_request_id] = _to_raw_event(payload[0])
+    return result
@@ -2,11 +2,16 @@
 
 from __future__ import annotations
 
-from typing import Iterable, List, Optional
+from typing import Callable, Iterable, List, Optional
 
 from erp.utils.time import parse_service_request_id
 
 
+# "window": the frontier is the max sequence seen in the date-window response.
+# "frontier": additionally probe IDs beyond it (see probe_sequence_frontier).
+GAP_FILL_MODES = ("window", "frontier")
+
+
 def compute_gap_ids(
     last_sequence: Optional[int],
     max_sequence: Optional[int],
@@ -32,3 +37,33 @@ def max_sequence_for_year(service_request_ids: Iterable[str], year: int) -> Opti
             sequences.append(sequence)
 
     return max(sequences) if sequences else None
+
+
+def probe_sequence_frontier(
+    known_sequence: Optional[int],
+    is_present: Callable[[int], bool],
+) -> Optional[int]:
+    """Find the highest present sequence with exponential + binary search.
+
+    ``is_present(seq)`` must be monotone: True up to the frontier, False past it.
+    Starting from ``known_sequence`` the probe distance doubles until a miss, then
+    the last gap is bisected, so the search costs O(log n) probes. Callers should
+    probe a small block of IDs per call so isolated 404s (withdrawn or private
+    reports) do not end the search early.
+    """
+    lo = max(known_sequence or 0, 0)
+    step = 1
+    hi = lo + step
+    while is_present(hi):
+        lo = hi
+        step *= 2
+        hi = lo + step
+
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if is_present(mid):
+            lo = mid
+        else:
+            hi = mid
+
+    return lo or None
@@ -0,0 +1,68 @@
+"""Negative cache of service_request_ids known to return 404."""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+from psycopg import Cursor
+
+from erp.utils.time import parse_service_request_id
+
+
+def filter_due(cursor: Cursor, service_request_ids: Sequence[str]) -> tuple[list[str], int]:
+    """Drop IDs whose re-probe is not due yet.
+
+    Returns ``(ids_to_probe, cache_hits)``.
+    """
+    ids = list(service_request_ids)
+    if not ids:
+        return [], 0
+
+    cursor.execute(
+        "select service_request_id from public.missing_service_request_ids "
+        "where service_request_id = any(%s) and next_probe_at > now()",
+        (ids,),
+    )
+    skip = {row[0] for row in cursor.fetchall()}
+    return [srid for srid in ids if srid not in skip], len(skip)
+
+
+def record_probes(
+    cursor: Cursor,
+    missing: Sequence[str],
+    found: Sequence[str],
+    reprobe_hours: int,
+    reprobe_max_hours: int,
+) -> None:
+    """Store 404 results with exponential re-probe backoff and forget found IDs.
+
+    The first 404 schedules a re-probe after ``reprobe_hours``; every further
+    404 doubles the delay up to ``reprobe_max_hours``.
+    """
+    rows = []
+    for srid in missing:
+        year, sequence = parse_service_request_id(srid)
+        if year is None or sequence is None:
+            continue
+        rows.append((srid, year, sequence))
+
+    if rows:
+        srids, years, sequences = (list(column) for column in zip(*rows))
+        cursor.execute(
+            "insert into public.missing_service_request_ids "
+            "(service_request_id, year, sequence_number, next_probe_at) "
+            "select srid, year, seq, now() + make_interval(hours => %s) "
+            "from unnest(%s::text[], %s::int[], %s::int[]) as m(srid, year, seq) "
+            "on conflict (service_request_id) do update set "
+            "last_probed_at = now(), "
+            "probe_count = missing_service_request_ids.probe_count + 1, "
+            "next_probe_at = now() + make_interval(hours => least("
+            "%s * power(2, missing_service_request_ids.probe_count), %s)::int)",
+            (reprobe_hours, srids, years, sequences, reprobe_hours, reprobe_max_hours),
+        )
+
+    if found:
+        cursor.execute(
+            "delete from public.missing_service_request_ids where service_request_id = any(%s)",
+            (list(found),),
+        )
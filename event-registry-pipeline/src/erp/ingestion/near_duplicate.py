@@ -0,0 +1,178 @@
+"""MinHash/LSH near-duplicate detection over event descriptions."""
+
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Iterable, List, Optional, Sequence
+
+from erp.utils.geo import distance_meters
+from erp.utils.text import normalize_for_dedupe
+
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+# Fixed seed: signatures are persisted in `event_minhash` and must stay comparable.
+_PERMUTATION_SEED = 1311
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+@dataclass(frozen=True)
+class NearDuplicateEntry:
+    """A described event as seen by the near-duplicate index."""
+
+    service_request_id: str
+    requested_at: datetime
+    lat: float
+    lon: float
+    service_name: Optional[str]
+    signature: tuple[int, ...]
+
+
+@dataclass(frozen=True)
+class NearDuplicateMatch:
+    service_request_id: str
+    similarity: float
+
+
+def shingles(text: str, size: int = 4, normalized: bool = False) -> set[str]:
+    """Character ``size``-grams of the normalized text (punctuation folded to spaces).
+
+    ``normalized=True`` skips :func:`normalize_for_dedupe` for text that already went through it.
+    """
+    folded = _NON_WORD.sub(" ", text if normalized else normalize_for_dedupe(text)).strip()
+    if len(folded) <= size:
+        return {folded} if folded else set()
+    return {folded[i : i + size] for i in range(len(folded) - size + 1)}
+
+
+@lru_cache(maxsize=8)
+def _permutations(num_perm: int) -> tuple[tuple[int, ...], tuple[int, ...]]:
+    rng = random.Random(_PERMUTATION_SEED)
+    a = tuple(rng.randint(1, _MERSENNE_PRIME - 1) for _ in range(num_perm))
+    b = tuple(rng.randint(0, _MERSENNE_PRIME - 1) for _ in range(num_perm))
+    return a, b
+
+
+def minhash_signature(
+    text: str,
+    num_perm: int = 64,
+    shingle_size: int = 4,
+    normalized: bool = False,
+) -> tuple[int, ...]:
+    """Return a ``num_perm`` MinHash signature (32-bit values) for ``text``."""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "big")
+        for shingle in shingles(text, shingle_size, normalized=normalized)
+    ]
+    if not hashes:
+        return tuple([_MAX_HASH] * num_perm)
+    a_values, b_values = _permutations(num_perm)
+    return tuple(
+        min(((a * value + b) % _MERSENNE_PRIME) & _MAX_HASH for value in hashes)
+        for a, b in zip(a_values, b_values)
+    )
+
+
+def band_hashes(signature: Sequence[int], bands: int) -> List[int]:
+    """Hash each of ``bands`` signature slices to a signed 64-bit LSH bucket id."""
+    rows = max(1, len(signature) // max(1, bands))
+    buckets: List[int] = []
+    for band in range(len(signature) // rows):
+        chunk = ",".join(str(value) for value in signature[band * rows : (band + 1) * rows])
+        digest = hashlib.blake2b(f"{band}:{chunk}".encode("ascii"), digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, "big", signed=True))
+    return buckets
+
+
+def similarity(left: Sequence[int], right: Sequence[int]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    if not left or len(left) != len(right):
+        return 0.0
+    return sum(1 for a, b in zip(left, right) if a == b) / len(left)
+
+
+def best_match(
+    probe: NearDuplicateEntry,
+    candidates: Iterable[NearDuplicateEntry],
+    threshold: float,
+    window: timedelta,
+    max_distance_meters: float,
+    require_service_name: bool,
+) -> Optional[NearDuplicateMatch]:
+    """Pick the most similar earlier candidate that passes the time, place and service filters."""
+    best: Optional[NearDuplicateMatch] = None
+    for candidate in candidates:
+        if candidate.service_request_id == probe.service_request_id:
+            continue
+        # Only earlier reports qualify, so re-fetches never point a source at its copy.
+        if (candidate.requested_at, candidate.service_request_id) >= (
+            probe.requested_at,
+            probe.service_request_id,
+        ):
+            continue
+        if probe.requested_at - candidate.requested_at > window:
+            continue
+        if require_service_name and candidate.service_name != probe.service_name:
+            continue
+        distance = distance_meters(probe.lat, probe.lon, candidate.lat, candidate.lon)
+        if distance > max_distance_meters:
+            continue
+        score = similarity(probe.signature, candidate.signature)
+        if score >= threshold and (best is None or score > best.similarity):
+            best = NearDuplicateMatch(candidate.service_request_id, score)
+    return best
+
+
+class NearDuplicateIndex:
+    """LSH buckets of recent signatures, evicted behind a time high-water mark.
+
+    Lookups only touch entries sharing at least one band hash with the probe,
+    so cost grows with the number of similar events rather than with the index.
+    """
+
+    def __init__(self, window: timedelta, bands: int) -> None:
+        self.window = window
+        self.bands = bands
+        self._width = max(window.total_seconds(), 1.0)
+        self._buckets: dict[int, dict[int, list[NearDuplicateEntry]]] = {}
+        self.high_water: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(
+            {
+                entry.service_request_id
+                for bucket in self._buckets.values()
+                for entries in bucket.values()
+                for entry in entries
+            }
+        )
+
+    def candidates(self, probe: NearDuplicateEntry) -> List[NearDuplicateEntry]:
+        bucket_no = self._bucket(probe.requested_at)
+        found: dict[str, NearDuplicateEntry] = {}
+        for band in band_hashes(probe.signature, self.bands):
+            for offset in (-1, 0, 1):
+                for entry in self._buckets.get(bucket_no + offset, {}).get(band, []):
+                    found.setdefault(entry.service_request_id, entry)
+        return list(found.values())
+
+    def add(self, entry: NearDuplicateEntry) -> None:
+        bucket = self._buckets.setdefault(self._bucket(entry.requested_at), {})
+        for band in band_hashes(entry.signature, self.bands):
+            bucket.setdefault(band, []).append(entry)
+
+    def advance(self, requested_at: datetime) -> None:
+        if self.high_water is not None and requested_at <= self.high_water:
+            return
+        self.high_water = requested_at
+        cutoff = self._bucket(requested_at - self.window)
+        for bucket_no in [bucket_no for bucket_no in self._buckets if bucket_no < cutoff]:
+            del self._buckets[bucket_no]
+
+    def _bucket(self, value: datetime) -> int:
+        return int(value.timestamp() // self._width)
@@ -0,0 +1,171 @@
+"""Time-window sharding planner for parallel Open311 fetches."""
+
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+import httpx
+
+from erp.config import Settings
+from erp.ingestion.fetch_open311 import fetch_pages
+from erp.ingestion.gap_fill import create_client
+from erp.models import RawEvent
+from erp.utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+ONE_DAY = timedelta(days=1)
+ONE_HOUR = timedelta(hours=1)
+
+
+@dataclass(frozen=True)
+class Shard:
+    """Half-open fetch window ``[start, end)``."""
+
+    start: datetime
+    end: datetime
+
+    @property
+    def span(self) -> timedelta:
+        return self.end - self.start
+
+    def bounds(self) -> tuple[str, str]:
+        """Return API `start_date`/`end_date` values (dates when day-aligned)."""
+        return _format_bound(self.start), _format_bound(self.end)
+
+    def bisect(self, min_span: timedelta) -> Optional[tuple["Shard", "Shard"]]:
+        """Split in two on a day (or hour) boundary; None if already minimal."""
+        if self.span <= min_span:
+            return None
+        unit = ONE_DAY if min_span >= ONE_DAY else ONE_HOUR
+        mid = self.start + ((self.span / 2) // unit) * unit
+        if mid <= self.start:
+            mid = self.start + unit
+        if mid >= self.end:
+            return None
+        return Shard(self.start, mid), Shard(mid, self.end)
+
+
+def plan_shards(since: str, until: str, shard_hours: int = 24) -> List[Shard]:
+    """Split ``[since, until)`` into consecutive shards of ``shard_hours``."""
+    start = _parse_bound(since)
+    end = _parse_bound(until)
+    step = timedelta(hours=max(1, shard_hours))
+
+    shards: List[Shard] = []
+    cursor = start
+    while cursor < end:
+        shard_end = min(cursor + step, end)
+        shards.append(Shard(cursor, shard_end))
+        cursor = shard_end
+    return shards
+
+
+def fetch_sharded(
+    since: str,
+    until: str,
+    settings: Optional[Settings] = None,
+    shard_hours: Optional[int] = None,
+    client: Optional[httpx.Client] = None,
+) -> List[RawEvent]:
+    """Fetch a window as concurrent shards and merge by service_request_id.
+
+    Each shard reads at most OPEN311_SHARD_MAX_PAGES pages. A shard that comes
+    back full is bisected and both halves are fetched again; once a shard is at
+    OPEN311_SHARD_MIN_HOURS it is paged to the end instead.
+    """
+    settings = settings or Settings()
+    shard_hours = shard_hours or settings.open311_shard_hours
+    max_pages = max(1, settings.open311_shard_max_pages)
+    min_span = timedelta(hours=max(1, settings.open311_shard_min_hours))
+
+    shards = plan_shards(since, until, shard_hours)
+    logger.info(
+        "fetch_sharded.start since=%s until=%s shards=%s shard_hours=%s",
+        since,
+        until,
+        len(shards),
+        shard_hours,
+    )
+
+    owns_client = client is None
+    if client is None:
+        client = create_client(settings)
+
+    results: list[tuple[datetime, int, List[RawEvent]]] = []
+    bisected = 0
+    try:
+        workers = max(1, settings.open311_max_workers)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending: dict[Future, tuple[Shard, int]] = {}
+
+            def submit(shard: Shard, start_page: int, limit: Optional[int]) -> None:
+                shard_since, shard_until = shard.bounds()
+                future = executor.submit(
+                    fetch_pages,
+                    client,
+                    shard_since,
+                    shard_until,
+                    settings,
+                    start_page,
+                    limit,
+                )
+                pending[future] = (shard, start_page)
+
+            for shard in shards:
+                submit(shard, 1, max_pages)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    shard, start_page = pending.pop(future)
+                    events, truncated = future.result()
+                    results.append((shard.start, start_page, events))
+                    if not truncated:
+                        continue
+
+                    halves = shard.bisect(min_span) if start_page == 1 else None
+                    if halves is not None:
+                        bisected += 1
+                        for half in halves:
+                            submit(half, 1, max_pages)
+                    else:
+                        submit(shard, start_page + max_pages, None)
+    finally:
+        if owns_client:
+            client.close()
+
+    events_by_id: dict[str, RawEvent] = {}
+    missing_id_events: List[RawEvent] = []
+    for _, _, events in sorted(results, key=lambda item: (item[0], item[1])):
+        for event in events:
+            if not event.service_request_id:
+                missing_id_events.append(event)
+                continue
+            events_by_id.setdefault(event.service_request_id, event)
+
+    merged = list(events_by_id.values()) + missing_id_events
+    logger.info(
+        "fetch_sharded.complete count=%s shards=%s bisected=%s",
+        len(merged),
+        len(shards),
+        bisected,
+    )
+    return merged
+
+
+def _parse_bound(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _format_bound(value: datetime) -> str:
+    if value.hour == 0 and value.minute == 0 and value.second == 0:
+        return value.date().isoformat()
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
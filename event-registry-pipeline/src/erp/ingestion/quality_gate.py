@@ -3,38 +3,74 @@
 from __future__ import annotations
 
 import csv
-from dataclasses import dataclass
+import multiprocessing
+import zlib
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional, Protocol
+from typing import Any, List, Optional, Protocol, Sequence
 
 from erp.config import Settings
+from erp.ingestion import columnar
+from erp.ingestion.near_duplicate import (
+    NearDuplicateEntry,
+    NearDuplicateIndex,
+    NearDuplicateMatch,
+    band_hashes,
+    best_match,
+    minhash_signature,
+)
 from erp.models import AcceptDecision, CanonicalEvent, RawEvent, RejectDecision
-from erp.utils.text import extract_media_path, is_link_only, normalize_for_dedupe
+from erp.utils.geo import distance_meters, grid_cell, neighbour_cells
+from erp.utils.hashing import dedupe_key, payload_hash
+from erp.utils.text import NormalizedText, extract_media_path, normalize_for_dedupe
 from erp.utils.time import parse_requested_at, parse_service_request_id
 
 
 PROJECT_ROOT = Path(__file__).resolve().parents[3]
 DATA_PATH = PROJECT_ROOT / "data" / "sags_uns_categories_3level.csv"
-
-SPAM_TERMS = {
-    "test",
-    "asdf",
-    "asdfasdf",
-    "qwerty",
-    "1234",
-}
+# Smallest batch the runners hand to QualityGate.evaluate_parallel; below it
+# pickling events to worker processes costs more than it saves.
+PARALLEL_MIN_EVENTS = 2000
+# Bump whenever a gate rule changes, so change capture gates seen events again.
+GATE_VERSION = 1
+# Settings that can change a gate decision (see gate_fingerprint).
+_GATE_SETTINGS = (
+    "duplicate_window_hours",
+    "duplicate_coord_precision",
+    "duplicate_radius_meters",
+    "duplicate_require_address",
+    "duplicate_require_service_name",
+    "link_only_min_chars",
+    "near_duplicate_enabled",
+    "near_duplicate_threshold",
+    "near_duplicate_num_perm",
+    "near_duplicate_bands",
+    "near_duplicate_window_hours",
+    "near_duplicate_max_distance_meters",
+)
 
 
 @dataclass(frozen=True)
 class DuplicateKey:
-    """Key for strict duplicate detection."""
+    """Key for strict duplicate detection.
+
+    Coordinates match either by rounding (``lat_round``/``lon_round``) or, with
+    DUPLICATE_RADIUS_METERS, by grid ``cell`` plus a distance check on
+    ``lat``/``lon``; the unused pair is None.
+    """
 
     description: str
-    lat_round: float
-    lon_round: float
+    lat_round: Optional[float]
+    lon_round: Optional[float]
     service_name: Optional[str]
     address_string: Optional[str]
+    # Persisted `events.dedupe_key` (see erp.utils.hashing.dedupe_key); derived, not compared.
+    dedupe_key: Optional[str] = field(default=None, compare=False)
+    cell: Optional[tuple[int, int]] = None
+    lat: Optional[float] = field(default=None, compare=False)
+    lon: Optional[float] = field(default=None, compare=False)
 
 
 @dataclass
@@ -43,13 +79,177 @@ class DuplicateEntry:
 
     service_request_id: str
     requested_at: datetime
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class StoredDuplicate:
+    """Duplicate-relevant columns of an `events` row, for warm-loading the index."""
+
+    service_request_id: str
+    requested_at: datetime
+    description: str
+    lat: float
+    lon: float
+    service_name: Optional[str]
+    address_string: Optional[str]
+
+
+class DuplicateIndex:
+    """In-memory strict-duplicate index over a sliding time window.
+
+    Entries live in buckets one window wide, keyed by ``requested_at``.
+    :meth:`advance` moves the high-water mark of the evaluated stream and drops
+    buckets that end more than one window behind it, so the index holds about
+    two windows of events however long the run is. ``horizon`` is the oldest
+    time that is still guaranteed to be complete.
+
+    With ``radius_meters`` keys carry a grid cell; :meth:`find` probes the
+    neighbouring cells and keeps entries within the radius.
+    """
+
+    def __init__(self, window: timedelta, radius_meters: float = 0.0) -> None:
+        self.window = window
+        self.radius_meters = radius_meters
+        self._width = max(window.total_seconds(), 1.0)
+        self._buckets: dict[int, dict[DuplicateKey, list[DuplicateEntry]]] = {}
+        self.high_water: Optional[datetime] = None
+        self.horizon: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return sum(
+            len(entries) for bucket in self._buckets.values() for entries in bucket.values()
+        )
+
+    def find(
+        self,
+        key: DuplicateKey,
+        requested_at: datetime,
+        service_request_id: Optional[str] = None,
+    ) -> Optional[str]:
+        keys = [key]
+        if key.cell is not None and key.lat is not None and key.lon is not None:
+            keys = [
+                replace(key, cell=cell)
+                for cell in neighbour_cells(key.lat, key.lon, self.radius_meters)
+            ]
+        bucket_no = self._bucket(requested_at)
+        for offset in (0, -1, 1):
+            bucket = self._buckets.get(bucket_no + offset, {})
+            for probe_key in keys:
+                for entry in bucket.get(probe_key, []):
+                    if entry.service_request_id == service_request_id:
+                        continue
+                    if abs(requested_at - entry.requested_at) > self.window:
+                        continue
+                    if probe_key.cell is not None and not self._within_radius(key, entry):
+                        continue
+                    return entry.service_request_id
+        return None
+
+    def add(self, key: DuplicateKey, entry: DuplicateEntry) -> None:
+        if self.horizon is not None and entry.requested_at < self.horizon:
+            return
+        entries = self._buckets.setdefault(self._bucket(entry.requested_at), {}).setdefault(
+            key, []
+        )
+        if any(known.service_request_id == entry.service_request_id for known in entries):
+            return
+        entries.append(entry)
+
+    def advance(self, requested_at: datetime) -> None:
+        if self.high_water is not None and requested_at <= self.high_water:
+            return
+        self.high_water = requested_at
+        cutoff = self._bucket(self.high_water - self.window)
+        stale = [bucket_no for bucket_no in self._buckets if bucket_no < cutoff]
+        for bucket_no in stale:
+            del self._buckets[bucket_no]
+        if stale:
+            horizon = datetime.fromtimestamp(cutoff * self._width, tz=self.high_water.tzinfo)
+            if self.horizon is None or horizon > self.horizon:
+                self.horizon = horizon
+
+    def _bucket(self, value: datetime) -> int:
+        return int(value.timestamp() // self._width)
+
+    def _within_radius(self, key: DuplicateKey, entry: DuplicateEntry) -> bool:
+        if key.lat is None or key.lon is None or entry.lat is None or entry.lon is None:
+            return False
+        return distance_meters(key.lat, key.lon, entry.lat, entry.lon) <= self.radius_meters
+
+
+@dataclass
+class StructuralFields:
+    """Parsed values of an event that passed every structural rule.
+
+    ``service_request_id``, ``lat``, ``lon`` and ``service_name`` are the
+    validated (non-None) raw values. ``coord_keys`` are the batch-computed
+    ``erp.utils.hashing.coord_key`` strings for ``(lat, lon)``; None means
+    compute them per event.
+    """
+
+    service_request_id: str
+    requested_at: datetime
+    lat: float
+    lon: float
+    service_name: str
+    year: int
+    sequence: int
+    status: str
+    coord_keys: Optional[tuple[str, str]] = None
+
+
+@dataclass
+class _CheckedEvent:
+    """An event that passed the field checks, before the duplicate step."""
+
+    raw_event: RawEvent
+    service_request_id: str
+    service_name: str
+    requested_at: datetime
+    year: int
+    sequence: int
+    status: str
+    text: NormalizedText
+    probe: Optional[DuplicateProbe]
+    near_probe: Optional[NearDuplicateEntry] = None
+
+
+@dataclass(frozen=True)
+class DuplicateProbe:
+    """One event to look up in a batched duplicate check."""
+
+    key: DuplicateKey
+    requested_at: datetime
+    service_request_id: Optional[str] = None
 
 
 class DuplicateChecker(Protocol):
     """Protocol for checking duplicates against the database."""
 
-    def find_duplicate(self, key: DuplicateKey, requested_at: datetime) -> Optional[str]:
-        """Return existing service_request_id if duplicate is found."""
+    def find_duplicate(
+        self,
+        key: DuplicateKey,
+        requested_at: datetime,
+        service_request_id: Optional[str] = None,
+    ) -> Optional[str]:
+        """Return existing service_request_id if duplicate is found.
+
+        ``service_request_id`` is the probed event itself and never matches.
+        """
+
+    def find_duplicates(self, probes: Sequence[DuplicateProbe]) -> dict[DuplicateProbe, str]:
+        """Look up many probes at once; only probes with a duplicate are returned."""
+
+    def load_range(self, start: datetime, end: datetime) -> List[StoredDuplicate]:
+        """Return described events with ``start <= requested_at <= end``."""
+
+    def find_near_candidates(
+        self, probes: Sequence[NearDuplicateEntry]
+    ) -> dict[NearDuplicateEntry, List[NearDuplicateEntry]]:
+        """Return stored signatures sharing an LSH band with each probe."""
 
 
 def load_category_map(csv_path: Path = DATA_PATH) -> dict[str, dict[str, Optional[str]]]:
@@ -78,6 +278,24 @@ def load_category_map(csv_path: Path = DATA_PATH) -> dict[str, dict[str, Optiona
     return mapping
 
 
+def gate_fingerprint(
+    settings: Settings, category_map: dict[str, dict[str, Optional[str]]]
+) -> str:
+    """SHA-256 over everything besides the payload that decides a gate outcome.
+
+    Covers GATE_VERSION, the gate settings and the category map; change
+    capture stores it next to the payload hash (see
+    :mod:`erp.ingestion.change_capture`).
+    """
+    return payload_hash(
+        {
+            "version": GATE_VERSION,
+            "settings": {name: getattr(settings, name) for name in _GATE_SETTINGS},
+            "category_map": category_map,
+        }
+    )
+
+
 class QualityGate:
     """Evaluate raw events and enforce ingestion rules."""
 
@@ -86,14 +304,235 @@ class QualityGate:
         settings: Optional[Settings] = None,
         category_map: Optional[dict[str, dict[str, Optional[str]]]] = None,
         duplicate_checker: Optional[DuplicateChecker] = None,
+        warm_index: bool = False,
     ) -> None:
+        """``warm_index`` lets :meth:`evaluate_batch` preload the duplicate index
+        from ``duplicate_checker.load_range`` and skip per-event DB lookups."""
         self.settings = settings or Settings()
         self.category_map = category_map or load_category_map()
+        self.fingerprint = gate_fingerprint(self.settings, self.category_map)
         self.duplicate_checker = duplicate_checker
-        self._seen: dict[DuplicateKey, list[DuplicateEntry]] = {}
+        self.warm_index = warm_index
+        self._index = DuplicateIndex(
+            timedelta(hours=self.settings.duplicate_window_hours),
+            radius_meters=self.settings.duplicate_radius_meters,
+        )
+        self._loaded: Optional[tuple[datetime, datetime]] = None
+        self._near_index = NearDuplicateIndex(
+            timedelta(hours=self.settings.near_duplicate_window_hours),
+            bands=self.settings.near_duplicate_bands,
+        )
 
     def evaluate(self, raw_event: RawEvent) -> AcceptDecision | RejectDecision:
         """Evaluate a raw event and return accept/reject decision."""
+        checked = self._check_fields(raw_event)
+        if isinstance(checked, RejectDecision):
+            return checked
+
+        duplicate_id = self._check_duplicate(checked)
+        near_match = None
+        if duplicate_id is None:
+            near_match = self._check_near_duplicates([checked])[0]
+        self._advance([checked])
+        return self._decide(checked, duplicate_id, near_match)
+
+    def evaluate_batch(
+        self, raw_events: Sequence[RawEvent]
+    ) -> List[AcceptDecision | RejectDecision]:
+        """Evaluate events in order with one batched database duplicate lookup.
+
+        Decisions are identical to calling :meth:`evaluate` on each event in
+        turn: the database is only read, and in-run duplicates still resolve
+        against earlier events of the batch first. With ``warm_index`` the
+        ``[min - window, max + window]`` range of the batch is loaded into the
+        index once (only the part not loaded yet), and probes it fully covers
+        need no database lookup. With NumPy installed, batches of at least
+        ``columnar.COLUMNAR_MIN_BATCH`` events round their dedupe-key
+        coordinates column-wise (see :mod:`erp.ingestion.columnar`).
+        """
+        checked_events = self._check_all_fields(raw_events)
+        duplicate_ids = self._find_strict_duplicates(checked_events)
+
+        unique = [
+            checked
+            for checked, duplicate_id in zip(checked_events, duplicate_ids)
+            if isinstance(checked, _CheckedEvent) and duplicate_id is None
+        ]
+        near_matches = iter(self._check_near_duplicates(unique))
+
+        decisions: List[AcceptDecision | RejectDecision] = []
+        for checked, duplicate_id in zip(checked_events, duplicate_ids):
+            if isinstance(checked, RejectDecision):
+                decisions.append(checked)
+            elif duplicate_id is None:
+                decisions.append(self._decide(checked, None, next(near_matches)))
+            else:
+                decisions.append(self._decide(checked, duplicate_id))
+
+        # Evict only between batches so probes judged warm above stay covered.
+        self._advance([checked for checked in checked_events if isinstance(checked, _CheckedEvent)])
+        return decisions
+
+    def evaluate_parallel(
+        self,
+        raw_events: Sequence[RawEvent],
+        workers: int,
+        executor: Optional[Executor] = None,
+    ) -> List[AcceptDecision | RejectDecision]:
+        """Evaluate a batch on ``workers`` processes; same decisions as :meth:`evaluate_batch`.
+
+        Events are sharded by a hash of their normalized description, which
+        every strict-duplicate key contains, so in-run duplicates and the
+        stored rows they can match land in the same shard. Each shard runs
+        in order on a fresh gate whose index is preloaded with the database
+        rows of the batch range (as ``warm_index`` would load them), so the
+        first-seen winner is the one sequential evaluation picks. Near-duplicates
+        cross descriptions and are resolved afterwards here, in batch order.
+
+        Only for a fresh gate: in-run entries stay in the workers, so later
+        batches would not see them. ``executor`` defaults to a new
+        :func:`gate_executor`.
+        """
+        if self._loaded is not None or self._index.high_water is not None:
+            raise ValueError("evaluate_parallel needs a gate that has not evaluated events yet")
+        workers = max(1, workers)
+        shard_events: List[List[int]] = [[] for _ in range(workers)]
+        for position, raw_event in enumerate(raw_events):
+            shard_events[_shard(raw_event.description, position, workers)].append(position)
+        shard_rows: List[List[StoredDuplicate]] = [[] for _ in range(workers)]
+        for row in self._stored_rows(raw_events):
+            shard_rows[_shard(row.description, 0, workers)].append(row)
+
+        own_executor = executor is None
+        executor = executor or gate_executor(workers)
+        try:
+            futures = [
+                (
+                    positions,
+                    executor.submit(
+                        _evaluate_shard,
+                        self.settings,
+                        self.category_map,
+                        rows,
+                        # Field dicts without the payload pickle several times
+                        # faster than the models.
+                        [{**vars(raw_events[position]), "payload": {}} for position in positions],
+                    ),
+                )
+                for positions, rows in zip(shard_events, shard_rows)
+                if positions
+            ]
+            outcomes: dict[int, _ShardOutcome] = {}
+            for positions, future in futures:
+                outcomes.update(zip(positions, future.result()))
+        finally:
+            if own_executor:
+                executor.shutdown()
+
+        near_pending = [
+            replace(outcome, raw_event=raw_events[position])
+            for position, outcome in sorted(outcomes.items())
+            if isinstance(outcome, _CheckedEvent)
+        ]
+        near_matches = iter(self._check_near_duplicates(near_pending))
+        pending = iter(near_pending)
+
+        decisions: List[AcceptDecision | RejectDecision] = []
+        for position, raw_event in enumerate(raw_events):
+            outcome = outcomes[position]
+            if isinstance(outcome, _CheckedEvent):
+                decisions.append(self._decide(next(pending), None, next(near_matches)))
+            elif isinstance(outcome, _ShardReject):
+                decisions.append(
+                    RejectDecision(
+                        raw_event=raw_event, reason=outcome.reason, details=outcome.details
+                    )
+                )
+            else:
+                decisions.append(
+                    AcceptDecision(
+                        raw_event=raw_event,
+                        normalized=outcome.normalized,
+                        review_reason=outcome.review_reason,
+                        review_details=outcome.review_details,
+                    )
+                )
+        return decisions
+
+    def _find_strict_duplicates(
+        self, checked_events: Sequence["_CheckedEvent | RejectDecision"]
+    ) -> List[Optional[str]]:
+        """Resolve strict duplicates in order, remembering first-seen events."""
+        known: dict[DuplicateProbe, str] = {}
+        if self.duplicate_checker:
+            probes = [
+                checked.probe
+                for checked in checked_events
+                if isinstance(checked, _CheckedEvent) and checked.probe is not None
+            ]
+            if probes and self.warm_index:
+                self._warm(probes)
+                probes = [probe for probe in probes if not self._is_warm(probe.requested_at)]
+            if probes:
+                known = self.duplicate_checker.find_duplicates(probes)
+
+        duplicate_ids: List[Optional[str]] = []
+        for checked in checked_events:
+            duplicate_id = None
+            if isinstance(checked, _CheckedEvent) and checked.probe is not None:
+                duplicate_id = self._find_seen(checked) or known.get(checked.probe)
+                if duplicate_id is None:
+                    self._remember(checked)
+            duplicate_ids.append(duplicate_id)
+        return duplicate_ids
+
+    def _check_near_duplicates(
+        self, checked_events: Sequence["_CheckedEvent"]
+    ) -> List[Optional[NearDuplicateMatch]]:
+        """Near-duplicate matches, in order, for events that are not strict duplicates."""
+        probes = [checked.near_probe for checked in checked_events if checked.near_probe]
+        stored: dict[NearDuplicateEntry, List[NearDuplicateEntry]] = {}
+        if probes and self.duplicate_checker:
+            stored = self.duplicate_checker.find_near_candidates(probes)
+        return [
+            self._check_near_duplicate(checked.near_probe, stored.get(checked.near_probe, []))
+            if checked.near_probe is not None
+            else None
+            for checked in checked_events
+        ]
+
+    def _check_fields(self, raw_event: RawEvent) -> "_CheckedEvent | RejectDecision":
+        fields = self._check_structure(raw_event)
+        if isinstance(fields, RejectDecision):
+            return fields
+        return self._check_content(raw_event, fields)
+
+    def _check_all_fields(
+        self, raw_events: Sequence[RawEvent]
+    ) -> List["_CheckedEvent | RejectDecision"]:
+        if not columnar.HAS_NUMPY or len(raw_events) < columnar.COLUMNAR_MIN_BATCH:
+            return [self._check_fields(raw_event) for raw_event in raw_events]
+        structures = [self._check_structure(raw_event) for raw_event in raw_events]
+        passed = [
+            (raw_event, fields)
+            for raw_event, fields in zip(raw_events, structures)
+            if isinstance(fields, StructuralFields)
+        ]
+        # Structural rules guarantee both coordinates are set and in range.
+        keys = columnar.coord_key_pairs(
+            [float(raw_event.lat or 0.0) for raw_event, _ in passed],
+            [float(raw_event.lon or 0.0) for raw_event, _ in passed],
+        )
+        for (_, fields), coord_keys in zip(passed, keys):
+            fields.coord_keys = coord_keys
+        return [
+            fields
+            if isinstance(fields, RejectDecision)
+            else self._check_content(raw_event, fields)
+            for raw_event, fields in zip(raw_events, structures)
+        ]
+
+    def _check_structure(self, raw_event: RawEvent) -> StructuralFields | RejectDecision:
         if not raw_event.service_request_id:
             return RejectDecision(raw_event=raw_event, reason="missing_service_request_id")
 
@@ -129,73 +568,140 @@ class QualityGate:
         if status not in {"open", "closed"}:
             return RejectDecision(raw_event=raw_event, reason="invalid_status")
 
-        category = self.category_map.get(raw_event.service_name)
+        return StructuralFields(
+            service_request_id=raw_event.service_request_id,
+            requested_at=requested_at,
+            lat=raw_event.lat,
+            lon=raw_event.lon,
+            service_name=raw_event.service_name,
+            year=year,
+            sequence=sequence,
+            status=status,
+        )
+
+    def _check_content(
+        self, raw_event: RawEvent, fields: StructuralFields
+    ) -> "_CheckedEvent | RejectDecision":
+        requested_at = fields.requested_at
+        text = NormalizedText.from_text(
+            raw_event.description,
+            title=raw_event.title,
+            link_only_min_chars=self.settings.link_only_min_chars,
+        )
+        probe = None
+        near_probe = None
+        if text.has_text:
+            if text.spam:
+                return RejectDecision(raw_event=raw_event, reason="spam_text")
+            probe = DuplicateProbe(
+                key=self._build_duplicate_key(raw_event, text, fields.coord_keys),
+                requested_at=requested_at,
+                service_request_id=raw_event.service_request_id,
+            )
+            if self.settings.near_duplicate_enabled and not text.link_only:
+                near_probe = NearDuplicateEntry(
+                    service_request_id=fields.service_request_id,
+                    requested_at=requested_at,
+                    lat=fields.lat,
+                    lon=fields.lon,
+                    service_name=raw_event.service_name,
+                    signature=minhash_signature(
+                        text.dedupe,
+                        num_perm=self.settings.near_duplicate_num_perm,
+                        normalized=True,
+                    ),
+                )
+
+        return _CheckedEvent(
+            raw_event=raw_event,
+            service_request_id=fields.service_request_id,
+            service_name=fields.service_name,
+            requested_at=requested_at,
+            year=fields.year,
+            sequence=fields.sequence,
+            status=fields.status,
+            text=text,
+            probe=probe,
+            near_probe=near_probe,
+        )
+
+    def _decide(
+        self,
+        checked: "_CheckedEvent",
+        duplicate_id: Optional[str],
+        near_match: Optional[NearDuplicateMatch] = None,
+    ) -> AcceptDecision | RejectDecision:
+        raw_event = checked.raw_event
+        if duplicate_id:
+            return RejectDecision(
+                raw_event=raw_event,
+                reason="duplicate_strict",
+                details={
+                    "duplicate_of": duplicate_id,
+                    "window_hours": self.settings.duplicate_window_hours,
+                    "coord_precision": self.settings.duplicate_coord_precision,
+                    "radius_meters": self.settings.duplicate_radius_meters or None,
+                },
+            )
+
+        category = self.category_map.get(checked.service_name)
         review_reason = None
         review_details: dict[str, object] = {}
         if category is None:
             category = {
                 "category": "Unmapped",
-                "subcategory": raw_event.service_name,
+                "subcategory": checked.service_name,
                 "subcategory2": None,
             }
             review_reason = "unmapped_service_name"
-            review_details = {"service_name": raw_event.service_name, "accepted": True}
+            review_details = {"service_name": checked.service_name, "accepted": True}
+        elif near_match is not None:
+            review_reason = "near_duplicate"
+            review_details = {
+                "near_duplicate_of": near_match.service_request_id,
+                "similarity": round(near_match.similarity, 3),
+                "accepted": True,
+            }
 
         description = raw_event.description or ""
-        has_description = bool(description.strip())
-        link_only = has_description and is_link_only(
-            description, min_chars=self.settings.link_only_min_chars
-        )
+        has_description = checked.text.has_text
+        link_only = checked.text.link_only
         media_path = extract_media_path(raw_event.media_url)
         has_media = bool(media_path)
         skip_llm = (not has_description) or link_only
 
-        if has_description:
-            normalized = normalize_for_dedupe(description)
-            if normalized in SPAM_TERMS:
-                return RejectDecision(raw_event=raw_event, reason="spam_text")
-
-        if has_description:
-            duplicate_id = self._check_duplicate(
-                raw_event,
-                requested_at=requested_at,
-                description=description,
-            )
-            if duplicate_id:
-                return RejectDecision(
-                    raw_event=raw_event,
-                    reason="duplicate_strict",
-                    details={
-                        "duplicate_of": duplicate_id,
-                        "window_hours": self.settings.duplicate_window_hours,
-                        "coord_precision": self.settings.duplicate_coord_precision,
-                    },
-                )
-
         description_redacted = description if has_description else None
         canonical = CanonicalEvent(
-            service_request_id=raw_event.service_request_id,
+            service_request_id=checked.service_request_id,
             title=raw_event.title,
             description=raw_event.description,
             description_redacted=description_redacted,
-            requested_at=requested_at,
-            status=status,
+            requested_at=checked.requested_at,
+            status=checked.status,
             lat=raw_event.lat,
             lon=raw_event.lon,
             address_string=raw_event.address_string,
-            service_name=raw_event.service_name,
+            service_name=checked.service_name,
             category=category["category"],
             subcategory=category["subcategory"],
             subcategory2=category["subcategory2"],
             media_path=media_path,
-            year=year,
-            sequence_number=sequence,
+            year=checked.year,
+            sequence_number=checked.sequence,
             has_description=has_description,
             has_media=has_media,
             skip_llm=skip_llm,
             is_link_only=link_only,
             is_flagged_abuse=False,
+            dedupe_key=checked.probe.key.dedupe_key if checked.probe else None,
+            near_duplicate_of=near_match.service_request_id if near_match else None,
         )
+        near_probe = checked.near_probe
+        if near_probe is not None:
+            canonical.minhash_signature = list(near_probe.signature)
+            canonical.minhash_bands = band_hashes(
+                near_probe.signature, self.settings.near_duplicate_bands
+            )
 
         return AcceptDecision(
             raw_event=raw_event,
@@ -204,50 +710,239 @@ class QualityGate:
             review_details=review_details,
         )
 
-    def _check_duplicate(
-        self,
-        raw_event: RawEvent,
-        requested_at: datetime,
-        description: str,
-    ) -> Optional[str]:
-        key = self._build_duplicate_key(raw_event, description)
-        window = timedelta(hours=self.settings.duplicate_window_hours)
+    def _check_duplicate(self, checked: "_CheckedEvent") -> Optional[str]:
+        probe = checked.probe
+        if probe is None:
+            return None
 
-        for entry in self._seen.get(key, []):
-            if abs(requested_at - entry.requested_at) <= window:
-                return entry.service_request_id
+        duplicate_id = self._find_seen(checked)
+        if duplicate_id:
+            return duplicate_id
 
         if self.duplicate_checker:
-            duplicate_id = self.duplicate_checker.find_duplicate(key, requested_at)
+            duplicate_id = self.duplicate_checker.find_duplicate(
+                probe.key, probe.requested_at, probe.service_request_id
+            )
             if duplicate_id:
                 return duplicate_id
 
-        self._seen.setdefault(key, []).append(
-            DuplicateEntry(
-                service_request_id=raw_event.service_request_id,
-                requested_at=requested_at,
-            )
-        )
+        self._remember(checked)
         return None
 
-    def _build_duplicate_key(self, raw_event: RawEvent, description: str) -> DuplicateKey:
-        precision = self.settings.duplicate_coord_precision
-        service_name = (
-            raw_event.service_name if self.settings.duplicate_require_service_name else None
+    def _check_near_duplicate(
+        self,
+        probe: NearDuplicateEntry,
+        stored: Sequence[NearDuplicateEntry],
+    ) -> Optional[NearDuplicateMatch]:
+        match = best_match(
+            probe,
+            [*self._near_index.candidates(probe), *stored],
+            threshold=self.settings.near_duplicate_threshold,
+            window=self._near_index.window,
+            max_distance_meters=self.settings.near_duplicate_max_distance_meters,
+            require_service_name=self.settings.duplicate_require_service_name,
         )
-        address_string = (
-            raw_event.address_string if self.settings.duplicate_require_address else None
+        self._near_index.add(probe)
+        return match
+
+    def _advance(self, checked_events: Sequence["_CheckedEvent"]) -> None:
+        times = [checked.probe.requested_at for checked in checked_events if checked.probe]
+        if times:
+            self._index.advance(max(times))
+            self._near_index.advance(max(times))
+
+    def _find_seen(self, checked: "_CheckedEvent") -> Optional[str]:
+        probe = checked.probe
+        if probe is None:
+            return None
+        return self._index.find(probe.key, probe.requested_at, probe.service_request_id)
+
+    def _remember(self, checked: "_CheckedEvent") -> None:
+        probe = checked.probe
+        if probe is None:
+            return
+        self._index.add(
+            probe.key,
+            DuplicateEntry(
+                service_request_id=checked.raw_event.service_request_id,
+                requested_at=probe.requested_at,
+                lat=probe.key.lat,
+                lon=probe.key.lon,
+            ),
         )
 
+    def _warm(self, probes: Sequence[DuplicateProbe]) -> None:
+        if self.duplicate_checker is None:
+            return
+        window = self._index.window
+        start = min(probe.requested_at for probe in probes) - window
+        end = max(probe.requested_at for probe in probes) + window
+
+        if self._loaded is None or end < self._loaded[0] or start > self._loaded[1]:
+            ranges = [(start, end)]
+            self._loaded = (start, end)
+        else:
+            ranges = []
+            if start < self._loaded[0]:
+                ranges.append((start, self._loaded[0]))
+            if end > self._loaded[1]:
+                ranges.append((self._loaded[1], end))
+            self._loaded = (min(start, self._loaded[0]), max(end, self._loaded[1]))
+
+        for range_start, range_end in ranges:
+            self._index_stored(self.duplicate_checker.load_range(range_start, range_end))
+
+    def _index_stored(self, rows: Sequence[StoredDuplicate]) -> None:
+        for row in rows:
+            if not row.description.strip():
+                continue
+            key = self._duplicate_key(
+                normalize_for_dedupe(row.description),
+                row.lat,
+                row.lon,
+                row.service_name,
+                row.address_string,
+            )
+            self._index.add(
+                key,
+                DuplicateEntry(row.service_request_id, row.requested_at, row.lat, row.lon),
+            )
+
+    def _stored_rows(self, raw_events: Sequence[RawEvent]) -> List[StoredDuplicate]:
+        """Stored rows a batch's strict duplicate probes can match (see :meth:`_warm`)."""
+        if self.duplicate_checker is None:
+            return []
+        times = [
+            requested_at
+            for raw_event in raw_events
+            if (raw_event.description or "").strip()
+            and (requested_at := parse_requested_at(raw_event.requested_datetime or ""))
+        ]
+        if not times:
+            return []
+        window = self._index.window
+        return self.duplicate_checker.load_range(min(times) - window, max(times) + window)
+
+    def _is_warm(self, requested_at: datetime) -> bool:
+        if self._loaded is None:
+            return False
+        window = self._index.window
+        if self._index.horizon is not None and requested_at - window < self._index.horizon:
+            return False
+        return self._loaded[0] <= requested_at - window and requested_at + window <= self._loaded[1]
+
+    def _build_duplicate_key(
+        self,
+        raw_event: RawEvent,
+        text: NormalizedText,
+        coord_keys: Optional[tuple[str, str]] = None,
+    ) -> DuplicateKey:
+        return self._duplicate_key(
+            text.dedupe,
+            raw_event.lat or 0.0,
+            raw_event.lon or 0.0,
+            raw_event.service_name,
+            raw_event.address_string,
+            coord_keys=coord_keys,
+        )
+
+    def _duplicate_key(
+        self,
+        normalized_description: str,
+        lat: float,
+        lon: float,
+        service_name: Optional[str],
+        address_string: Optional[str],
+        coord_keys: Optional[tuple[str, str]] = None,
+    ) -> DuplicateKey:
+        precision = self.settings.duplicate_coord_precision
+        radius = self.settings.duplicate_radius_meters
         return DuplicateKey(
-            description=normalize_for_dedupe(description),
-            lat_round=round(raw_event.lat or 0.0, precision),
-            lon_round=round(raw_event.lon or 0.0, precision),
-            service_name=service_name,
-            address_string=address_string,
+            description=normalized_description,
+            lat_round=None if radius > 0 else round(lat, precision),
+            lon_round=None if radius > 0 else round(lon, precision),
+            service_name=service_name if self.settings.duplicate_require_service_name else None,
+            address_string=address_string if self.settings.duplicate_require_address else None,
+            dedupe_key=dedupe_key(
+                normalized_description, lat, lon, normalized=True, coord_keys=coord_keys
+            ),
+            cell=grid_cell(lat, lon, radius) if radius > 0 else None,
+            lat=lat,
+            lon=lon,
         )
 
 
+def gate_executor(workers: int) -> ProcessPoolExecutor:
+    """Process pool for :meth:`QualityGate.evaluate_parallel`.
+
+    Uses ``spawn`` so workers never inherit open database connections or
+    fetcher threads from the parent.
+    """
+    return ProcessPoolExecutor(
+        max_workers=max(1, workers), mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def _shard(description: Optional[str], position: int, shards: int) -> int:
+    """Shard of an event or stored row: by normalized description, else round-robin."""
+    text = description or ""
+    if not text.strip():
+        return position % shards
+    return zlib.crc32(normalize_for_dedupe(text).encode("utf-8")) % shards
+
+
+@dataclass(frozen=True)
+class _ShardReject:
+    """Worker result of a rejected event (the raw event stays in the parent)."""
+
+    reason: str
+    details: dict[str, Any]
+
+
+@dataclass(frozen=True)
+class _ShardAccept:
+    """Worker result of an accepted event (the raw event stays in the parent)."""
+
+    normalized: Optional[CanonicalEvent]
+    review_reason: Optional[str]
+    review_details: dict[str, Any]
+
+
+# Worker result per event; a checked event still needs the near-duplicate pass.
+_ShardOutcome = _ShardReject | _ShardAccept | _CheckedEvent
+
+
+def _evaluate_shard(
+    settings: Settings,
+    category_map: dict[str, dict[str, Optional[str]]],
+    stored: List[StoredDuplicate],
+    event_fields: List[dict[str, Any]],
+) -> List[_ShardOutcome]:
+    """Worker side of :meth:`QualityGate.evaluate_parallel`."""
+    gate = QualityGate(settings=settings, category_map=category_map)
+    gate._index_stored(stored)
+    raw_events = [RawEvent.model_construct(**fields) for fields in event_fields]
+    checked_events = gate._check_all_fields(raw_events)
+    duplicate_ids = gate._find_strict_duplicates(checked_events)
+    outcomes: List[_ShardOutcome] = []
+    for checked, duplicate_id in zip(checked_events, duplicate_ids):
+        if isinstance(checked, RejectDecision):
+            outcomes.append(_ShardReject(checked.reason, checked.details))
+        elif duplicate_id is None and checked.near_probe is not None:
+            outcomes.append(checked)
+        else:
+            decision = gate._decide(checked, duplicate_id)
+            if isinstance(decision, RejectDecision):
+                outcomes.append(_ShardReject(decision.reason, decision.details))
+            else:
+                outcomes.append(
+                    _ShardAccept(
+                        decision.normalized, decision.review_reason, decision.review_details
+                    )
+                )
+    return outcomes
+
+
 _DEFAULT_GATE: Optional[QualityGate] = None
 
 
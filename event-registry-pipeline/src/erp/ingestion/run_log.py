@@ -2,11 +2,52 @@
 
 from __future__ import annotations
 
-from typing import Optional
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Optional
 
 from psycopg import Cursor
 from psycopg.types.json import Jsonb
 
+from erp.models import CanonicalEvent
+
+
+@dataclass
+class RunCounters:
+    """pipeline_runs metrics accumulated batch by batch."""
+
+    fetched: int = 0
+    staged: int = 0
+    rejected: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    skipped_unchanged: int = 0
+    missing_cache_hits: int = 0
+    missing_cache_misses: int = 0
+    first_accepted: Optional[tuple[int, int, str]] = None  # (year, seq, srid)
+    last_accepted: Optional[tuple[int, int, str]] = None
+    min_accepted_requested_at: Optional[datetime] = None
+    max_accepted_requested_at: Optional[datetime] = None
+
+    def record_accepted(self, events: Iterable[CanonicalEvent]) -> None:
+        for event in events:
+            key = (event.year or 0, event.sequence_number or 0, event.service_request_id)
+            if self.first_accepted is None or key < self.first_accepted:
+                self.first_accepted = key
+            if self.last_accepted is None or key > self.last_accepted:
+                self.last_accepted = key
+
+            requested_at = event.requested_at
+            if requested_at is None:
+                continue
+            earliest = self.min_accepted_requested_at
+            if earliest is None or requested_at < earliest:
+                self.min_accepted_requested_at = requested_at
+            latest = self.max_accepted_requested_at
+            if latest is None or requested_at > latest:
+                self.max_accepted_requested_at = requested_at
+
 
 def create_run(cursor: Cursor, since: str, until: str) -> int:
     cursor.execute(
@@ -17,6 +58,25 @@ def create_run(cursor: Cursor, since: str, until: str) -> int:
     return int(cursor.fetchone()[0])
 
 
+def update_run_progress(cursor: Cursor, run_id: int, counters: RunCounters) -> None:
+    """Persist running counts of a still-running (streaming) run."""
+    cursor.execute(
+        "update pipeline_runs set fetched_count = %s, staged_count = %s, "
+        "rejected_count = %s, inserted_count = %s, updated_count = %s, unchanged_count = %s, "
+        "skipped_unchanged_count = %s where run_id = %s",
+        (
+            counters.fetched,
+            counters.staged,
+            counters.rejected,
+            counters.inserted,
+            counters.updated,
+            counters.unchanged,
+            counters.skipped_unchanged,
+            run_id,
+        ),
+    )
+
+
 def complete_run_success(
     cursor: Cursor,
     run_id: int,
@@ -29,13 +89,19 @@ def complete_run_success(
     last_accepted_service_request_id: str | None = None,
     min_accepted_requested_at: object | None = None,
     max_accepted_requested_at: object | None = None,
+    missing_cache_hit_count: int = 0,
+    missing_cache_miss_count: int = 0,
+    unchanged_count: int = 0,
+    skipped_unchanged_count: int = 0,
 ) -> None:
     cursor.execute(
         "update pipeline_runs set status = 'success', finished_at = now(), "
         "fetched_count = %s, staged_count = %s, rejected_count = %s, "
-        "inserted_count = %s, updated_count = %s, "
+        "inserted_count = %s, updated_count = %s, unchanged_count = %s, "
+        "skipped_unchanged_count = %s, "
         "first_accepted_service_request_id = %s, last_accepted_service_request_id = %s, "
-        "min_accepted_requested_at = %s, max_accepted_requested_at = %s "
+        "min_accepted_requested_at = %s, max_accepted_requested_at = %s, "
+        "missing_cache_hit_count = %s, missing_cache_miss_count = %s "
         "where run_id = %s",
         (
             fetched_count,
@@ -43,15 +109,43 @@ def complete_run_success(
             rejected_count,
             inserted_count,
             updated_count,
+            unchanged_count,
+            skipped_unchanged_count,
             first_accepted_service_request_id,
             last_accepted_service_request_id,
             min_accepted_requested_at,
             max_accepted_requested_at,
+            missing_cache_hit_count,
+            missing_cache_miss_count,
             run_id,
         ),
     )
 
 
+def complete_run_with_counters(cursor: Cursor, run_id: int, counters: RunCounters) -> None:
+    complete_run_success(
+        cursor,
+        run_id,
+        fetched_count=counters.fetched,
+        staged_count=counters.staged,
+        rejected_count=counters.rejected,
+        inserted_count=counters.inserted,
+        updated_count=counters.updated,
+        first_accepted_service_request_id=(
+            counters.first_accepted[2] if counters.first_accepted else None
+        ),
+        last_accepted_service_request_id=(
+            counters.last_accepted[2] if counters.last_accepted else None
+        ),
+        min_accepted_requested_at=counters.min_accepted_requested_at,
+        max_accepted_requested_at=counters.max_accepted_requested_at,
+        missing_cache_hit_count=counters.missing_cache_hits,
+        missing_cache_miss_count=counters.missing_cache_misses,
+        unchanged_count=counters.unchanged,
+        skipped_unchanged_count=counters.skipped_unchanged,
+    )
+
+
 def complete_run_failed(
     cursor: Cursor,
     run_id: int,
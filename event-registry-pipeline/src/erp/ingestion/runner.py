@@ -4,17 +4,31 @@ from __future__ import annotations
 
 import uuid
 from collections import Counter
-from datetime import datetime, timedelta
-from typing import List
+from datetime import datetime, timedelta, timezone
+from typing import Collection, List
 
 from erp.config import Settings
 from erp.db.client import db_cursor
+from erp.ingestion.coverage import load_coverage
 from erp.ingestion.duplicate_checker import DatabaseDuplicateChecker
-from erp.ingestion.fetch_open311 import fetch_by_id, fetch_window
-from erp.ingestion.incremental import compute_gap_ids, max_sequence_for_year
-from erp.ingestion.quality_gate import QualityGate, load_category_map
-from erp.ingestion.run_log import create_run, complete_run_failed, complete_run_success
-from erp.ingestion.upsert import write_raw, write_rejected, upsert_events
+from erp.ingestion.fetch_open311 import fetch_window
+from erp.ingestion.gap_fill import GapFillStats, fetch_ids, probe_frontier
+from erp.ingestion.incremental import GAP_FILL_MODES, compute_gap_ids, max_sequence_for_year
+from erp.ingestion.missing_cache import filter_due, record_probes
+from erp.ingestion.planner import fetch_sharded
+from erp.ingestion.quality_gate import (
+    QualityGate,
+    load_category_map,
+)
+from erp.ingestion.run_log import (
+    RunCounters,
+    complete_run_failed,
+    complete_run_with_counters,
+    create_run,
+    update_run_progress,
+)
+from erp.ingestion.streaming import stream_batches
+from erp.ingestion.write import gate_events, skip_unchanged, write_decisions
 from erp.models import AcceptDecision, RawEvent, RejectDecision
 from erp.utils.logging import get_logger
 
@@ -28,11 +42,29 @@ def run_ingestion(
     dry_run: bool = False,
     gap_fill_limit: int | None = None,
     enable_gap_fill: bool | None = None,
+    shard_hours: int | None = None,
+    gap_fill_mode: str | None = None,
+    stream: bool = False,
+    gate_workers: int | None = None,
 ) -> None:
-    """Run ingestion for a date window."""
+    """Run ingestion for a date window.
+
+    With ``shard_hours`` the window is fetched as concurrent time shards
+    (see :func:`erp.ingestion.planner.fetch_sharded`). ``gap_fill_mode``
+    overrides INGESTION_GAP_FILL_MODE (see ``GAP_FILL_MODES``). With ``stream``
+    the window is gated and committed in micro-batches as pages arrive instead
+    of being collected first (see :func:`_stream_and_write`). ``gate_workers``
+    overrides INGESTION_GATE_WORKERS; with more than one, a large fetched batch
+    is gated on that many processes (see ``QualityGate.evaluate_parallel``).
+    """
     settings = Settings()
     run_id_db: int | None = None
     run_id_log = str(uuid.uuid4()) if dry_run else "pending"
+    if stream and shard_hours:
+        raise ValueError("stream and shard_hours cannot be combined")
+    if stream and gate_workers and gate_workers > 1:
+        raise ValueError("stream and gate_workers cannot be combined")
+    gate_workers = gate_workers or settings.ingestion_gate_workers
 
     # Apply overlap hours to extend the fetch window backwards
     # This helps catch events that may have been missed at window boundaries
@@ -57,118 +89,309 @@ def run_ingestion(
             run_id_db = create_run(cursor, since, until)
         run_id_log = str(run_id_db)
 
+    counters = RunCounters()
     try:
-        raw_events, missing_ids_404 = _fetch_with_gap_fill(
+        if stream:
+            _stream_and_write(
+                fetch_since,
+                until,
+                settings,
+                run_id_db,
+                run_id_log,
+                dry_run,
+                counters,
+                gap_fill_limit=gap_fill_limit,
+                enable_gap_fill=enable_gap_fill,
+                gap_fill_mode=gap_fill_mode,
+            )
+            return
+
+        raw_events, gap_fill_stats = _fetch_with_gap_fill(
             fetch_since,
             until,
             settings,
             dry_run=dry_run,
             gap_fill_limit=gap_fill_limit,
             enable_gap_fill=enable_gap_fill,
+            shard_hours=shard_hours,
+            gap_fill_mode=gap_fill_mode,
         )
         logger.info("ingestion.fetched run_id=%s count=%s", run_id_log, len(raw_events))
-
-        category_map = load_category_map()
-        duplicate_checker = None
-        if not dry_run:
+        _evaluate_and_write(
+            settings,
+            raw_events,
+            run_id_db,
+            run_id_log,
+            dry_run,
+            gap_fill_stats,
+            gate_workers=gate_workers,
+        )
+    except Exception as exc:
+        if not dry_run and run_id_db is not None:
             with db_cursor(settings) as cursor:
-                duplicate_checker = DatabaseDuplicateChecker(cursor, settings)
-                gate = QualityGate(
-                    settings=settings,
-                    category_map=category_map,
-                    duplicate_checker=duplicate_checker,
-                )
-                decisions = [gate.evaluate(event) for event in raw_events]
-        else:
-            gate = QualityGate(settings=settings, category_map=category_map)
-            decisions = [gate.evaluate(event) for event in raw_events]
-
-        accepts: List[AcceptDecision] = [d for d in decisions if isinstance(d, AcceptDecision)]
-        rejects: List[RejectDecision] = [d for d in decisions if isinstance(d, RejectDecision)]
-        review_rejects: List[RejectDecision] = []
-        for accept in accepts:
-            if accept.review_reason:
-                details = dict(accept.review_details)
-                details.setdefault("accepted", True)
-                review_rejects.append(
-                    RejectDecision(
-                        raw_event=accept.raw_event,
-                        reason=accept.review_reason,
-                        details=details,
-                    )
+                complete_run_failed(
+                    cursor, run_id_db, exc, fetched_count=counters.fetched if stream else None
                 )
-        rejects_all = rejects + review_rejects
+        logger.exception("ingestion.failed run_id=%s", run_id_log)
+        raise
 
-        if dry_run:
-            _log_dry_run_summary(raw_events, accepts, rejects, review_rejects)
-            return
 
-        if run_id_db is None:
-            raise ValueError("run_id missing for database write")
+def run_repair(year: int, dry_run: bool = False, limit: int | None = None) -> None:
+    """Fetch only the true sequence holes of ``year`` and ingest them.
 
-        accepted_events = [a.normalized for a in accepts if a.normalized is not None]
-        if accepted_events:
-            first_event = min(accepted_events, key=lambda e: (e.year or 0, e.sequence_number or 0))
-            last_event = max(accepted_events, key=lambda e: (e.year or 0, e.sequence_number or 0))
-            first_accepted_srid = first_event.service_request_id
-            last_accepted_srid = last_event.service_request_id
-
-            accepted_requested_ats = [
-                e.requested_at for e in accepted_events if e.requested_at is not None
-            ]
-            min_accepted_requested_at = min(accepted_requested_ats) if accepted_requested_ats else None
-            max_accepted_requested_at = max(accepted_requested_ats) if accepted_requested_ats else None
-        else:
-            first_accepted_srid = None
-            last_accepted_srid = None
-            min_accepted_requested_at = None
-            max_accepted_requested_at = None
+    Holes are enumerated from the per-year coverage of `events` and `events_raw`
+    (below the highest known sequence), minus IDs whose 404 re-probe is not due.
+    """
+    settings = Settings()
+    run_id_db: int | None = None
+    run_id_log = str(uuid.uuid4()) if dry_run else "pending"
+    stats = GapFillStats()
 
-        with db_cursor(settings) as cursor:
-            raw_result = write_raw(run_id_db, raw_events, cursor=cursor)
-            write_rejected(
-                run_id_db,
-                rejects_all,
-                raw_id_by_srid=raw_result.raw_id_by_srid,
-                raw_id_by_event_id=raw_result.raw_id_by_event_id,
-                cursor=cursor,
-            )
-            upsert_result = upsert_events(run_id_db, accepts, cursor=cursor)
+    with db_cursor(settings) as cursor:
+        coverage = load_coverage(cursor, year)
+        hole_ids = coverage.hole_ids()
+        hole_ids, stats.cache_hits = filter_due(cursor, hole_ids)
+    if limit is not None:
+        hole_ids = hole_ids[:limit]
 
-        true_reject_count = sum(
-            1 for reject in rejects_all if not bool(reject.details.get("accepted", False))
-        )
+    logger.info(
+        "repair.start year=%s max_seq=%s covered=%s holes=%s cache_hits=%s",
+        year,
+        coverage.max_sequence,
+        coverage.covered_count,
+        len(hole_ids),
+        stats.cache_hits,
+    )
+
+    if not dry_run:
         with db_cursor(settings) as cursor:
-            complete_run_success(
-                cursor,
-                run_id_db,
-                fetched_count=len(raw_events),
-                staged_count=raw_result.count,
-                rejected_count=true_reject_count,
-                inserted_count=upsert_result.inserted,
-                updated_count=upsert_result.updated,
-                first_accepted_service_request_id=first_accepted_srid,
-                last_accepted_service_request_id=last_accepted_srid,
-                min_accepted_requested_at=min_accepted_requested_at,
-                max_accepted_requested_at=max_accepted_requested_at,
-            )
+            run_id_db = create_run(cursor, f"{year}-01-01", f"{year + 1}-01-01")
+        run_id_log = str(run_id_db)
+
+    try:
+        stats.cache_misses = len(hole_ids)
+        result = fetch_ids(hole_ids, settings)
+        stats.missing_404 = len(result.missing)
+        stats.failed = len(result.failed)
+        if not dry_run:
+            with db_cursor(settings) as cursor:
+                record_probes(
+                    cursor,
+                    missing=result.missing,
+                    found=list(result.found),
+                    reprobe_hours=settings.ingestion_missing_reprobe_hours,
+                    reprobe_max_hours=settings.ingestion_missing_reprobe_max_hours,
+                )
 
+        raw_events = list(result.found.values())
         logger.info(
-            "ingestion.complete run_id=%s raw=%s accepted=%s rejected=%s",
+            "repair.fetched run_id=%s found=%s missing_404=%s failed=%s",
             run_id_log,
             len(raw_events),
-            len(accepts),
-            true_reject_count,
+            stats.missing_404,
+            stats.failed,
+        )
+        _evaluate_and_write(
+            settings,
+            raw_events,
+            run_id_db,
+            run_id_log,
+            dry_run,
+            stats,
+            gate_workers=settings.ingestion_gate_workers,
         )
-
     except Exception as exc:
         if not dry_run and run_id_db is not None:
             with db_cursor(settings) as cursor:
                 complete_run_failed(cursor, run_id_db, exc, fetched_count=None)
-        logger.exception("ingestion.failed run_id=%s", run_id_log)
+        logger.exception("repair.failed run_id=%s", run_id_log)
         raise
 
 
+def _evaluate_and_write(
+    settings: Settings,
+    raw_events: List[RawEvent],
+    run_id_db: int | None,
+    run_id_log: str,
+    dry_run: bool,
+    gap_fill_stats: GapFillStats,
+    gate_workers: int = 1,
+) -> None:
+    """Gate fetched events, write raw/rejected/canonical rows and close the run."""
+    category_map = load_category_map()
+    counters = RunCounters(
+        missing_cache_hits=gap_fill_stats.cache_hits,
+        missing_cache_misses=gap_fill_stats.cache_misses,
+    )
+    if not dry_run:
+        with db_cursor(settings) as cursor:
+            gate = QualityGate(
+                settings=settings,
+                category_map=category_map,
+                duplicate_checker=DatabaseDuplicateChecker(cursor, settings),
+                warm_index=True,
+            )
+            raw_events = skip_unchanged(cursor, settings, raw_events, counters, gate.fingerprint)
+            accepts, rejects, review_rejects = gate_events(gate, raw_events, gate_workers)
+    else:
+        gate = QualityGate(settings=settings, category_map=category_map)
+        accepts, rejects, review_rejects = gate_events(gate, raw_events, gate_workers)
+
+    if dry_run:
+        _log_dry_run_summary(raw_events, accepts, rejects, review_rejects)
+        return
+
+    if run_id_db is None:
+        raise ValueError("run_id missing for database write")
+
+    with db_cursor(settings) as cursor:
+        write_decisions(
+            cursor,
+            run_id_db,
+            raw_events,
+            accepts,
+            rejects + review_rejects,
+            counters,
+            gate.fingerprint,
+            bulk_load=settings.ingestion_bulk_load,
+            upsert_mode=settings.ingestion_upsert_mode,
+        )
+
+    with db_cursor(settings) as cursor:
+        complete_run_with_counters(cursor, run_id_db, counters)
+
+    logger.info(
+        "ingestion.complete run_id=%s fetched=%s raw=%s accepted=%s unchanged=%s skipped=%s "
+        "rejected=%s",
+        run_id_log,
+        counters.fetched,
+        len(raw_events),
+        len(accepts),
+        counters.unchanged,
+        counters.skipped_unchanged,
+        counters.rejected,
+    )
+
+
+def _stream_and_write(
+    since: str,
+    until: str,
+    settings: Settings,
+    run_id_db: int | None,
+    run_id_log: str,
+    dry_run: bool,
+    counters: RunCounters,
+    gap_fill_limit: int | None = None,
+    enable_gap_fill: bool | None = None,
+    gap_fill_mode: str | None = None,
+) -> None:
+    """Gate and write the window in micro-batches while it is being fetched.
+
+    Each INGESTION_STREAM_BATCH_SIZE batch is written and committed on its own
+    together with a progress update of the run counters, so memory stays flat
+    and finished batches survive a failure later in the run. Only the seen
+    service_request_ids are kept for the gap-fill pass after the stream ends.
+    """
+    # Dry runs never write, so they keep the placeholder run_id.
+    run_id = 0
+    if not dry_run:
+        if run_id_db is None:
+            raise ValueError("run_id missing for database write")
+        run_id = run_id_db
+
+    # One gate for the whole stream: its sliding duplicate index is warmed
+    # incrementally and evicts behind the stream, so per-batch lookups are rare.
+    gate = QualityGate(settings=settings, warm_index=not dry_run)
+    seen: set[str] = set()
+    reason_counts: Counter[str] = Counter()
+
+    def write(batch: List[RawEvent]) -> None:
+        if dry_run:
+            accepts, rejects, review_rejects = gate_events(gate, batch)
+            counters.fetched += len(batch)
+            counters.rejected += len(rejects)
+            reason_counts.update(reject.reason for reject in rejects + review_rejects)
+            return
+
+        with db_cursor(settings) as cursor:
+            batch = skip_unchanged(cursor, settings, batch, counters, gate.fingerprint)
+            gate.duplicate_checker = DatabaseDuplicateChecker(cursor, settings)
+            accepts, rejects, review_rejects = gate_events(gate, batch)
+            write_decisions(
+                cursor,
+                run_id,
+                batch,
+                accepts,
+                rejects + review_rejects,
+                counters,
+                gate.fingerprint,
+                bulk_load=settings.ingestion_bulk_load,
+                upsert_mode=settings.ingestion_upsert_mode,
+            )
+            update_run_progress(cursor, run_id, counters)
+        logger.info(
+            "ingestion.stream.batch run_id=%s size=%s fetched=%s inserted=%s updated=%s "
+            "unchanged=%s skipped=%s rejected=%s",
+            run_id_log,
+            len(batch),
+            counters.fetched,
+            counters.inserted,
+            counters.updated,
+            counters.unchanged,
+            counters.skipped_unchanged,
+            counters.rejected,
+        )
+
+    for page_batch in stream_batches(since, until, settings):
+        batch: List[RawEvent] = []
+        for event in page_batch:
+            srid = event.service_request_id
+            if srid:
+                if srid in seen:
+                    continue
+                seen.add(srid)
+            batch.append(event)
+        if batch:
+            write(batch)
+
+    logger.info("ingestion.fetched run_id=%s count=%s", run_id_log, counters.fetched)
+
+    stats = GapFillStats()
+    if _gap_fill_enabled(settings, dry_run, enable_gap_fill):
+        found, stats = _fetch_gaps(
+            seen, settings, dry_run, gap_fill_limit, gap_fill_mode=gap_fill_mode
+        )
+        gap_events = list(found.values())
+        batch_size = max(1, settings.ingestion_stream_batch_size)
+        for start in range(0, len(gap_events), batch_size):
+            write(gap_events[start : start + batch_size])
+    counters.missing_cache_hits = stats.cache_hits
+    counters.missing_cache_misses = stats.cache_misses
+
+    if dry_run:
+        logger.info(
+            "dry_run.summary fetched=%s rejected=%s", counters.fetched, counters.rejected
+        )
+        for reason, count in reason_counts.items():
+            logger.info("dry_run.reject reason=%s count=%s", reason, count)
+        return
+
+    with db_cursor(settings) as cursor:
+        complete_run_with_counters(cursor, run_id, counters)
+
+    logger.info(
+        "ingestion.complete run_id=%s raw=%s inserted=%s updated=%s unchanged=%s skipped=%s "
+        "rejected=%s",
+        run_id_log,
+        counters.fetched,
+        counters.inserted,
+        counters.updated,
+        counters.unchanged,
+        counters.skipped_unchanged,
+        counters.rejected,
+    )
+
+
 def _fetch_with_gap_fill(
     since: str,
     until: str,
@@ -176,28 +399,61 @@ def _fetch_with_gap_fill(
     dry_run: bool,
     gap_fill_limit: int | None,
     enable_gap_fill: bool | None,
-) -> tuple[List[RawEvent], int]:
-    raw_events = fetch_window(since, until, settings)
-    if enable_gap_fill is False:
-        return raw_events, 0
-
-    if enable_gap_fill is None and not settings.ingestion_enable_gap_fill:
-        return raw_events, 0
-
-    has_db = bool(settings.database_url or settings.pghost)
-    if dry_run and not has_db:
-        return raw_events, 0
+    shard_hours: int | None = None,
+    gap_fill_mode: str | None = None,
+) -> tuple[List[RawEvent], GapFillStats]:
+    if shard_hours:
+        raw_events = fetch_sharded(since, until, settings, shard_hours=shard_hours)
+    else:
+        raw_events = fetch_window(since, until, settings)
+    if not _gap_fill_enabled(settings, dry_run, enable_gap_fill):
+        return raw_events, GapFillStats()
 
     missing_id_events = [event for event in raw_events if not event.service_request_id]
     events_by_id = {
         event.service_request_id: event for event in raw_events if event.service_request_id
     }
-    if not events_by_id:
-        return raw_events, 0
+    found, stats = _fetch_gaps(
+        events_by_id.keys(), settings, dry_run, gap_fill_limit, gap_fill_mode=gap_fill_mode
+    )
+    events_by_id.update(found)
+    return list(events_by_id.values()) + missing_id_events, stats
+
+
+def _gap_fill_enabled(settings: Settings, dry_run: bool, enable_gap_fill: bool | None) -> bool:
+    if enable_gap_fill is False:
+        return False
+    if enable_gap_fill is None and not settings.ingestion_enable_gap_fill:
+        return False
+    has_db = bool(settings.database_url or settings.pghost)
+    return has_db or not dry_run
 
-    years = {int(srid.split("-")[1]) for srid in events_by_id.keys() if "-" in srid}
+
+def _fetch_gaps(
+    known_ids: Collection[str],
+    settings: Settings,
+    dry_run: bool,
+    gap_fill_limit: int | None,
+    gap_fill_mode: str | None = None,
+) -> tuple[dict[str, RawEvent], GapFillStats]:
+    """Fetch sequence gaps around ``known_ids``; returns only events not in it."""
+    stats = GapFillStats()
+    found_by_id: dict[str, RawEvent] = {}
+    has_db = bool(settings.database_url or settings.pghost)
+
+    mode = gap_fill_mode or settings.ingestion_gap_fill_mode
+    if mode not in GAP_FILL_MODES:
+        raise ValueError(f"gap_fill_mode must be one of {GAP_FILL_MODES}, got {mode!r}")
+
+    if not known_ids and mode == "window":
+        return found_by_id, stats
+
+    years = {int(srid.split("-")[1]) for srid in known_ids if "-" in srid}
+    if mode == "frontier":
+        # New reports land in the current year even when the window returned none.
+        years.add(datetime.now(timezone.utc).year)
     if not years:
-        return list(events_by_id.values()) + missing_id_events, 0
+        return found_by_id, stats
 
     last_sequences: dict[int, int | None] = {year: None for year in years}
     if has_db:
@@ -207,16 +463,36 @@ def _fetch_with_gap_fill(
                 row = cursor.fetchone()
                 last_sequences[year] = row[0] if row else None
 
-    missing_ids_404 = 0
     for year in years:
-        max_seq = max_sequence_for_year(events_by_id.keys(), year)
+        max_seq = max_sequence_for_year(known_ids, year)
+        if mode == "frontier":
+            known = max(
+                [value for value in (max_seq, last_sequences.get(year)) if value is not None],
+                default=None,
+            )
+            frontier, probed = probe_frontier(year, known, settings)
+            for service_request_id, fetched in probed.items():
+                if service_request_id not in known_ids:
+                    found_by_id.setdefault(service_request_id, fetched)
+            if frontier is not None:
+                max_seq = max(max_seq or 0, frontier)
         logger.info(
-            "ingestion.gap_fill.range year=%s last_seq=%s max_seq=%s",
+            "ingestion.gap_fill.range year=%s last_seq=%s max_seq=%s mode=%s",
             year,
             last_sequences.get(year),
             max_seq,
+            mode,
         )
-        gap_ids = compute_gap_ids(last_sequences.get(year), max_seq, year)
+        gap_ids = [
+            srid
+            for srid in compute_gap_ids(last_sequences.get(year), max_seq, year)
+            if srid not in known_ids and srid not in found_by_id
+        ]
+        if gap_ids and has_db:
+            with db_cursor(settings) as cursor:
+                gap_ids, cache_hits = filter_due(cursor, gap_ids)
+            stats.cache_hits += cache_hits
+
         limit = gap_fill_limit if gap_fill_limit is not None else settings.ingestion_gap_fill_limit
         if limit and len(gap_ids) > limit:
             gap_ids = gap_ids[:limit]
@@ -227,37 +503,31 @@ def _fetch_with_gap_fill(
         if not gap_ids:
             continue
 
-        if settings.open311_max_workers > 1:
-            from concurrent.futures import ThreadPoolExecutor, as_completed
-
-            with ThreadPoolExecutor(max_workers=settings.open311_max_workers) as executor:
-                futures = {
-                    executor.submit(fetch_by_id, service_request_id, settings): service_request_id
-                    for service_request_id in gap_ids
-                }
-                for future in as_completed(futures):
-                    fetched = future.result()
-                    if fetched is None:
-                        missing_ids_404 += 1
-                        continue
-                    if (
-                        fetched.service_request_id
-                        and fetched.service_request_id not in events_by_id
-                    ):
-                        events_by_id[fetched.service_request_id] = fetched
-        else:
-            for service_request_id in gap_ids:
-                fetched = fetch_by_id(service_request_id, settings)
-                if fetched is None:
-                    missing_ids_404 += 1
-                    continue
-                if fetched.service_request_id and fetched.service_request_id not in events_by_id:
-                    events_by_id[fetched.service_request_id] = fetched
+        stats.cache_misses += len(gap_ids)
+        result = fetch_ids(gap_ids, settings)
+        stats.missing_404 += len(result.missing)
+        stats.failed += len(result.failed)
+        for service_request_id, fetched in result.found.items():
+            found_by_id.setdefault(service_request_id, fetched)
+
+        if has_db and not dry_run:
+            with db_cursor(settings) as cursor:
+                record_probes(
+                    cursor,
+                    missing=result.missing,
+                    found=list(result.found),
+                    reprobe_hours=settings.ingestion_missing_reprobe_hours,
+                    reprobe_max_hours=settings.ingestion_missing_reprobe_max_hours,
+                )
 
-    if missing_ids_404:
-        logger.info("ingestion.gap_fill.missing_404 count=%s", missing_ids_404)
+    if stats.cache_hits:
+        logger.info("ingestion.gap_fill.cache_hits count=%s", stats.cache_hits)
+    if stats.missing_404:
+        logger.info("ingestion.gap_fill.missing_404 count=%s", stats.missing_404)
+    if stats.failed:
+        logger.warning("ingestion.gap_fill.failed count=%s", stats.failed)
 
-    return list(events_by_id.values()) + missing_id_events, missing_ids_404
+    return found_by_id, stats
 
 
 def _log_dry_run_summary(
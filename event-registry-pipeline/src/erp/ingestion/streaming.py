@@ -0,0 +1,83 @@
+"""Bounded producer/consumer bridge from the async page stream to batch writers."""
+
+from __future__ import annotations
+
+import asyncio
+import queue
+import threading
+from typing import Iterator, List, Optional
+
+from erp.config import Settings
+from erp.ingestion.fetch_open311 import stream_window
+from erp.models import RawEvent
+from erp.utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+_DONE = object()
+
+
+def stream_batches(
+    since: str,
+    until: str,
+    settings: Optional[Settings] = None,
+    batch_size: Optional[int] = None,
+    max_pending_batches: Optional[int] = None,
+) -> Iterator[List[RawEvent]]:
+    """Yield a date window as micro-batches of at most ``batch_size`` events.
+
+    :func:`stream_window` runs on a producer thread and hands batches over a
+    queue bounded to ``max_pending_batches``. When the consumer falls behind,
+    the producer blocks and stops pulling pages, so at most
+    ``(max_pending_batches + 1) * batch_size`` events plus the page prefetch
+    are held in memory regardless of the window size. Fetch errors are
+    re-raised in the consumer.
+    """
+    settings = settings or Settings()
+    size = max(1, batch_size or settings.ingestion_stream_batch_size)
+    depth = max(1, max_pending_batches or settings.ingestion_stream_queue_batches)
+    handoff: queue.Queue[object] = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item: object) -> bool:
+        while not stop.is_set():
+            try:
+                handoff.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    async def produce() -> None:
+        batch: List[RawEvent] = []
+        async for event in stream_window(since, until, settings):
+            batch.append(event)
+            if len(batch) >= size:
+                if not await asyncio.to_thread(put, batch):
+                    return
+                batch = []
+        if batch:
+            await asyncio.to_thread(put, batch)
+
+    def run() -> None:
+        try:
+            asyncio.run(produce())
+        except BaseException as exc:  # handed to the consumer
+            put(exc)
+        else:
+            put(_DONE)
+
+    producer = threading.Thread(target=run, name="erp-stream-producer", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = handoff.get()
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item  # type: ignore[misc]
+    finally:
+        stop.set()
+        producer.join()
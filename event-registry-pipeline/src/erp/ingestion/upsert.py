@@ -2,15 +2,18 @@
 
 from __future__ import annotations
 
+import json
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Iterable, Optional, Sequence, TypeVar
+from decimal import Decimal
+from typing import Any, Iterable, Optional, Sequence, TypeVar
 
+import orjson
 from psycopg import Cursor
 from psycopg.types.json import Jsonb
 
 from erp.db.client import db_cursor
-from erp.models import AcceptDecision, RawEvent, RejectDecision
+from erp.models import AcceptDecision, CanonicalEvent, RawEvent, RejectDecision
 from erp.utils.text import extract_media_path
 from erp.utils.time import parse_requested_at
 from erp.utils.logging import get_logger
@@ -18,6 +21,104 @@ from erp.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# How events_raw/events_rejected rows are loaded: binary COPY or multi-row INSERT.
+BULK_LOAD_MODES = ("copy", "insert")
+
+_RAW_COLUMNS = (
+    "run_id",
+    "service_request_id",
+    "title",
+    "description",
+    "requested_at",
+    "status",
+    "lat",
+    "lon",
+    "address_string",
+    "service_name",
+    "media_path",
+    "payload",
+)
+# Binary COPY needs the wire type of every column; varchar shares text's format.
+_RAW_COPY_TYPES = (
+    "int8",
+    "int8",
+    "text",
+    "text",
+    "text",
+    "timestamptz",
+    "text",
+    "numeric",
+    "numeric",
+    "text",
+    "text",
+    "text",
+    "jsonb",
+)
+_REJECT_COLUMNS = (
+    "run_id",
+    "raw_id",
+    "service_request_id",
+    "accepted",
+    "reject_reason",
+    "reject_details",
+)
+_REJECT_COPY_TYPES = ("int8", "int8", "text", "bool", "text", "jsonb")
+
+# How accepted events reach `events`: staged and merged, or INSERT ... ON CONFLICT.
+UPSERT_MODES = ("merge", "upsert")
+
+# Canonical columns taken from the event; last_seen_at/last_run_id are set per run.
+_EVENT_COLUMNS = (
+    "service_request_id",
+    "title",
+    "description",
+    "description_redacted",
+    "requested_at",
+    "status",
+    "lat",
+    "lon",
+    "address_string",
+    "service_name",
+    "category",
+    "subcategory",
+    "subcategory2",
+    "media_path",
+    "year",
+    "sequence_number",
+    "has_description",
+    "has_media",
+    "skip_llm",
+    "is_link_only",
+    "is_flagged_abuse",
+    "dedupe_key",
+    "near_duplicate_of",
+)
+_EVENT_COPY_TYPES = (
+    "text",
+    "text",
+    "text",
+    "text",
+    "timestamptz",
+    "text",
+    "numeric",
+    "numeric",
+    "text",
+    "text",
+    "text",
+    "text",
+    "text",
+    "text",
+    "int2",
+    "int4",
+    "bool",
+    "bool",
+    "bool",
+    "bool",
+    "bool",
+    "text",
+    "text",
+)
+
 
 @dataclass
 class RawWriteResult:
@@ -31,6 +132,8 @@ class UpsertResult:
     total: int
     inserted: int
     updated: int
+    # Stored rows that already matched (merge mode only; upsert rewrites them).
+    unchanged: int = 0
 
 
 def write_raw(
@@ -38,8 +141,15 @@ def write_raw(
     raw_events: Iterable[RawEvent],
     dry_run: bool = False,
     cursor: Optional[Cursor] = None,
+    bulk_load: str = "copy",
 ) -> RawWriteResult:
-    """Write raw events to events_raw."""
+    """Write raw events to events_raw.
+
+    ``bulk_load`` is one of ``BULK_LOAD_MODES`` (INGESTION_BULK_LOAD): "copy"
+    reserves the ``raw_id``s from the table's sequence and streams the rows
+    with binary COPY; "insert" uses multi-row INSERT ... RETURNING.
+    """
+    _check_bulk_load(bulk_load)
     events = list(raw_events)
     count = len(events)
     if dry_run:
@@ -48,19 +158,12 @@ def write_raw(
 
     raw_id_by_srid: dict[str, int] = {}
     raw_id_by_event_id: dict[int, int] = {}
+    write = _copy_raw if bulk_load == "copy" else _insert_raw_batches
     if cursor is None:
         with db_cursor() as db_cur:
-            raw_id_by_srid, raw_id_by_event_id = _insert_raw_batches(
-                db_cur,
-                run_id,
-                events,
-            )
+            raw_id_by_srid, raw_id_by_event_id = write(db_cur, run_id, events)
     else:
-        raw_id_by_srid, raw_id_by_event_id = _insert_raw_batches(
-            cursor,
-            run_id,
-            events,
-        )
+        raw_id_by_srid, raw_id_by_event_id = write(cursor, run_id, events)
 
     return RawWriteResult(
         count=count,
@@ -76,8 +179,10 @@ def write_rejected(
     raw_id_by_srid: Optional[dict[str, int]] = None,
     raw_id_by_event_id: Optional[dict[int, int]] = None,
     cursor: Optional[Cursor] = None,
+    bulk_load: str = "copy",
 ) -> int:
-    """Write rejected events to events_rejected."""
+    """Write rejected events to events_rejected (``bulk_load`` as in :func:`write_raw`)."""
+    _check_bulk_load(bulk_load)
     reject_list = list(rejects)
     count = len(reject_list)
     if dry_run:
@@ -90,11 +195,12 @@ def write_rejected(
     raw_lookup = raw_id_by_srid or {}
     event_lookup = raw_id_by_event_id or {}
 
+    write = _copy_rejects if bulk_load == "copy" else _insert_rejects
     if cursor is None:
         with db_cursor() as db_cur:
-            _insert_rejects(db_cur, run_id, reject_list, raw_lookup, event_lookup)
+            write(db_cur, run_id, reject_list, raw_lookup, event_lookup)
     else:
-        _insert_rejects(cursor, run_id, reject_list, raw_lookup, event_lookup)
+        write(cursor, run_id, reject_list, raw_lookup, event_lookup)
 
     return count
 
@@ -104,19 +210,33 @@ def upsert_events(
     accepts: Iterable[AcceptDecision],
     dry_run: bool = False,
     cursor: Optional[Cursor] = None,
+    mode: str = "merge",
 ) -> UpsertResult:
-    """Upsert accepted events into events."""
+    """Upsert accepted events into events.
+
+    ``mode`` is one of ``UPSERT_MODES`` (INGESTION_UPSERT_MODE). "merge" copies
+    the batch into a temporary staging table and updates only rows where a
+    column differs, so re-fetched unchanged events cost no row versions;
+    "upsert" rewrites every conflicting row with INSERT ... ON CONFLICT.
+    """
+    if mode not in UPSERT_MODES:
+        raise ValueError(f"mode must be one of {UPSERT_MODES}, got {mode!r}")
     accept_list = [a for a in accepts if a.normalized is not None]
     count = len(accept_list)
     if dry_run:
         logger.info("upsert_events.dry_run run_id=%s count=%s", run_id, count)
         return UpsertResult(total=count, inserted=0, updated=0)
 
+    write = _merge_events if mode == "merge" else _upsert_events
     if cursor is None:
         with db_cursor() as db_cur:
-            return _upsert_events(db_cur, run_id, accept_list)
+            result = write(db_cur, run_id, accept_list)
+            _upsert_minhash(db_cur, accept_list)
+            return result
 
-    return _upsert_events(cursor, run_id, accept_list)
+    result = write(cursor, run_id, accept_list)
+    _upsert_minhash(cursor, accept_list)
+    return result
 
 
 def _insert_raw_batches(
@@ -130,44 +250,15 @@ def _insert_raw_batches(
     if not events:
         return raw_id_by_srid, raw_id_by_event_id
 
-    columns = (
-        "run_id",
-        "service_request_id",
-        "title",
-        "description",
-        "requested_at",
-        "status",
-        "lat",
-        "lon",
-        "address_string",
-        "service_name",
-        "media_path",
-        "payload",
-    )
-    placeholders = "(" + ",".join(["%s"] * len(columns)) + ")"
+    placeholders = "(" + ",".join(["%s"] * len(_RAW_COLUMNS)) + ")"
 
     for batch in _chunked(events, batch_size):
         values: list[object] = []
         for event in batch:
-            values.extend(
-                [
-                    run_id,
-                    event.service_request_id,
-                    event.title,
-                    event.description,
-                    parse_requested_at(event.requested_datetime),
-                    (event.status or "").lower() if event.status else None,
-                    event.lat,
-                    event.lon,
-                    event.address_string,
-                    event.service_name,
-                    extract_media_path(event.media_url),
-                    Jsonb(event.payload),
-                ]
-            )
+            values.extend(_raw_values(run_id, event))
 
         query = (
-            f"insert into events_raw ({', '.join(columns)}) values "
+            f"insert into events_raw ({', '.join(_RAW_COLUMNS)}) values "
             + ",".join([placeholders] * len(batch))
             + " returning raw_id, service_request_id"
         )
@@ -181,6 +272,61 @@ def _insert_raw_batches(
     return raw_id_by_srid, raw_id_by_event_id
 
 
+def _copy_raw(
+    cursor: Cursor,
+    run_id: int,
+    events: list[RawEvent],
+) -> tuple[dict[str, int], dict[int, int]]:
+    raw_id_by_srid: dict[str, int] = {}
+    raw_id_by_event_id: dict[int, int] = {}
+    if not events:
+        return raw_id_by_srid, raw_id_by_event_id
+
+    # COPY has no RETURNING: take the ids from the bigserial sequence up front.
+    cursor.execute(
+        "select nextval(pg_get_serial_sequence('public.events_raw', 'raw_id')) "
+        "from generate_series(1, %s)",
+        (len(events),),
+    )
+    raw_ids = [int(row[0]) for row in cursor.fetchall()]
+
+    with cursor.copy(
+        f"copy events_raw (raw_id, {', '.join(_RAW_COLUMNS)}) from stdin (format binary)"
+    ) as copy:
+        copy.set_types(_RAW_COPY_TYPES)
+        for raw_id, event in zip(raw_ids, events):
+            copy.write_row((raw_id, *_raw_values(run_id, event, binary=True)))
+            raw_id_by_event_id[id(event)] = raw_id
+            if event.service_request_id:
+                raw_id_by_srid[event.service_request_id] = raw_id
+
+    return raw_id_by_srid, raw_id_by_event_id
+
+
+def _raw_values(run_id: int, event: RawEvent, binary: bool = False) -> list[Any]:
+    """``_RAW_COLUMNS`` values of one event, typed for binary COPY with ``binary``."""
+    coords: tuple[Optional[Decimal], Optional[Decimal]] | tuple[Optional[float], Optional[float]]
+    if binary:
+        coords = (_numeric(event.lat), _numeric(event.lon))
+        payload = Jsonb(event.payload, dumps=_json_dumps)
+    else:
+        coords = (event.lat, event.lon)
+        payload = Jsonb(event.payload)
+    return [
+        run_id,
+        event.service_request_id,
+        event.title,
+        event.description,
+        parse_requested_at(event.requested_datetime),
+        (event.status or "").lower() if event.status else None,
+        *coords,
+        event.address_string,
+        event.service_name,
+        extract_media_path(event.media_url),
+        payload,
+    ]
+
+
 def _insert_rejects(
     cursor: Cursor,
     run_id: int,
@@ -189,53 +335,81 @@ def _insert_rejects(
     raw_id_by_event_id: dict[int, int],
     batch_size: int = 500,
 ) -> None:
-    if not rejects:
+    rows = _reject_rows(run_id, rejects, raw_id_by_srid, raw_id_by_event_id)
+    if not rows:
         return
 
-    columns = (
-        "run_id",
-        "raw_id",
-        "service_request_id",
-        "accepted",
-        "reject_reason",
-        "reject_details",
-    )
-    placeholders = "(" + ",".join(["%s"] * len(columns)) + ")"
+    placeholders = "(" + ",".join(["%s"] * len(_REJECT_COLUMNS)) + ")"
+    for batch in _chunked(rows, batch_size):
+        values = [value for row in batch for value in row]
+        query = f"insert into events_rejected ({', '.join(_REJECT_COLUMNS)}) values " + ",".join(
+            [placeholders] * len(batch)
+        )
+        cursor.execute(query, values)
 
-    for batch in _chunked(rejects, batch_size):
-        values: list[object] = []
-        valid_count = 0
-        for reject in batch:
-            raw_id = raw_id_by_srid.get(reject.raw_event.service_request_id or "")
-            if raw_id is None:
-                raw_id = raw_id_by_event_id.get(id(reject.raw_event))
-            if raw_id is None:
-                logger.warning(
-                    "write_rejected.skip_no_raw_id service_request_id=%s reason=%s",
-                    reject.raw_event.service_request_id,
-                    reject.reason,
-                )
-                continue
-            valid_count += 1
-            accepted = bool(reject.details.get("accepted", False))
-            values.extend(
-                [
-                    run_id,
-                    raw_id,
-                    reject.raw_event.service_request_id,
-                    accepted,
-                    reject.reason,
-                    Jsonb(reject.details),
-                ]
-            )
 
-        if valid_count == 0:
-            continue
+def _copy_rejects(
+    cursor: Cursor,
+    run_id: int,
+    rejects: list[RejectDecision],
+    raw_id_by_srid: dict[str, int],
+    raw_id_by_event_id: dict[int, int],
+) -> None:
+    rows = _reject_rows(run_id, rejects, raw_id_by_srid, raw_id_by_event_id, binary=True)
+    if not rows:
+        return
 
-        query = f"insert into events_rejected ({', '.join(columns)}) values " + ",".join(
-            [placeholders] * valid_count
+    with cursor.copy(
+        f"copy events_rejected ({', '.join(_REJECT_COLUMNS)}) from stdin (format binary)"
+    ) as copy:
+        copy.set_types(_REJECT_COPY_TYPES)
+        for row in rows:
+            copy.write_row(row)
+
+
+def _reject_rows(
+    run_id: int,
+    rejects: list[RejectDecision],
+    raw_id_by_srid: dict[str, int],
+    raw_id_by_event_id: dict[int, int],
+    binary: bool = False,
+) -> list[list[Any]]:
+    """``_REJECT_COLUMNS`` values per reject; rejects without a raw row are skipped."""
+    rows: list[list[Any]] = []
+    for reject in rejects:
+        raw_id = raw_id_by_srid.get(reject.raw_event.service_request_id or "")
+        if raw_id is None:
+            raw_id = raw_id_by_event_id.get(id(reject.raw_event))
+        if raw_id is None:
+            logger.warning(
+                "write_rejected.skip_no_raw_id service_request_id=%s reason=%s",
+                reject.raw_event.service_request_id,
+                reject.reason,
+            )
+            continue
+        rows.append(
+            [
+                run_id,
+                raw_id,
+                reject.raw_event.service_request_id,
+                bool(reject.details.get("accepted", False)),
+                reject.reason,
+                Jsonb(reject.details, dumps=_json_dumps) if binary else Jsonb(reject.details),
+            ]
         )
-        cursor.execute(query, values)
+    return rows
+
+
+def _numeric(value: Optional[float]) -> Optional[Decimal]:
+    """A float as the server's float8 -> numeric cast sees it (15 significant digits)."""
+    return None if value is None else Decimal(format(value, ".15g"))
+
+
+def _json_dumps(value: Any) -> bytes:
+    try:
+        return orjson.dumps(value)
+    except TypeError:  # e.g. integers beyond 64 bits, which json handles
+        return json.dumps(value).encode("utf-8")
 
 
 def _upsert_events(
@@ -247,32 +421,9 @@ def _upsert_events(
     if not accepts:
         return UpsertResult(total=0, inserted=0, updated=0)
 
-    columns = (
-        "service_request_id",
-        "title",
-        "description",
-        "description_redacted",
-        "requested_at",
-        "status",
-        "lat",
-        "lon",
-        "address_string",
-        "service_name",
-        "category",
-        "subcategory",
-        "subcategory2",
-        "media_path",
-        "year",
-        "sequence_number",
-        "has_description",
-        "has_media",
-        "skip_llm",
-        "is_link_only",
-        "is_flagged_abuse",
-        "last_seen_at",
-        "last_run_id",
-    )
+    columns = (*_EVENT_COLUMNS, "last_seen_at", "last_run_id")
     placeholders = "(" + ",".join(["%s"] * len(columns)) + ")"
+    assignments = ", ".join(f"{column} = excluded.{column}" for column in columns[1:])
     total_inserted = 0
     total_updated = 0
 
@@ -283,60 +434,12 @@ def _upsert_events(
             event = accept.normalized
             if event is None:
                 continue
-            values.extend(
-                [
-                    event.service_request_id,
-                    event.title,
-                    event.description,
-                    event.description_redacted,
-                    event.requested_at,
-                    event.status,
-                    event.lat,
-                    event.lon,
-                    event.address_string,
-                    event.service_name,
-                    event.category,
-                    event.subcategory,
-                    event.subcategory2,
-                    event.media_path,
-                    event.year,
-                    event.sequence_number,
-                    event.has_description,
-                    event.has_media,
-                    event.skip_llm,
-                    event.is_link_only,
-                    event.is_flagged_abuse,
-                    now,
-                    run_id,
-                ]
-            )
+            values.extend([*_event_values(event), now, run_id])
 
         query = (
             f"insert into events ({', '.join(columns)}) values "
             + ",".join([placeholders] * len(batch))
-            + " on conflict (service_request_id) do update set "
-            + "title = excluded.title, "
-            + "description = excluded.description, "
-            + "description_redacted = excluded.description_redacted, "
-            + "requested_at = excluded.requested_at, "
-            + "status = excluded.status, "
-            + "lat = excluded.lat, "
-            + "lon = excluded.lon, "
-            + "address_string = excluded.address_string, "
-            + "service_name = excluded.service_name, "
-            + "category = excluded.category, "
-            + "subcategory = excluded.subcategory, "
-            + "subcategory2 = excluded.subcategory2, "
-            + "media_path = excluded.media_path, "
-            + "year = excluded.year, "
-            + "sequence_number = excluded.sequence_number, "
-            + "has_description = excluded.has_description, "
-            + "has_media = excluded.has_media, "
-            + "skip_llm = excluded.skip_llm, "
-            + "is_link_only = excluded.is_link_only, "
-            + "is_flagged_abuse = excluded.is_flagged_abuse, "
-            + "last_seen_at = excluded.last_seen_at, "
-            + "last_run_id = excluded.last_run_id "
+            + f" on conflict (service_request_id) do update set {assignments} "
             + "returning (xmax = 0) as inserted"
         )
         cursor.execute(query, values)
@@ -350,8 +453,132 @@ def _upsert_events(
     )
 
 
+def _merge_events(
+    cursor: Cursor,
+    run_id: int,
+    accepts: list[AcceptDecision],
+) -> UpsertResult:
+    if not accepts:
+        return UpsertResult(total=0, inserted=0, updated=0)
+
+    columns = ", ".join(_EVENT_COLUMNS)
+    # Same column types as `events`, none of its constraints; dropped at commit.
+    cursor.execute(
+        f"create temporary table if not exists events_stage on commit drop as "
+        f"select {columns} from public.events with no data"
+    )
+    cursor.execute("truncate events_stage")
+    with cursor.copy(f"copy events_stage ({columns}) from stdin (format binary)") as copy:
+        copy.set_types(_EVENT_COPY_TYPES)
+        for accept in accepts:
+            if accept.normalized is not None:
+                copy.write_row(_event_values(accept.normalized, binary=True))
+
+    changed = " or ".join(
+        f"e.{column} is distinct from s.{column}" for column in _EVENT_COLUMNS[1:]
+    )
+    assignments = ", ".join(f"{column} = s.{column}" for column in _EVENT_COLUMNS[1:])
+    cursor.execute(
+        f"""
+        with updated as (
+            update public.events e
+            set {assignments}, last_seen_at = %(now)s, last_run_id = %(run_id)s
+            from events_stage s
+            where e.service_request_id = s.service_request_id and ({changed})
+            returning 1
+        ), inserted as (
+            insert into public.events ({columns}, last_seen_at, last_run_id)
+            select {columns}, %(now)s, %(run_id)s from events_stage s
+            where not exists (
+                select 1 from public.events e where e.service_request_id = s.service_request_id
+            )
+            on conflict (service_request_id) do nothing
+            returning 1
+        )
+        select (select count(*) from inserted), (select count(*) from updated)
+        """,
+        {"now": datetime.now(timezone.utc), "run_id": run_id},
+    )
+    row = cursor.fetchone()
+    if row is None:
+        raise RuntimeError("merge upsert returned no counts")
+    inserted, updated = int(row[0]), int(row[1])
+    staged = sum(1 for accept in accepts if accept.normalized is not None)
+    return UpsertResult(
+        total=staged,
+        inserted=inserted,
+        updated=updated,
+        unchanged=staged - inserted - updated,
+    )
+
+
+def _event_values(event: CanonicalEvent, binary: bool = False) -> list[Any]:
+    """``_EVENT_COLUMNS`` values of one event, typed for binary COPY with ``binary``."""
+    lat, lon = (_numeric(event.lat), _numeric(event.lon)) if binary else (event.lat, event.lon)
+    return [
+        event.service_request_id,
+        event.title,
+        event.description,
+        event.description_redacted,
+        event.requested_at,
+        event.status,
+        lat,
+        lon,
+        event.address_string,
+        event.service_name,
+        event.category,
+        event.subcategory,
+        event.subcategory2,
+        event.media_path,
+        event.year,
+        event.sequence_number,
+        event.has_description,
+        event.has_media,
+        event.skip_llm,
+        event.is_link_only,
+        event.is_flagged_abuse,
+        event.dedupe_key,
+        event.near_duplicate_of,
+    ]
+
+
+def _upsert_minhash(cursor: Cursor, accepts: list[AcceptDecision]) -> None:
+    """Persist MinHash signatures and LSH band hashes of accepted events."""
+    rows = [
+        (
+            a.normalized.service_request_id,
+            a.normalized.requested_at,
+            a.normalized.minhash_signature,
+            a.normalized.minhash_bands,
+        )
+        for a in accepts
+        if a.normalized is not None
+        and a.normalized.minhash_signature
+        and a.normalized.minhash_bands
+    ]
+    if not rows:
+        return
+
+    cursor.executemany(
+        "insert into public.event_minhash "
+        "(service_request_id, requested_at, signature, band_hashes) "
+        "values (%s, %s, %s, %s) "
+        "on conflict (service_request_id) do update set "
+        "requested_at = excluded.requested_at, signature = excluded.signature, "
+        "band_hashes = excluded.band_hashes, updated_at = now() "
+        "where (event_minhash.requested_at, event_minhash.signature, event_minhash.band_hashes) "
+        "is distinct from (excluded.requested_at, excluded.signature, excluded.band_hashes)",
+        rows,
+    )
+
+
 T = TypeVar("T")
 
 
+def _check_bulk_load(bulk_load: str) -> None:
+    if bulk_load not in BULK_LOAD_MODES:
+        raise ValueError(f"bulk_load must be one of {BULK_LOAD_MODES}, got {bulk_load!r}")
+
+
 def _chunked(items: Sequence[T], batch_size: int) -> list[list[T]]:
     return [list(items[i : i + batch_size]) for i in range(0, len(items), batch_size)]
@@ -0,0 +1,116 @@
+"""Gate and write one batch of fetched events (shared by runs and backfills)."""
+
+from __future__ import annotations
+
+from concurrent.futures import Executor
+from typing import List, Optional
+
+from psycopg import Cursor
+
+from erp.config import Settings
+from erp.ingestion.change_capture import filter_changed, record_hashes
+from erp.ingestion.quality_gate import PARALLEL_MIN_EVENTS, QualityGate
+from erp.ingestion.run_log import RunCounters
+from erp.ingestion.upsert import upsert_events, write_raw, write_rejected
+from erp.models import AcceptDecision, RawEvent, RejectDecision
+
+
+def gate_events(
+    gate: QualityGate,
+    raw_events: List[RawEvent],
+    workers: int = 1,
+    executor: Optional[Executor] = None,
+) -> tuple[List[AcceptDecision], List[RejectDecision], List[RejectDecision]]:
+    """Evaluate events; returns (accepts, rejects, review_rejects).
+
+    With ``workers`` > 1 and at least ``PARALLEL_MIN_EVENTS`` events the batch
+    is gated on a process pool; ``gate`` must then be fresh.
+    """
+    if workers > 1 and len(raw_events) >= PARALLEL_MIN_EVENTS:
+        decisions = gate.evaluate_parallel(raw_events, workers, executor=executor)
+    else:
+        decisions = gate.evaluate_batch(raw_events)
+    accepts: List[AcceptDecision] = [d for d in decisions if isinstance(d, AcceptDecision)]
+    rejects: List[RejectDecision] = [d for d in decisions if isinstance(d, RejectDecision)]
+    review_rejects: List[RejectDecision] = []
+    for accept in accepts:
+        if accept.review_reason:
+            details = dict(accept.review_details)
+            details.setdefault("accepted", True)
+            review_rejects.append(
+                RejectDecision(
+                    raw_event=accept.raw_event,
+                    reason=accept.review_reason,
+                    details=details,
+                )
+            )
+    return accepts, rejects, review_rejects
+
+
+def write_decisions(
+    cursor: Cursor,
+    run_id: int,
+    raw_events: List[RawEvent],
+    accepts: List[AcceptDecision],
+    rejects_all: List[RejectDecision],
+    counters: RunCounters,
+    gate_fingerprint: str,
+    bulk_load: str = "copy",
+    upsert_mode: str = "merge",
+) -> None:
+    """Write one batch of gated events on ``cursor`` and add it to ``counters``.
+
+    ``bulk_load`` picks how raw and rejected rows are loaded (INGESTION_BULK_LOAD),
+    ``upsert_mode`` how accepted events reach `events` (INGESTION_UPSERT_MODE).
+    The payload hash of every staged event is recorded for change capture,
+    together with ``gate_fingerprint`` of the gate that decided it.
+    """
+    raw_result = write_raw(run_id, raw_events, cursor=cursor, bulk_load=bulk_load)
+    write_rejected(
+        run_id,
+        rejects_all,
+        raw_id_by_srid=raw_result.raw_id_by_srid,
+        raw_id_by_event_id=raw_result.raw_id_by_event_id,
+        cursor=cursor,
+        bulk_load=bulk_load,
+    )
+    upsert_result = upsert_events(run_id, accepts, cursor=cursor, mode=upsert_mode)
+
+    counters.fetched += len(raw_events)
+    counters.staged += raw_result.count
+    counters.rejected += sum(
+        1 for reject in rejects_all if not bool(reject.details.get("accepted", False))
+    )
+    counters.inserted += upsert_result.inserted
+    counters.updated += upsert_result.updated
+    counters.unchanged += upsert_result.unchanged
+    counters.record_accepted(a.normalized for a in accepts if a.normalized is not None)
+    # Only staged events: without a raw row no decision was written for them.
+    staged = [
+        event
+        for event in raw_events
+        if event.service_request_id in raw_result.raw_id_by_srid
+    ]
+    record_hashes(cursor, run_id, staged, gate_fingerprint)
+
+
+def skip_unchanged(
+    cursor: Cursor,
+    settings: Settings,
+    raw_events: List[RawEvent],
+    counters: RunCounters,
+    gate_fingerprint: str,
+) -> List[RawEvent]:
+    """Drop events re-fetched with the payload and gate they were last processed with.
+
+    With INGESTION_SKIP_UNCHANGED the skipped events count as fetched and
+    skipped_unchanged but are not staged, gated or upserted. A different
+    ``gate_fingerprint`` (new category map, gate settings or GATE_VERSION)
+    gates every event again.
+    """
+    if not settings.ingestion_skip_unchanged:
+        return raw_events
+    changed, unchanged = filter_changed(cursor, raw_events, gate_fingerprint)
+    counters.fetched += unchanged
+    counters.skipped_unchanged += unchanged
+    return changed
@@ -0,0 +1,517 @@
+"""Offline labeling through an asynchronous batch endpoint (Gemini Batch API).
+
+A batch job moves through these statuses in ``public.labeling_batch_jobs``;
+each step is recorded before the next one starts, so :func:`resume_jobs` can
+pick up any job after a crash:
+
+- ``prepared``: events selected, request JSONL written, labeling run created
+  (``input_file`` is set once the file is uploaded; ``provider_state`` is
+  ``CREATING`` while the batch is being created)
+- ``submitted``: batch created at the provider, waiting for it to finish
+- ``completed``: the batch succeeded; its results are not ingested yet
+- ``ingested``: results validated and written to the label tables
+- ``failed``: the batch failed, was cancelled or expired
+
+Ingestion inserts with ``ON CONFLICT DO NOTHING`` and can simply be re-run.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+import orjson
+from psycopg import Cursor
+from psycopg.types.json import Jsonb
+from pydantic import BaseModel, ValidationError
+
+from erp.config import Settings
+from erp.db.client import db_cursor
+from erp.labeling.common.engine import Candidate, LabelStats, PhaseSpec
+from erp.labeling.common.prompt_loader import load_prompt
+from erp.labeling.common.sink import LabelSink
+from erp.labeling.llm.gemini import parse_response, request_body
+from erp.labeling.llm.gemini_batch import (
+    FAILED_STATES,
+    SUCCEEDED,
+    BatchProvider,
+    GeminiBatchProvider,
+)
+from erp.labeling.phase1.runner import PHASE1
+from erp.labeling.phase1.runner import select_candidates as select_phase1
+from erp.labeling.phase2.runner import PHASE2
+from erp.labeling.phase2.runner import select_candidates as select_phase2
+from erp.labeling.run_log import (
+    complete_run_failed,
+    complete_run_success,
+    create_run,
+    set_selected_count,
+)
+from erp.utils.logging import get_logger
+from erp.utils.text import input_hash as hash_llm_input
+from erp.utils.text import llm_input as build_llm_input
+
+
+logger = get_logger(__name__)
+
+# phase -> (prompt phase, spec, candidate selection)
+_PHASES: dict[str, tuple[int, PhaseSpec, Callable[..., list[Candidate]]]] = {
+    "phase1": (1, PHASE1, select_phase1),
+    "phase2": (2, PHASE2, select_phase2),
+}
+OPEN_STATUSES = ("prepared", "submitted", "completed")
+# provider_state of a prepared job whose batch may already exist at the provider.
+CREATING = "CREATING"
+# Result lines validated per events lookup.
+INGEST_CHUNK = 500
+
+
+@dataclass(frozen=True)
+class BatchJob:
+    """One row of ``public.labeling_batch_jobs`` (the columns batch steps use)."""
+
+    batch_job_id: int
+    phase: str
+    label_run_id: int
+    model: str
+    prompt_version: str
+    status: str
+    request_count: int
+    request_file: str
+    input_file: Optional[str]
+    batch_name: Optional[str]
+    result_file: Optional[str]
+    provider_state: Optional[str] = None
+
+    @property
+    def display_name(self) -> str:
+        return f"erp-{self.phase}-{self.batch_job_id}"
+
+    @property
+    def result_path(self) -> Path:
+        return Path(self.request_file.removesuffix(".requests.jsonl") + ".results.jsonl")
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    """One line of a batch result file; ``output`` is None if it did not validate."""
+
+    service_request_id: str
+    input_hash: str
+    output: Optional[BaseModel]
+    error: Optional[str] = None
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+
+
+def request_key(service_request_id: str, input_hash: str) -> str:
+    """Key of one batch request; results are matched back to events by it."""
+    return f"{service_request_id}:{input_hash}"
+
+
+def read_results(path: Path, schema: type[BaseModel]) -> Iterator[BatchResult]:
+    """Parse a JSONL result file, validating every response against ``schema``."""
+    with path.open("rb") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            item = orjson.loads(line)
+            service_request_id, _, input_hash = str(item.get("key") or "").partition(":")
+            response = item.get("response")
+            if not isinstance(response, dict):
+                error = item.get("error") or item.get("status") or "missing response"
+                if isinstance(error, dict):
+                    error = error.get("message") or error
+                yield BatchResult(service_request_id, input_hash, None, str(error))
+                continue
+
+            usage = response.get("usageMetadata") or {}
+            output: Optional[BaseModel] = None
+            error = None
+            try:
+                output = parse_response(response, schema)
+            except (ValidationError, ValueError) as exc:
+                error = str(exc)
+            yield BatchResult(
+                service_request_id,
+                input_hash,
+                output,
+                error,
+                prompt_tokens=int(usage.get("promptTokenCount") or 0),
+                output_tokens=int(usage.get("candidatesTokenCount") or 0),
+            )
+
+
+def prepare_job(
+    phase: str,
+    limit: Optional[int] = None,
+    prompt_version: Optional[str] = None,
+    model_id: Optional[str] = None,
+    relabel: bool = False,
+    settings: Optional[Settings] = None,
+) -> Optional[int]:
+    """Select events, write their request file and record a ``prepared`` job.
+
+    Selection is the phase runner's; with ``relabel`` events are selected
+    unless they already have a label of this prompt version. Returns the
+    batch job ID, or None if there is nothing to label.
+    """
+    settings = settings or Settings()
+    prompt_phase, _, select_candidates = _PHASES[phase]
+    prompt_version = prompt_version or getattr(settings, f"{phase}_prompt_version")
+    model_id = model_id or settings.gemini_model_id
+    prompt = load_prompt(phase=prompt_phase, prompt_version=prompt_version)
+
+    with db_cursor(settings) as cursor:
+        cursor.execute(
+            "select batch_job_id from public.labeling_batch_jobs "
+            "where phase = %s and prompt_version = %s and status = any(%s) "
+            "order by batch_job_id limit 1",
+            (phase, prompt_version, list(OPEN_STATUSES)),
+        )
+        row = cursor.fetchone()
+        if row is not None:
+            # Its events have no labels yet and would be selected again.
+            raise RuntimeError(
+                f"Batch job {row[0]} for {phase} {prompt_version} is still open; "
+                "resume it before preparing another"
+            )
+        candidates = select_candidates(
+            cursor, limit=limit, relabel_prompt_version=prompt_version if relabel else None
+        )
+
+    directory = Path(settings.labeling_batch_dir).resolve()
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    request_file = directory / f"{phase}_{prompt_version}_{stamp}.requests.jsonl"
+    tmp_file = request_file.with_suffix(".part")
+    request_count = 0
+    with tmp_file.open("wb") as handle:
+        for candidate in candidates:
+            llm_input = build_llm_input(candidate.title, candidate.description_redacted)
+            if not llm_input:
+                continue
+            line = {
+                "key": request_key(candidate.service_request_id, hash_llm_input(llm_input)),
+                "request": request_body(settings, f"{prompt}\n\nINPUT:\n{llm_input}\n"),
+            }
+            handle.write(orjson.dumps(line) + b"\n")
+            request_count += 1
+    if not request_count:
+        tmp_file.unlink()
+        logger.info(f"{phase}.batch.no_candidates", extra={"selected": len(candidates)})
+        return None
+    tmp_file.replace(request_file)
+
+    with db_cursor(settings) as cursor:
+        label_run_id = create_run(
+            cursor,
+            phase=phase,
+            model=model_id,
+            prompt_version=prompt_version,
+            dry_run=False,
+            requested_limit=limit,
+        )
+        set_selected_count(cursor, label_run_id, len(candidates))
+        cursor.execute(
+            "insert into public.labeling_batch_jobs "
+            "(phase, label_run_id, model, prompt_version, request_count, request_file) "
+            "values (%s, %s, %s, %s, %s, %s) returning batch_job_id",
+            (phase, label_run_id, model_id, prompt_version, request_count, str(request_file)),
+        )
+        row = cursor.fetchone()
+        if row is None:
+            raise RuntimeError("labeling_batch_jobs insert returned no batch_job_id")
+        batch_job_id = int(row[0])
+
+    logger.info(
+        f"{phase}.batch.prepared",
+        extra={
+            "batch_job_id": batch_job_id,
+            "label_run_id": label_run_id,
+            "selected": len(candidates),
+            "requests": request_count,
+            "request_file": str(request_file),
+        },
+    )
+    return batch_job_id
+
+
+def advance_job(batch_job_id: int, provider: BatchProvider, settings: Settings) -> str:
+    """Take a job through as many steps as are possible now; returns its status."""
+    with db_cursor(settings) as cursor:
+        job = _load_job(cursor, batch_job_id)
+    if job.status == "prepared":
+        job = _submit(job, provider, settings)
+    if job.status == "submitted":
+        job = _poll(job, provider, settings)
+    if job.status == "completed":
+        job = _ingest(job, provider, settings)
+    return job.status
+
+
+def submit_job(
+    phase: str,
+    limit: Optional[int] = None,
+    prompt_version: Optional[str] = None,
+    model_id: Optional[str] = None,
+    relabel: bool = False,
+    provider: Optional[BatchProvider] = None,
+) -> Optional[int]:
+    """Prepare a batch job and submit it; returns its ID (None if nothing to label)."""
+    settings = Settings()
+    batch_job_id = prepare_job(phase, limit, prompt_version, model_id, relabel, settings)
+    if batch_job_id is None:
+        return None
+    owned = provider is None
+    provider = provider or GeminiBatchProvider(settings)
+    try:
+        advance_job(batch_job_id, provider, settings)
+    finally:
+        if owned:
+            provider.close()
+    return batch_job_id
+
+
+def resume_jobs(
+    batch_job_id: Optional[int] = None,
+    wait: bool = False,
+    provider: Optional[BatchProvider] = None,
+) -> dict[int, str]:
+    """Advance every open batch job (or just ``batch_job_id``).
+
+    With ``wait`` submitted jobs are polled every LABELING_BATCH_POLL_SECONDS
+    until they are ingested or failed. Returns the status of each job.
+    """
+    settings = Settings()
+    with db_cursor(settings) as cursor:
+        cursor.execute(
+            "select batch_job_id from public.labeling_batch_jobs "
+            "where status = any(%s) and (%s::bigint is null or batch_job_id = %s) "
+            "order by batch_job_id",
+            (list(OPEN_STATUSES), batch_job_id, batch_job_id),
+        )
+        open_ids = [int(row[0]) for row in cursor.fetchall()]
+
+    owned = provider is None
+    provider = provider or GeminiBatchProvider(settings)
+    statuses: dict[int, str] = {}
+    try:
+        while True:
+            for job_id in open_ids:
+                statuses[job_id] = advance_job(job_id, provider, settings)
+            open_ids = [job_id for job_id in open_ids if statuses[job_id] in OPEN_STATUSES]
+            if not wait or not open_ids:
+                return statuses
+            time.sleep(settings.labeling_batch_poll_seconds)
+    finally:
+        if owned:
+            provider.close()
+
+
+_JOB_SELECT = (
+    "select batch_job_id, phase, label_run_id, model, prompt_version, status, request_count, "
+    "request_file, input_file, batch_name, result_file, provider_state "
+    "from public.labeling_batch_jobs "
+    "where batch_job_id = %s"
+)
+
+
+def _load_job(cursor: Cursor, batch_job_id: int) -> BatchJob:
+    cursor.execute(_JOB_SELECT, (batch_job_id,))
+    row = cursor.fetchone()
+    if row is None:
+        raise ValueError(f"Unknown batch job {batch_job_id}")
+    return BatchJob(*row)
+
+
+def _update_job(
+    settings: Settings, job: BatchJob, assignments: str, params: tuple[Any, ...]
+) -> None:
+    with db_cursor(settings) as cursor:
+        cursor.execute(
+            f"update public.labeling_batch_jobs set {assignments} where batch_job_id = %s",
+            (*params, job.batch_job_id),
+        )
+
+
+def _require(job: BatchJob, column: str) -> str:
+    value = getattr(job, column)
+    if value is None:
+        raise ValueError(
+            f"Batch job {job.batch_job_id} is {job.status} but has no {column}; "
+            "fix or delete its labeling_batch_jobs row"
+        )
+    return str(value)
+
+
+def _submit(job: BatchJob, provider: BatchProvider, settings: Settings) -> BatchJob:
+    input_file = job.input_file
+    if input_file is None:
+        input_file = provider.upload(Path(job.request_file), job.display_name)
+        _update_job(settings, job, "input_file = %s", (input_file,))
+        job = replace(job, input_file=input_file)
+
+    # A job left CREATING crashed around provider.create: reuse the batch if it
+    # was created, so resuming never pays for the same requests twice.
+    batch_name = provider.find(job.display_name) if job.provider_state == CREATING else None
+    if batch_name is None:
+        _update_job(settings, job, "provider_state = %s", (CREATING,))
+        batch_name = provider.create(job.model, input_file, job.display_name)
+    _update_job(
+        settings,
+        job,
+        "status = 'submitted', submitted_at = now(), batch_name = %s, provider_state = null",
+        (batch_name,),
+    )
+    logger.info(
+        f"{job.phase}.batch.submitted",
+        extra={
+            "batch_job_id": job.batch_job_id,
+            "batch_name": batch_name,
+            "input_file": job.input_file,
+        },
+    )
+    return replace(job, status="submitted", batch_name=batch_name)
+
+
+def _poll(job: BatchJob, provider: BatchProvider, settings: Settings) -> BatchJob:
+    status = provider.get(_require(job, "batch_name"))
+    if status.state == SUCCEEDED and status.result_file:
+        _update_job(
+            settings,
+            job,
+            "status = 'completed', completed_at = now(), provider_state = %s, result_file = %s",
+            (status.state, status.result_file),
+        )
+        logger.info(f"{job.phase}.batch.completed", extra={"batch_job_id": job.batch_job_id})
+        return replace(job, status="completed", result_file=status.result_file)
+
+    if status.state in FAILED_STATES or status.state == SUCCEEDED:
+        error = status.error or f"batch {status.state.lower()} without results"
+        with db_cursor(settings) as cursor:
+            cursor.execute(
+                "update public.labeling_batch_jobs set status = 'failed', completed_at = now(), "
+                "provider_state = %s, error_json = %s where batch_job_id = %s",
+                (status.state, Jsonb({"error": error}), job.batch_job_id),
+            )
+            complete_run_failed(
+                cursor,
+                label_run_id=job.label_run_id,
+                error=RuntimeError(error),
+                attempted_count=job.request_count,
+            )
+        logger.error(
+            f"{job.phase}.batch.failed",
+            extra={"batch_job_id": job.batch_job_id, "state": status.state, "error": error},
+        )
+        return replace(job, status="failed")
+
+    _update_job(settings, job, "provider_state = %s", (status.state,))
+    return job
+
+
+def _ingest(job: BatchJob, provider: BatchProvider, settings: Settings) -> BatchJob:
+    _, spec, _ = _PHASES[job.phase]
+    result_path = job.result_path
+    if not result_path.exists():
+        provider.download(_require(job, "result_file"), result_path)
+
+    stats = LabelStats(attempted=job.request_count)
+    sink = LabelSink(spec, settings, job.model, job.prompt_version)
+    seen = 0
+
+    def flush() -> None:
+        inserted, present = sink.flush()
+        stats.inserted += len(inserted)
+        stats.skipped += len(present)
+        for candidate in inserted:
+            stats.record_inserted(candidate)
+
+    results = read_results(result_path, spec.schema)
+    while chunk := list(islice(results, INGEST_CHUNK)):
+        seen += len(chunk)
+        with db_cursor(settings) as cursor:
+            events = _load_candidates(cursor, [result.service_request_id for result in chunk])
+        for result in chunk:
+            stats.prompt_tokens += result.prompt_tokens
+            stats.output_tokens += result.output_tokens
+            candidate = events.get(result.service_request_id)
+            if result.output is None or candidate is None:
+                stats.failures += 1
+                logger.warning(
+                    f"{job.phase}.batch.label.failed",
+                    extra={
+                        "batch_job_id": job.batch_job_id,
+                        "service_request_id": result.service_request_id,
+                        "error": result.error or "event not found",
+                    },
+                )
+                continue
+            sink.add(candidate, result.input_hash, spec.output_values(result.output))
+            if sink.due():
+                flush()
+    flush()
+    # Requests the provider returned no line for.
+    stats.failures += max(0, job.request_count - seen)
+
+    with db_cursor(settings) as cursor:
+        cursor.execute(
+            "select selected_count from public.labeling_runs where label_run_id = %s",
+            (job.label_run_id,),
+        )
+        row = cursor.fetchone()
+        if row is None:
+            raise ValueError(
+                f"Batch job {job.batch_job_id} references missing labeling run "
+                f"{job.label_run_id}"
+            )
+        selected_count = int(row[0])
+        complete_run_success(
+            cursor,
+            label_run_id=job.label_run_id,
+            attempted_count=stats.attempted,
+            inserted_count=stats.inserted,
+            # Events without LLM input were never requested.
+            skipped_count=stats.skipped + selected_count - job.request_count,
+            failed_count=stats.failures,
+            prompt_token_count=stats.prompt_tokens,
+            output_token_count=stats.output_tokens,
+            tokens_per_event=stats.tokens_per_event,
+            first_labeled_service_request_id=stats.first_labeled_service_request_id,
+            last_labeled_service_request_id=stats.last_labeled_service_request_id,
+            min_labeled_requested_at=stats.min_requested_at,
+            max_labeled_requested_at=stats.max_requested_at,
+        )
+        cursor.execute(
+            "update public.labeling_batch_jobs set status = 'ingested', ingested_at = now(), "
+            "inserted_count = %s, skipped_count = %s, failed_count = %s where batch_job_id = %s",
+            (stats.inserted, stats.skipped, stats.failures, job.batch_job_id),
+        )
+
+    logger.info(
+        f"{job.phase}.batch.ingested",
+        extra={
+            "batch_job_id": job.batch_job_id,
+            "label_run_id": job.label_run_id,
+            "labeled": stats.inserted,
+            "skipped": stats.skipped,
+            "failures": stats.failures,
+            "tokens_per_event": stats.tokens_per_event,
+        },
+    )
+    return replace(job, status="ingested")
+
+
+def _load_candidates(cursor: Cursor, service_request_ids: list[str]) -> dict[str, Candidate]:
+    """Events by ID with the fields the label frontier needs (no text)."""
+    cursor.execute(
+        "select service_request_id, null, null, requested_at, year, sequence_number, "
+        "near_duplicate_of from public.events where service_request_id = any(%s)",
+        (service_request_ids,),
+    )
+    return {row[0]: Candidate(*row) for row in cursor.fetchall()}
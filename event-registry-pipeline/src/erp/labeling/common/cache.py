@@ -0,0 +1,87 @@
+"""Label cache keyed by (phase, prompt_version, model, input_hash)."""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Iterable, Optional
+
+from psycopg import Cursor
+
+from erp.labeling.common.reuse import _LABEL_TABLES
+
+
+CacheKey = tuple[str, str, str, str]  # (phase, prompt_version, model, input_hash)
+
+
+class LabelCache:
+    """Bounded LRU of label output values in front of the label tables.
+
+    Values are the phase's output columns as stored (see
+    ``reuse._LABEL_TABLES``). Misses are filled from the label tables with one
+    query per :meth:`prefetch` call; labels produced in this process are
+    added with :meth:`put`.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max(1, max_size)
+        self._entries: OrderedDict[CacheKey, tuple[Any, ...]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: CacheKey) -> Optional[tuple[Any, ...]]:
+        with self._lock:
+            values = self._entries.get(key)
+            if values is not None:
+                self._entries.move_to_end(key)
+            return values
+
+    def put(self, key: CacheKey, values: tuple[Any, ...]) -> None:
+        with self._lock:
+            self._entries[key] = values
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def prefetch(
+        self,
+        cursor: Cursor,
+        phase: str,
+        prompt_version: str,
+        model: str,
+        input_hashes: Iterable[str],
+    ) -> None:
+        """Load the latest stored label of every input hash not cached yet."""
+        with self._lock:
+            wanted = {
+                input_hash
+                for input_hash in input_hashes
+                if (phase, prompt_version, model, input_hash) not in self._entries
+            }
+        if not wanted:
+            return
+
+        table, columns = _LABEL_TABLES[phase]
+        cursor.execute(
+            f"select distinct on (input_hash) input_hash, {', '.join(columns)} from {table} "
+            "where input_hash = any(%s) and prompt_version = %s and model = %s "
+            "order by input_hash, created_at desc",
+            (list(wanted), prompt_version, model),
+        )
+        for input_hash, *values in cursor.fetchall():
+            self.put((phase, prompt_version, model, input_hash), tuple(values))
+
+
+_cache: Optional[LabelCache] = None
+_cache_lock = threading.Lock()
+
+
+def label_cache(max_size: int) -> LabelCache:
+    """The process-wide cache (created with ``max_size`` on first use)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LabelCache(max_size)
+        return _cache
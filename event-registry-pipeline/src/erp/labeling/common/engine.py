@@ -0,0 +1,442 @@
+"""Concurrent labeling loop shared by the Phase 1 and Phase 2 runners.
+
+Candidates are walked in selection order on the calling thread. LLM requests
+run on a thread pool with at most ``concurrency`` in flight; their results
+come back to the calling thread, which is the only one that writes labels
+(through a buffered :class:`~erp.labeling.common.sink.LabelSink`) and updates
+the run counters. With a pack size above 1, one request labels several events.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from pydantic import BaseModel
+
+from erp.config import Settings
+from erp.db.client import db_cursor
+from erp.labeling.common.cache import LabelCache, label_cache
+from erp.labeling.common.reuse import _LABEL_TABLES, reuse_label
+from erp.labeling.common.sink import LabelSink
+from erp.labeling.llm.gemini import GeminiClient, TokenUsage
+from erp.utils.logging import get_logger
+from erp.utils.text import input_hash as hash_llm_input
+from erp.utils.text import llm_input as build_llm_input
+
+
+logger = get_logger(__name__)
+
+# generate_structured result: (output, latency_ms, attempts, error)
+_Generated = tuple[Optional[BaseModel], int, int, Optional[str]]
+# Candidates whose cached labels are loaded from the label tables in one query.
+PREFETCH_CHUNK = 500
+
+PACKED_INSTRUCTIONS = """
+MEHRERE MELDUNGEN:
+Unten stehen mehrere Meldungen, jede unter "INPUT <service_request_id>:".
+Bewerte jede Meldung unabhängig von den anderen nach den obigen Regeln.
+Gib ein JSON-Array mit genau einem Objekt pro Meldung zurück; jedes Objekt
+hat die oben beschriebenen Felder plus "service_request_id" (die ID aus der
+INPUT-Zeile).
+"""
+
+
+@dataclass(frozen=True)
+class PhaseSpec:
+    """What differs between the labeling phases.
+
+    ``output_values`` maps a validated output to the values of the phase's
+    label columns (see ``reuse._LABEL_TABLES``); ``log_fields`` to the extra
+    fields of the ``<phase>.label.ok`` log line.
+    """
+
+    phase: str
+    schema: type[BaseModel]
+    output_values: Callable[[Any], tuple[Any, ...]]
+    log_fields: Callable[[Any], dict[str, Any]]
+
+    @property
+    def table(self) -> str:
+        return _LABEL_TABLES[self.phase][0]
+
+    @property
+    def output_columns(self) -> tuple[str, ...]:
+        return _LABEL_TABLES[self.phase][1]
+
+
+@dataclass(frozen=True)
+class Candidate:
+    """One selected event, in the column order of the runners' select."""
+
+    service_request_id: str
+    title: Optional[str]
+    description_redacted: Optional[str]
+    requested_at: Any
+    year: int
+    sequence_number: int
+    near_duplicate_of: Optional[str]
+
+
+@dataclass
+class LabelStats:
+    """Run counters plus the ID/time frontier of inserted labels.
+
+    ``cache_hits`` counts events labeled from the label cache or by sharing
+    an identical in-flight request; ``cache_misses`` the events sent to the
+    LLM while the cache was enabled. ``prompt_tokens``/``output_tokens`` are
+    the tokens billed for the run's requests, including retries.
+    """
+
+    attempted: int = 0
+    inserted: int = 0
+    skipped: int = 0
+    failures: int = 0
+    reused: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    first_id: Optional[tuple[int, int, str]] = None  # (year, seq, srid) min
+    last_id: Optional[tuple[int, int, str]] = None  # (year, seq, srid) max
+    min_requested_at: Any = None
+    max_requested_at: Any = None
+
+    def record_inserted(self, candidate: Candidate) -> None:
+        key = (int(candidate.year), int(candidate.sequence_number), candidate.service_request_id)
+        if self.first_id is None or key < self.first_id:
+            self.first_id = key
+        if self.last_id is None or key > self.last_id:
+            self.last_id = key
+        requested_at = candidate.requested_at
+        if self.min_requested_at is None or requested_at < self.min_requested_at:
+            self.min_requested_at = requested_at
+        if self.max_requested_at is None or requested_at > self.max_requested_at:
+            self.max_requested_at = requested_at
+
+    @property
+    def tokens_per_event(self) -> Optional[float]:
+        """Billed tokens per event sent to the LLM; None if none was."""
+        if not self.attempted:
+            return None
+        return (self.prompt_tokens + self.output_tokens) / self.attempted
+
+    @property
+    def first_labeled_service_request_id(self) -> Optional[str]:
+        return self.first_id[2] if self.first_id else None
+
+    @property
+    def last_labeled_service_request_id(self) -> Optional[str]:
+        return self.last_id[2] if self.last_id else None
+
+
+@dataclass
+class _Request:
+    """One distinct input sent to the LLM and the candidates waiting for it."""
+
+    input_hash: str
+    llm_input: str
+    candidates: list[Candidate] = field(default_factory=list)
+
+    @property
+    def key(self) -> str:
+        # The first candidate made the request; its ID keys a packed answer.
+        return self.candidates[0].service_request_id
+
+
+def label_events(
+    spec: PhaseSpec,
+    candidates: Iterable[Candidate],
+    client: GeminiClient,
+    prompt: str,
+    settings: Settings,
+    label_run_id: int,
+    prompt_version: str,
+    model_id: str,
+    dry_run: bool = False,
+    concurrency: Optional[int] = None,
+    pack_size: Optional[int] = None,
+) -> LabelStats:
+    """Label ``candidates`` with up to ``concurrency`` LLM requests in flight.
+
+    ``concurrency`` defaults to LABELING_CONCURRENCY; 1 labels strictly one
+    event at a time. Counters and frontier match the sequential loop: a
+    near-duplicate whose source is still in flight or buffered waits for that
+    label to be written before trying to reuse it. If labeling fails, labels
+    already buffered are still flushed.
+
+    With LABELING_CACHE_ENABLED an event whose input was already labeled with
+    the same prompt version and model (see :class:`LabelCache`) gets a copy of
+    that label, and identical inputs within the run share one LLM request.
+
+    ``pack_size`` (default LABELING_PACK_SIZE) above 1 sends up to that many
+    distinct inputs per request (see :func:`_label_pack`).
+    """
+    stats = LabelStats()
+    concurrency = max(1, concurrency or settings.labeling_concurrency)
+    pack_size = max(1, pack_size or settings.labeling_pack_size)
+    sink = None if dry_run else LabelSink(spec, settings, model_id, prompt_version)
+    cache = label_cache(settings.labeling_cache_size) if settings.labeling_cache_enabled else None
+    usage = getattr(client, "usage", None) or TokenUsage()
+    prompt_tokens_before, output_tokens_before = usage.prompt_tokens, usage.output_tokens
+    # future -> its requests, in the order of its results
+    in_flight: dict[Future[list[_Generated]], list[_Request]] = {}
+    # Requests in flight or still waiting in ``pack``, by input hash.
+    in_flight_by_hash: dict[str, _Request] = {}
+    in_flight_ids: set[str] = set()
+    pack: list[_Request] = []
+
+    def cache_key(input_hash: str) -> tuple[str, str, str, str]:
+        return (spec.phase, prompt_version, model_id, input_hash)
+
+    def store(candidate: Candidate, input_hash: str, values: tuple[Any, ...]) -> None:
+        if sink is None:
+            stats.inserted += 1
+        else:
+            # Counted as inserted or skipped when the sink flushes.
+            sink.add(candidate, input_hash, values)
+
+    def flush() -> None:
+        if sink is None:
+            return
+        inserted, present = sink.flush()
+        stats.inserted += len(inserted)
+        stats.skipped += len(present)
+        for candidate in inserted:
+            stats.record_inserted(candidate)
+
+    def collect() -> None:
+        # Wake up in time to flush a buffer that is due by age.
+        timeout = sink.seconds_until_due() if sink is not None else None
+        done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            requests = in_flight.pop(future)
+            for request, result in zip(requests, future.result()):
+                if in_flight_by_hash.get(request.input_hash) is request:
+                    del in_flight_by_hash[request.input_hash]
+                values = _check_result(
+                    spec, stats, request.candidates, result, label_run_id, dry_run
+                )
+                for candidate in request.candidates:
+                    in_flight_ids.discard(candidate.service_request_id)
+                    if values is not None:
+                        store(candidate, request.input_hash, values)
+                if values is not None and cache is not None:
+                    cache.put(cache_key(request.input_hash), values)
+        if sink is not None and sink.due():
+            flush()
+
+    def submit(pool: ThreadPoolExecutor) -> None:
+        while len(in_flight) >= concurrency:
+            collect()
+        requests = pack.copy()
+        pack.clear()
+        if len(requests) == 1:
+            full_prompt = f"{prompt}\n\nINPUT:\n{requests[0].llm_input}\n"
+            future = pool.submit(_label_one, client, full_prompt, spec.schema)
+        else:
+            future = pool.submit(_label_pack, spec, client, prompt, requests, label_run_id)
+        in_flight[future] = requests
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=spec.phase) as pool:
+            for chunk in _prepared_chunks(candidates, cache):
+                if cache is not None:
+                    with db_cursor(settings) as cursor:
+                        cache.prefetch(
+                            cursor,
+                            spec.phase,
+                            prompt_version,
+                            model_id,
+                            (input_hash for _, _, input_hash in chunk),
+                        )
+
+                for candidate, llm_input, input_hash in chunk:
+                    if not llm_input:
+                        stats.skipped += 1
+                        continue
+
+                    source_id = candidate.near_duplicate_of
+                    if source_id and settings.near_duplicate_reuse_labels:
+                        if any(
+                            source_id == waiting.service_request_id
+                            for request in pack
+                            for waiting in request.candidates
+                        ):
+                            submit(pool)
+                        while source_id in in_flight_ids:
+                            collect()
+                        if sink is not None and source_id in sink:
+                            flush()
+                        with db_cursor(settings) as cursor:
+                            reused_now = reuse_label(
+                                cursor,
+                                phase=spec.phase,
+                                service_request_id=candidate.service_request_id,
+                                source_service_request_id=source_id,
+                                prompt_version=prompt_version,
+                                model=model_id,
+                                input_hash=input_hash,
+                                dry_run=dry_run,
+                            )
+                        if reused_now:
+                            stats.reused += 1
+                            stats.inserted += 1
+                            if not dry_run:
+                                stats.record_inserted(candidate)
+                            logger.info(
+                                f"{spec.phase}.label.reused",
+                                extra={
+                                    "label_run_id": label_run_id,
+                                    "service_request_id": candidate.service_request_id,
+                                    "near_duplicate_of": source_id,
+                                    "dry_run": dry_run,
+                                },
+                            )
+                            continue
+
+                    if cache is not None:
+                        cached = cache.get(cache_key(input_hash))
+                        if cached is not None:
+                            stats.cache_hits += 1
+                            logger.info(
+                                f"{spec.phase}.label.cached",
+                                extra={
+                                    "label_run_id": label_run_id,
+                                    "service_request_id": candidate.service_request_id,
+                                    "dry_run": dry_run,
+                                },
+                            )
+                            store(candidate, input_hash, cached)
+                            continue
+                        pending = in_flight_by_hash.get(input_hash)
+                        if pending is not None:
+                            stats.cache_hits += 1
+                            pending.candidates.append(candidate)
+                            in_flight_ids.add(candidate.service_request_id)
+                            continue
+                        stats.cache_misses += 1
+
+                    stats.attempted += 1
+                    request = _Request(input_hash, llm_input, [candidate])
+                    pack.append(request)
+                    in_flight_by_hash[input_hash] = request
+                    in_flight_ids.add(candidate.service_request_id)
+                    if len(pack) >= pack_size:
+                        submit(pool)
+
+            if pack:
+                submit(pool)
+            while in_flight:
+                collect()
+    except BaseException:
+        # Keep the labels that were already paid for; the original error wins.
+        try:
+            flush()
+        except Exception:
+            logger.exception(f"{spec.phase}.label.flush_failed")
+        raise
+    finally:
+        stats.prompt_tokens = usage.prompt_tokens - prompt_tokens_before
+        stats.output_tokens = usage.output_tokens - output_tokens_before
+
+    flush()
+    return stats
+
+
+def _label_one(client: GeminiClient, full_prompt: str, schema: type[BaseModel]) -> list[_Generated]:
+    return [client.generate_structured(full_prompt, schema)]
+
+
+def _label_pack(
+    spec: PhaseSpec,
+    client: GeminiClient,
+    prompt: str,
+    requests: list[_Request],
+    label_run_id: int,
+) -> list[_Generated]:
+    """Label ``requests`` with one packed request; retry unanswered ones singly.
+
+    The packed prompt lists every input under its request key and asks for an
+    array of outputs keyed by ``service_request_id``. Items that are missing
+    or fail validation are retried one at a time with the single-event
+    prompt; their attempts and latency include the packed request.
+    """
+    inputs = "".join(f"\nINPUT {request.key}:\n{request.llm_input}\n" for request in requests)
+    outputs, latency_ms, error = client.generate_packed(
+        f"{prompt}\n{PACKED_INSTRUCTIONS}{inputs}",
+        spec.schema,
+        [request.key for request in requests],
+    )
+    if error:
+        logger.warning(
+            f"{spec.phase}.label.pack_incomplete",
+            extra={"label_run_id": label_run_id, "pack_size": len(requests), "error": error},
+        )
+
+    results: list[_Generated] = []
+    for request in requests:
+        output = outputs.get(request.key)
+        if output is not None:
+            results.append((output, latency_ms, 1, None))
+            continue
+        full_prompt = f"{prompt}\n\nINPUT:\n{request.llm_input}\n"
+        output, retry_latency_ms, attempts, retry_error = client.generate_structured(
+            full_prompt, spec.schema
+        )
+        results.append((output, latency_ms + retry_latency_ms, attempts + 1, retry_error))
+    return results
+
+
+def _prepared_chunks(
+    candidates: Iterable[Candidate], cache: Optional[LabelCache]
+) -> Iterator[list[tuple[Candidate, str, str]]]:
+    """Yield ``(candidate, llm_input, input_hash)`` in prefetch-sized chunks."""
+    size = min(PREFETCH_CHUNK, cache.max_size) if cache is not None else PREFETCH_CHUNK
+    iterator = iter(candidates)
+    while chunk := list(islice(iterator, size)):
+        prepared = []
+        for candidate in chunk:
+            llm_input = build_llm_input(candidate.title, candidate.description_redacted)
+            prepared.append((candidate, llm_input, hash_llm_input(llm_input) if llm_input else ""))
+        yield prepared
+
+
+def _check_result(
+    spec: PhaseSpec,
+    stats: LabelStats,
+    candidates: list[Candidate],
+    result: _Generated,
+    label_run_id: int,
+    dry_run: bool,
+) -> Optional[tuple[Any, ...]]:
+    """Log one LLM result for every candidate sharing it; returns the output values."""
+    output, latency_ms, attempts, error = result
+    for candidate in candidates:
+        if output is None:
+            stats.failures += 1
+            logger.warning(
+                f"{spec.phase}.label.failed",
+                extra={
+                    "label_run_id": label_run_id,
+                    "service_request_id": candidate.service_request_id,
+                    "attempts": attempts,
+                    "latency_ms": latency_ms,
+                    "error": error,
+                },
+            )
+        else:
+            logger.info(
+                f"{spec.phase}.label.ok",
+                extra={
+                    "label_run_id": label_run_id,
+                    "service_request_id": candidate.service_request_id,
+                    **spec.log_fields(output),
+                    "attempts": attempts,
+                    "latency_ms": latency_ms,
+                    "dry_run": dry_run,
+                },
+            )
+    return spec.output_values(output) if output is not None else None
@@ -0,0 +1,55 @@
+"""Reuse labels of an event's near-duplicate instead of calling the LLM."""
+
+from __future__ import annotations
+
+from psycopg import Cursor
+
+
+# phase -> (label table, copied output columns)
+_LABEL_TABLES = {
+    "phase1": (
+        "public.event_phase1_labels",
+        ("bike_related", "confidence", "evidence", "reasoning"),
+    ),
+    "phase2": (
+        "public.event_phase2_labels",
+        ("bike_issue_category", "confidence", "evidence", "reasoning"),
+    ),
+}
+
+
+def reuse_label(
+    cursor: Cursor,
+    phase: str,
+    service_request_id: str,
+    source_service_request_id: str,
+    prompt_version: str,
+    model: str,
+    input_hash: str,
+    dry_run: bool = False,
+) -> bool:
+    """Copy the latest label of ``source_service_request_id`` onto ``service_request_id``.
+
+    Only labels produced by the same prompt version and model are reused. The
+    copy keeps the event's own ``input_hash``. With ``dry_run`` nothing is
+    written; returns whether a reusable label exists.
+    """
+    table, columns = _LABEL_TABLES[phase]
+    source_filter = "where service_request_id = %s and prompt_version = %s and model = %s"
+    if dry_run:
+        cursor.execute(
+            f"select 1 from {table} {source_filter} limit 1",
+            (source_service_request_id, prompt_version, model),
+        )
+        return cursor.fetchone() is not None
+
+    column_list = ", ".join(columns)
+    cursor.execute(
+        f"insert into {table} (service_request_id, model, prompt_version, input_hash, "
+        f"{column_list}) "
+        f"select %s, model, prompt_version, %s, {column_list} from {table} {source_filter} "
+        "order by created_at desc limit 1 "
+        "on conflict (service_request_id, prompt_version, input_hash) do nothing",
+        (service_request_id, input_hash, source_service_request_id, prompt_version, model),
+    )
+    return bool(cursor.rowcount)
@@ -41,7 +41,8 @@ PHASE2_CATEGORIES: tuple[str, ...] = (
 class Phase2Output(BaseModel):
     """Structured output for Phase 2 (bike-issue category)."""
 
-    category: str
+    # The enum also constrains the packed response schema (see llm.gemini).
+    category: str = Field(json_schema_extra={"enum": list(PHASE2_CATEGORIES)})
     evidence: list[str] = Field(default_factory=list)
     reasoning: str = ""
     confidence: float = 0.0
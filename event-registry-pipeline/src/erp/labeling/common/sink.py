@@ -0,0 +1,112 @@
+"""Buffered writer for phase 1/phase 2 label rows."""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Any, Optional
+
+from erp.config import Settings
+from erp.db.client import db_cursor
+
+if TYPE_CHECKING:
+    from erp.labeling.common.engine import Candidate, PhaseSpec
+
+
+class LabelSink:
+    """Buffer label rows and insert them every ``flush_rows`` rows or ``flush_seconds``.
+
+    A flush is one multi-row ``INSERT ... ON CONFLICT DO NOTHING RETURNING``
+    in its own transaction; the returned keys tell exactly which rows were
+    inserted and which already existed. A crash loses at most the buffered
+    rows. Defaults come from LABELING_FLUSH_ROWS and LABELING_FLUSH_SECONDS.
+    """
+
+    def __init__(
+        self,
+        spec: PhaseSpec,
+        settings: Settings,
+        model_id: str,
+        prompt_version: str,
+        flush_rows: Optional[int] = None,
+        flush_seconds: Optional[float] = None,
+    ) -> None:
+        self.spec = spec
+        self.settings = settings
+        self.model_id = model_id
+        self.prompt_version = prompt_version
+        self.flush_rows = max(1, flush_rows or settings.labeling_flush_rows)
+        self.flush_seconds = (
+            flush_seconds if flush_seconds is not None else settings.labeling_flush_seconds
+        )
+        self._rows: list[tuple[Candidate, str, tuple[Any, ...]]] = []
+        self._ids: set[str] = set()
+        self._first_added_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, service_request_id: object) -> bool:
+        return service_request_id in self._ids
+
+    def add(self, candidate: Candidate, input_hash: str, values: tuple[Any, ...]) -> None:
+        """Buffer one label; ``values`` are the phase's output column values."""
+        if not self._rows:
+            self._first_added_at = time.monotonic()
+        self._rows.append((candidate, input_hash, values))
+        self._ids.add(candidate.service_request_id)
+
+    def seconds_until_due(self) -> Optional[float]:
+        """Time left before the buffer is due by age; None while it is empty."""
+        if not self._rows:
+            return None
+        return max(0.0, self._first_added_at + self.flush_seconds - time.monotonic())
+
+    def due(self) -> bool:
+        return len(self._rows) >= self.flush_rows or self.seconds_until_due() == 0.0
+
+    def flush(self) -> tuple[list[Candidate], list[Candidate]]:
+        """Insert the buffer; returns ``(inserted, already_present)`` candidates."""
+        if not self._rows:
+            return [], []
+
+        columns = (
+            "service_request_id",
+            "model",
+            "prompt_version",
+            "input_hash",
+            *self.spec.output_columns,
+        )
+        placeholders = "(" + ", ".join(["%s"] * len(columns)) + ")"
+        params: list[Any] = []
+        for candidate, input_hash, values in self._rows:
+            params.extend(
+                (
+                    candidate.service_request_id,
+                    self.model_id,
+                    self.prompt_version,
+                    input_hash,
+                    *values,
+                )
+            )
+        with db_cursor(self.settings) as cursor:
+            cursor.execute(
+                f"insert into {self.spec.table} ({', '.join(columns)}) "
+                f"values {', '.join([placeholders] * len(self._rows))} "
+                "on conflict (service_request_id, prompt_version, input_hash) do nothing "
+                "returning service_request_id, input_hash",
+                params,
+            )
+            inserted_keys = set(cursor.fetchall())
+
+        inserted: list[Candidate] = []
+        present: list[Candidate] = []
+        for candidate, input_hash, _ in self._rows:
+            key = (candidate.service_request_id, input_hash)
+            if key in inserted_keys:
+                inserted_keys.discard(key)
+                inserted.append(candidate)
+            else:
+                present.append(candidate)
+        self._rows.clear()
+        self._ids.clear()
+        return inserted, present
@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
+import threading
 import time
-from dataclasses import dataclass
-from typing import Any, Optional, TypeVar
+from dataclasses import dataclass, field
+from typing import Any, Optional, Sequence, TypeVar
 
 import httpx
 import orjson
@@ -69,44 +70,159 @@ def _extract_json_string(text: str) -> str:
     raise ValueError("Could not extract valid JSON from model output")
 
 
+def parse_response(payload: dict[str, Any], schema: type[T]) -> T:
+    """Validate the JSON output of a ``generateContent`` response against ``schema``."""
+    return schema.model_validate_json(_extract_json_string(_extract_text_from_response(payload)))
+
+
+def _extract_json_array(text: str) -> list[Any]:
+    candidate = _strip_code_fences(text)
+    try:
+        value = orjson.loads(candidate)
+    except orjson.JSONDecodeError:
+        start = candidate.find("[")
+        end = candidate.rfind("]")
+        if not (start >= 0 and end > start):
+            raise ValueError("Could not extract a JSON array from model output")
+        value = orjson.loads(candidate[start : end + 1])
+    if not isinstance(value, list):
+        raise ValueError("Model output is not a JSON array")
+    return value
+
+
+def parse_packed(text: str, schema: type[T], ids: Sequence[str]) -> dict[str, T]:
+    """Validate the items of a packed response; returns the valid ones by ID.
+
+    Each item must carry one of the requested ``service_request_id`` values;
+    the remaining keys are validated against ``schema``. Unknown IDs, repeats
+    and invalid items are dropped.
+    """
+    wanted = set(ids)
+    outputs: dict[str, T] = {}
+    for item in _extract_json_array(text):
+        if not isinstance(item, dict):
+            continue
+        fields = dict(item)
+        service_request_id = fields.pop("service_request_id", None)
+        if service_request_id not in wanted or service_request_id in outputs:
+            continue
+        try:
+            outputs[service_request_id] = schema.model_validate(fields)
+        except ValidationError:
+            continue
+    return outputs
+
+
+def packed_response_schema(schema: type[BaseModel]) -> dict[str, Any]:
+    """Gemini ``responseSchema`` for an array of ``schema`` objects keyed by ID."""
+    properties: dict[str, Any] = {"service_request_id": {"type": "STRING"}}
+    for name, node in schema.model_json_schema()["properties"].items():
+        properties[name] = _gemini_type(node)
+    return {
+        "type": "ARRAY",
+        "items": {"type": "OBJECT", "properties": properties, "required": list(properties)},
+    }
+
+
+def _gemini_type(node: dict[str, Any]) -> dict[str, Any]:
+    converted: dict[str, Any] = {"type": node["type"].upper()}
+    if "enum" in node:
+        converted["enum"] = list(node["enum"])
+    if node["type"] == "array":
+        converted["items"] = _gemini_type(node["items"])
+    return converted
+
+
+def request_body(
+    settings: Settings,
+    prompt: str,
+    response_schema: Optional[dict[str, Any]] = None,
+    max_output_tokens: Optional[int] = None,
+) -> dict[str, Any]:
+    """A ``generateContent`` request body (also one request of a batch file)."""
+    body: dict[str, Any] = {
+        "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+        "generationConfig": {
+            "temperature": settings.gemini_temperature,
+            "maxOutputTokens": max_output_tokens or settings.gemini_max_output_tokens,
+            "responseMimeType": "application/json",
+        },
+    }
+    if response_schema is not None:
+        body["generationConfig"]["responseSchema"] = response_schema
+    return body
+
+
 @dataclass(frozen=True)
 class GeminiResult:
     text: str
     latency_ms: int
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+
+
+@dataclass
+class TokenUsage:
+    """Tokens billed over all requests of a client (``usageMetadata``)."""
+
+    requests: int = 0
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, result: GeminiResult) -> None:
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += result.prompt_tokens
+            self.output_tokens += result.output_tokens
 
 
 class GeminiClient:
-    """Minimal REST client for Gemini generateContent."""
+    """Minimal REST client for Gemini generateContent.
+
+    One HTTP client (and its keep-alive connections) is shared by all calls;
+    it is safe to call from several threads at once. ``usage`` sums the
+    tokens of every successful request.
+    """
 
     def __init__(self, settings: Optional[Settings] = None) -> None:
         self.settings = settings or Settings()
         if not self.settings.google_api_key:
             raise ValueError("GOOGLE_API_KEY must be set for Gemini labeling")
+        self._http = httpx.Client(timeout=self.settings.open311_timeout_seconds)
+        self.usage = TokenUsage()
+
+    def close(self) -> None:
+        self._http.close()
 
-    def _request(self, prompt: str) -> GeminiResult:
+    def _request(
+        self,
+        prompt: str,
+        response_schema: Optional[dict[str, Any]] = None,
+        max_output_tokens: Optional[int] = None,
+    ) -> GeminiResult:
         url = (
             f"{self.settings.gemini_api_base_url}/models/"
             f"{self.settings.gemini_model_id}:generateContent"
         )
         params = {"key": self.settings.google_api_key}
-        body: dict[str, Any] = {
-            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
-            "generationConfig": {
-                "temperature": self.settings.gemini_temperature,
-                "maxOutputTokens": self.settings.gemini_max_output_tokens,
-                "responseMimeType": "application/json",
-            },
-        }
+        body = request_body(self.settings, prompt, response_schema, max_output_tokens)
 
         start = time.time()
-        with httpx.Client(timeout=self.settings.open311_timeout_seconds) as client:
-            response = client.post(url, params=params, json=body)
-            response.raise_for_status()
-            payload = response.json()
+        response = self._http.post(url, params=params, json=body)
+        response.raise_for_status()
+        payload = response.json()
 
         latency_ms = int((time.time() - start) * 1000)
-        text = _extract_text_from_response(payload)
-        return GeminiResult(text=text, latency_ms=latency_ms)
+        usage = payload.get("usageMetadata") or {}
+        result = GeminiResult(
+            text=_extract_text_from_response(payload),
+            latency_ms=latency_ms,
+            prompt_tokens=int(usage.get("promptTokenCount") or 0),
+            output_tokens=int(usage.get("candidatesTokenCount") or 0),
+        )
+        self.usage.add(result)
+        return result
 
     def generate_structured(self, prompt: str, schema: type[T]) -> tuple[Optional[T], int, int, str | None]:
         """Generate and validate structured JSON output.
@@ -133,3 +249,24 @@ class GeminiClient:
 
         return None, total_latency, attempts, last_error
 
+    def generate_packed(
+        self, prompt: str, schema: type[T], ids: Sequence[str]
+    ) -> tuple[dict[str, T], int, str | None]:
+        """Label several inputs in one request with an array response schema.
+
+        ``prompt`` must list the inputs under their ``ids``. Returns
+        (valid outputs by ID, latency_ms, error_message); IDs missing from the
+        result were not answered validly and should be retried on their own.
+        """
+        try:
+            result = self._request(
+                prompt,
+                response_schema=packed_response_schema(schema),
+                max_output_tokens=self.settings.gemini_max_output_tokens * len(ids),
+            )
+            outputs = parse_packed(result.text, schema, ids)
+        except (httpx.HTTPError, ValueError) as exc:
+            return {}, 0, str(exc)
+        missing = len(ids) - len(outputs)
+        error = f"{missing} of {len(ids)} items missing or invalid" if missing else None
+        return outputs, result.latency_ms, error
@@ -0,0 +1,173 @@
+"""Gemini Batch API client (asynchronous batchGenerateContent jobs)."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional, Protocol
+
+import httpx
+
+from erp.config import Settings
+
+
+# Terminal states of a batch; the API reports them as BATCH_STATE_* or JOB_STATE_*.
+SUCCEEDED = "SUCCEEDED"
+FAILED_STATES = frozenset({"FAILED", "CANCELLED", "EXPIRED"})
+
+
+@dataclass(frozen=True)
+class BatchStatus:
+    """Provider view of one batch job.
+
+    ``state`` drops the ``BATCH_STATE_``/``JOB_STATE_`` prefix; ``result_file``
+    is set once the batch succeeded.
+    """
+
+    state: str
+    result_file: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.state == SUCCEEDED or self.state in FAILED_STATES
+
+
+class BatchProvider(Protocol):
+    """What batch labeling needs from an asynchronous batch endpoint."""
+
+    def upload(self, path: Path, display_name: str) -> str:
+        """Upload a JSONL request file; returns the provider's file name."""
+        ...
+
+    def create(self, model: str, input_file: str, display_name: str) -> str:
+        """Start a batch over an uploaded file; returns the batch name."""
+        ...
+
+    def find(self, display_name: str) -> Optional[str]:
+        """Name of an existing batch with ``display_name``, if there is one."""
+        ...
+
+    def get(self, batch_name: str) -> BatchStatus: ...
+
+    def download(self, file_name: str, path: Path) -> None:
+        """Write the JSONL result file to ``path``."""
+        ...
+
+    def close(self) -> None: ...
+
+
+class GeminiBatchProvider:
+    """REST client for the Gemini Files and Batch APIs.
+
+    URLs derive from GEMINI_API_BASE_URL (``<root>/<version>``): uploads go to
+    ``<root>/upload/<version>/files`` and downloads to
+    ``<root>/download/<version>/<file>:download``, so pointing the base URL at
+    a local stub server swaps the whole provider.
+    """
+
+    def __init__(self, settings: Optional[Settings] = None) -> None:
+        self.settings = settings or Settings()
+        if not self.settings.google_api_key:
+            raise ValueError("GOOGLE_API_KEY must be set for Gemini labeling")
+        self.base_url = self.settings.gemini_api_base_url.rstrip("/")
+        self._root, self._version = self.base_url.rsplit("/", 1)
+        self._params = {"key": self.settings.google_api_key}
+        self._http = httpx.Client(timeout=self.settings.open311_timeout_seconds)
+
+    def close(self) -> None:
+        self._http.close()
+
+    def upload(self, path: Path, display_name: str) -> str:
+        size = path.stat().st_size
+        start = self._http.post(
+            f"{self._root}/upload/{self._version}/files",
+            params=self._params,
+            headers={
+                "X-Goog-Upload-Protocol": "resumable",
+                "X-Goog-Upload-Command": "start",
+                "X-Goog-Upload-Header-Content-Length": str(size),
+                "X-Goog-Upload-Header-Content-Type": "application/jsonl",
+            },
+            json={"file": {"display_name": display_name}},
+        )
+        start.raise_for_status()
+        upload_url = start.headers["x-goog-upload-url"]
+
+        with path.open("rb") as handle:
+            response = self._http.post(
+                upload_url,
+                headers={
+                    "Content-Length": str(size),
+                    "X-Goog-Upload-Offset": "0",
+                    "X-Goog-Upload-Command": "upload, finalize",
+                },
+                content=handle.read(),
+            )
+        response.raise_for_status()
+        return str(response.json()["file"]["name"])
+
+    def create(self, model: str, input_file: str, display_name: str) -> str:
+        response = self._http.post(
+            f"{self.base_url}/models/{model}:batchGenerateContent",
+            params=self._params,
+            json={
+                "batch": {
+                    "display_name": display_name,
+                    "input_config": {"file_name": input_file},
+                }
+            },
+        )
+        response.raise_for_status()
+        return str(response.json()["name"])
+
+    def find(self, display_name: str) -> Optional[str]:
+        params = dict(self._params)
+        while True:
+            response = self._http.get(f"{self.base_url}/batches", params=params)
+            response.raise_for_status()
+            payload = response.json()
+            for batch in payload.get("operations") or payload.get("batches") or []:
+                metadata = batch.get("metadata") or {}
+                if (metadata.get("displayName") or batch.get("displayName")) == display_name:
+                    return str(batch["name"])
+            page_token = payload.get("nextPageToken")
+            if not page_token:
+                return None
+            params["pageToken"] = page_token
+
+    def get(self, batch_name: str) -> BatchStatus:
+        response = self._http.get(f"{self.base_url}/{batch_name}", params=self._params)
+        response.raise_for_status()
+        return _batch_status(response.json())
+
+    def download(self, file_name: str, path: Path) -> None:
+        tmp_path = path.with_suffix(path.suffix + ".part")
+        with self._http.stream(
+            "GET",
+            f"{self._root}/download/{self._version}/{file_name}:download",
+            params={**self._params, "alt": "media"},
+        ) as response:
+            response.raise_for_status()
+            with tmp_path.open("wb") as handle:
+                for chunk in response.iter_bytes():
+                    handle.write(chunk)
+        tmp_path.replace(path)
+
+
+def _batch_status(payload: dict[str, Any]) -> BatchStatus:
+    metadata = payload.get("metadata") or {}
+    state = str(metadata.get("state") or payload.get("state") or "")
+    for prefix in ("BATCH_STATE_", "JOB_STATE_"):
+        state = state.removeprefix(prefix)
+    if payload.get("done") and not state:
+        state = "FAILED" if payload.get("error") else SUCCEEDED
+
+    result = payload.get("response") or metadata.get("output") or {}
+    error = payload.get("error")
+    return BatchStatus(
+        state=state or "PENDING",
+        result_file=result.get("responsesFile"),
+        error=str(error.get("message") or error) if isinstance(error, dict) else error,
+    )
+
@@ -38,6 +38,11 @@ def complete_run_success(
     inserted_count: int,
     skipped_count: int,
     failed_count: int,
+    cache_hit_count: int = 0,
+    cache_miss_count: int = 0,
+    prompt_token_count: int = 0,
+    output_token_count: int = 0,
+    tokens_per_event: float | None = None,
     first_labeled_service_request_id: str | None = None,
     last_labeled_service_request_id: str | None = None,
     min_labeled_requested_at: object | None = None,
@@ -46,6 +51,8 @@ def complete_run_success(
     cursor.execute(
         "update public.labeling_runs set status = 'success', finished_at = now(), "
         "attempted_count = %s, inserted_count = %s, skipped_count = %s, failed_count = %s, "
+        "cache_hit_count = %s, cache_miss_count = %s, "
+        "prompt_token_count = %s, output_token_count = %s, tokens_per_event = %s, "
         "first_labeled_service_request_id = %s, last_labeled_service_request_id = %s, "
         "min_labeled_requested_at = %s, max_labeled_requested_at = %s "
         "where label_run_id = %s",
@@ -54,6 +61,11 @@ def complete_run_success(
             inserted_count,
             skipped_count,
             failed_count,
+            cache_hit_count,
+            cache_miss_count,
+            prompt_token_count,
+            output_token_count,
+            tokens_per_event,
             first_labeled_service_request_id,
             last_labeled_service_request_id,
             min_labeled_requested_at,
@@ -53,6 +53,10 @@ class CanonicalEvent(BaseModel):
     skip_llm: bool = False
     is_link_only: bool = False
     is_flagged_abuse: bool = False
+    dedupe_key: Optional[str] = None
+    near_duplicate_of: Optional[str] = None
+    minhash_signature: Optional[list[int]] = None
+    minhash_bands: Optional[list[int]] = None
 
 
 class AcceptDecision(BaseModel):
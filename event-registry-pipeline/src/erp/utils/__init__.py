@@ -1,11 +1,12 @@
 """Utility helpers."""
 
-from erp.utils.hashing import hash_text
+from erp.utils.hashing import dedupe_key, hash_text
 from erp.utils.logging import configure_logging, get_logger
 from erp.utils.text import extract_media_path
 from erp.utils.time import parse_service_request_id
 
 __all__ = [
+    "dedupe_key",
     "hash_text",
     "configure_logging",
     "get_logger",
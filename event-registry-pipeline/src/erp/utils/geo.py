@@ -0,0 +1,53 @@
+"""Distance and fixed-metre grid helpers for spatial duplicate lookups."""
+
+from __future__ import annotations
+
+import math
+from typing import List
+
+
+EARTH_RADIUS_METERS = 6_371_008.8
+METERS_PER_DEGREE = 2 * math.pi * EARTH_RADIUS_METERS / 360
+_MAX_LAT = 89.999
+
+
+def distance_meters(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle (haversine) distance in metres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    h = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * math.asin(min(1.0, math.sqrt(h)))
+
+
+def grid_cell(lat: float, lon: float, cell_meters: float) -> tuple[int, int]:
+    """Return the ``(row, column)`` of the grid cell containing a point.
+
+    Rows are ``cell_meters`` of latitude. Each row is split into columns at
+    least ``cell_meters`` wide, measured at the row's pole-side edge.
+    """
+    row = math.floor(lat * METERS_PER_DEGREE / cell_meters)
+    return row, math.floor(lon / _column_degrees(row, cell_meters))
+
+
+def neighbour_cells(lat: float, lon: float, radius_meters: float) -> List[tuple[int, int]]:
+    """Cells of a ``radius_meters`` grid that can hold points within the radius.
+
+    Covers the point's row and the rows above and below, and in each of them
+    every column overlapping ``lon`` +/- the radius. Usually 9 cells.
+    """
+    row = math.floor(lat * METERS_PER_DEGREE / radius_meters)
+    reach_lat = min(_MAX_LAT, abs(lat) + radius_meters / METERS_PER_DEGREE)
+    reach_lon = radius_meters / (METERS_PER_DEGREE * math.cos(math.radians(reach_lat)))
+    cells: List[tuple[int, int]] = []
+    for neighbour_row in (row - 1, row, row + 1):
+        width = _column_degrees(neighbour_row, radius_meters)
+        first = math.floor((lon - reach_lon) / width)
+        last = math.floor((lon + reach_lon) / width)
+        cells.extend((neighbour_row, column) for column in range(first, last + 1))
+    return cells
+
+
+def _column_degrees(row: int, cell_meters: float) -> float:
+    edge = max(abs(row), abs(row + 1)) * cell_meters / METERS_PER_DEGREE
+    return cell_meters / (METERS_PER_DEGREE * math.cos(math.radians(min(_MAX_LAT, edge))))
@@ -3,8 +3,62 @@
 from __future__ import annotations
 
 import hashlib
+import json
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, Optional
+
+import orjson
+
+from erp.utils.text import normalize_for_dedupe
+
+
+# Coordinates are stored as numeric(.., 8); the key rounds them to this many places.
+DEDUPE_KEY_PRECISION = 4
+
+_STORED_QUANTUM = Decimal("1e-8")
+_KEY_QUANTUM = Decimal(1).scaleb(-DEDUPE_KEY_PRECISION)
 
 
 def hash_text(value: str) -> str:
     """Return a short SHA-256 hash for the provided text."""
     return hashlib.sha256(value.encode("utf-8")).hexdigest()[:12]
+
+
+def payload_hash(payload: dict[str, Any]) -> str:
+    """SHA-256 of a raw Open311 payload, independent of key order.
+
+    Stored in `event_payload_hashes` to recognize events re-fetched unchanged.
+    """
+    try:
+        encoded = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+    except TypeError:  # e.g. integers beyond 64 bits, which json handles
+        encoded = json.dumps(payload, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def dedupe_key(
+    description: str,
+    lat: float,
+    lon: float,
+    normalized: bool = False,
+    coord_keys: Optional[tuple[str, str]] = None,
+) -> str:
+    """Return the strict-duplicate key stored in `events.dedupe_key`.
+
+    SHA-256 over the normalized description and both coordinates rounded the
+    way Postgres rounds the stored ``numeric(.., 8)`` values: half away from
+    zero, first to 8 then to DEDUPE_KEY_PRECISION places. Migration 011
+    computes the same key in SQL. Pass ``normalized=True`` when ``description``
+    already is :func:`normalize_for_dedupe` output, and ``coord_keys`` when the
+    :func:`coord_key` strings were computed for a whole batch.
+    """
+    text = description if normalized else normalize_for_dedupe(description)
+    lat_key, lon_key = coord_keys or (coord_key(lat), coord_key(lon))
+    return hashlib.sha256("\x1f".join((text, lat_key, lon_key)).encode("utf-8")).hexdigest()
+
+
+def coord_key(value: float) -> str:
+    """Coordinate as it appears in the dedupe key, e.g. ``"50.9382"``."""
+    stored = Decimal(repr(value)).quantize(_STORED_QUANTUM, rounding=ROUND_HALF_UP)
+    rounded = stored.quantize(_KEY_QUANTUM, rounding=ROUND_HALF_UP)
+    return str(rounded.copy_abs() if rounded.is_zero() else rounded)
@@ -2,35 +2,114 @@
 
 from __future__ import annotations
 
+import hashlib
 import re
+from dataclasses import dataclass
+from functools import cached_property
 from typing import Optional
 
 
+SPAM_TERMS = frozenset(
+    {
+        "test",
+        "asdf",
+        "asdfasdf",
+        "qwerty",
+        "1234",
+    }
+)
+
+_MEDIA_PATH_RE = re.compile(r"/files/(.+)$")
+_WHITESPACE_RE = re.compile(r"\s+")
+_URL_RE = re.compile(r"https?://\S+|www\.\S+")
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+
+
 def extract_media_path(media_url: Optional[str]) -> Optional[str]:
     """Extract relative media path from a full URL."""
     if not media_url:
         return None
-    match = re.search(r"/files/(.+)$", media_url)
+    match = _MEDIA_PATH_RE.search(media_url)
     return match.group(1) if match else None
 
 
 def normalize_whitespace(text: str) -> str:
     """Collapse whitespace and trim."""
-    return re.sub(r"\s+", " ", text).strip()
+    return _WHITESPACE_RE.sub(" ", text).strip()
 
 
 def strip_urls(text: str) -> str:
     """Remove URLs from text."""
-    return re.sub(r"https?://\S+|www\.\S+", "", text)
+    return _URL_RE.sub("", text)
 
 
 def is_link_only(text: str, min_chars: int = 3) -> bool:
     """Return True if text is effectively only URLs or very short."""
-    cleaned = normalize_whitespace(strip_urls(text))
-    cleaned = re.sub(r"[^\w\s]", "", cleaned)
-    return len(cleaned) < min_chars
+    return _is_link_only_cleaned(normalize_whitespace(strip_urls(text)), min_chars)
 
 
 def normalize_for_dedupe(text: str) -> str:
     """Normalize text for strict duplicate checks."""
     return normalize_whitespace(strip_urls(text)).lower()
+
+
+def llm_input(title: Optional[str], description_redacted: Optional[str]) -> str:
+    """Build the labeling LLM input from title and redacted description."""
+    title_text = (title or "").strip()
+    desc_text = (description_redacted or "").strip()
+    return f"{title_text}\n\n{desc_text}"
+
+
+def input_hash(value: str) -> str:
+    """MD5 of an LLM input, stored as `input_hash` on label rows."""
+    return hashlib.md5(value.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class NormalizedText:
+    """One description normalized once, with every derived form the pipeline uses.
+
+    ``cleaned`` has URLs removed and whitespace collapsed; ``dedupe`` is its
+    lowercase form (same as :func:`normalize_for_dedupe`).
+    """
+
+    raw: str
+    title: Optional[str]
+    cleaned: str
+    dedupe: str
+    has_text: bool
+    link_only: bool
+    spam: bool
+
+    @classmethod
+    def from_text(
+        cls,
+        text: Optional[str],
+        title: Optional[str] = None,
+        link_only_min_chars: int = 3,
+    ) -> "NormalizedText":
+        raw = text or ""
+        has_text = bool(raw.strip())
+        cleaned = normalize_whitespace(strip_urls(raw)) if has_text else ""
+        dedupe = cleaned.lower()
+        return cls(
+            raw=raw,
+            title=title,
+            cleaned=cleaned,
+            dedupe=dedupe,
+            has_text=has_text,
+            link_only=has_text and _is_link_only_cleaned(cleaned, link_only_min_chars),
+            spam=has_text and dedupe in SPAM_TERMS,
+        )
+
+    @cached_property
+    def llm_input(self) -> str:
+        return llm_input(self.title, self.raw if self.has_text else None)
+
+    @cached_property
+    def input_hash(self) -> str:
+        return input_hash(self.llm_input)
+
+
+def _is_link_only_cleaned(cleaned: str, min_chars: int) -> bool:
+    return len(_PUNCTUATION_RE.sub("", cleaned)) < min_chars
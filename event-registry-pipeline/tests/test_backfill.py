@@ -0,0 +1,31 @@
+from erp.ingestion.backfill import Chunk, is_covered, merge_ranges, plan_chunks
+
+
+def test_plan_chunks_covers_range_without_overlap() -> None:
+    chunks = plan_chunks(2025, 1201, 500)
+
+    assert chunks == [
+        Chunk(2025, 1, 500),
+        Chunk(2025, 501, 1000),
+        Chunk(2025, 1001, 1201),
+    ]
+    assert chunks[-1].ids()[-1] == "1201-2025"
+    assert sum(len(chunk.ids()) for chunk in chunks) == 1201
+
+
+def test_plan_chunks_is_stable_for_resume() -> None:
+    # Boundaries depend only on chunk_size, so a larger frontier keeps earlier checkpoints valid.
+    assert plan_chunks(2025, 1000, 500) == plan_chunks(2025, 1400, 500)[:2]
+
+
+def test_merge_ranges_joins_touching_checkpoints() -> None:
+    assert merge_ranges([(101, 200), (1, 100), (301, 400), (150, 250)]) == [(1, 250), (301, 400)]
+
+
+def test_changed_chunk_size_resumes_from_covered_ranges() -> None:
+    # Checkpoints written with chunk_size=100; the rerun uses chunk_size=250.
+    done = merge_ranges((chunk.start, chunk.end) for chunk in plan_chunks(2025, 600, 100))
+
+    pending = [chunk for chunk in plan_chunks(2025, 1000, 250) if not is_covered(chunk, done)]
+
+    assert pending == [Chunk(2025, 501, 750), Chunk(2025, 751, 1000)]
@@ -0,0 +1,71 @@
+from erp.config import Settings
+from erp.ingestion.change_capture import filter_changed
+from erp.ingestion.quality_gate import gate_fingerprint
+from erp.models import RawEvent
+from erp.utils.hashing import payload_hash
+
+
+class _StoredHashes:
+    """Cursor stand-in answering the `event_payload_hashes` lookup.
+
+    All stored rows carry the gate fingerprint ``fingerprint``.
+    """
+
+    def __init__(self, rows: dict[str, str], fingerprint: str = "fp") -> None:
+        self.rows = rows
+        self.fingerprint = fingerprint
+        self.params = None
+
+    def execute(self, query: str, params: tuple) -> None:
+        self.params = params
+
+    def fetchall(self) -> list[tuple[str, str]]:
+        ids, fingerprint = self.params
+        if fingerprint != self.fingerprint:
+            return []
+        return [(srid, h) for srid, h in self.rows.items() if srid in ids]
+
+
+def _event(srid, status="open") -> RawEvent:
+    payload = {"service_request_id": srid, "status": status, "description": "Scherben"}
+    return RawEvent.model_validate({**payload, "payload": payload})
+
+
+def test_payload_hash_ignores_key_order() -> None:
+    assert payload_hash({"a": 1, "b": [1, 2]}) == payload_hash({"b": [1, 2], "a": 1})
+    assert payload_hash({"a": 1}) != payload_hash({"a": 2})
+    assert len(payload_hash({"big": 2**70})) == 64
+
+
+def test_filter_changed_skips_events_with_stored_hash() -> None:
+    same, edited, new, no_id = _event("1-2026"), _event("2-2026"), _event("3-2026"), _event(None)
+    cursor = _StoredHashes(
+        {
+            "1-2026": payload_hash(same.payload),
+            "2-2026": payload_hash(_event("2-2026", status="closed").payload),
+        }
+    )
+
+    changed, unchanged = filter_changed(cursor, [same, edited, new, no_id], "fp")
+
+    assert changed == [edited, new, no_id]
+    assert unchanged == 1
+    assert sorted(cursor.params[0]) == ["1-2026", "2-2026", "3-2026"]
+
+
+def test_filter_changed_regates_events_after_gate_change() -> None:
+    event = _event("1-2026")
+    cursor = _StoredHashes({"1-2026": payload_hash(event.payload)}, fingerprint="old")
+
+    assert filter_changed(cursor, [event], "new") == ([event], 0)
+
+
+def test_gate_fingerprint_covers_settings_and_category_map() -> None:
+    settings = Settings()
+    category_map = {"Müll": {"category": "Sauberkeit", "subcategory": None}}
+    fingerprint = gate_fingerprint(settings, category_map)
+
+    assert fingerprint == gate_fingerprint(Settings(), dict(category_map))
+    assert fingerprint != gate_fingerprint(settings, {})
+    wider = settings.model_copy(update={"duplicate_radius_meters": 500.0})
+    assert fingerprint != gate_fingerprint(wider, category_map)
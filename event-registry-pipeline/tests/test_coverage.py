@@ -0,0 +1,28 @@
+from erp.ingestion.coverage import SequenceCoverage
+
+
+def test_coverage_merges_runs():
+    coverage = SequenceCoverage.from_sequences(2026, [5, 1, 2, 3, 7, 8, 3])
+    assert coverage.ranges == ((1, 3), (5, 5), (7, 8))
+    assert coverage.covered_count == 6
+    assert coverage.max_sequence == 8
+    assert 2 in coverage
+    assert 4 not in coverage
+
+
+def test_coverage_enumerates_holes_only():
+    coverage = SequenceCoverage.from_ranges(2026, [(3, 10), (12, 20), (15, 30)])
+    assert coverage.hole_ranges() == [(1, 2), (11, 11)]
+    assert coverage.hole_ids(upper=33) == [
+        "1-2026",
+        "2-2026",
+        "11-2026",
+        "31-2026",
+        "32-2026",
+        "33-2026",
+    ]
+    assert coverage.hole_ids(limit=2) == ["1-2026", "2-2026"]
+
+
+def test_empty_coverage_has_no_holes():
+    assert SequenceCoverage.from_sequences(2026, []).hole_ids() == []
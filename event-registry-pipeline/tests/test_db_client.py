@@ -0,0 +1,8 @@
+from erp.config import Settings
+from erp.db.client import connect_kwargs
+
+
+def test_prepare_threshold_negative_disables_prepared_statements() -> None:
+    assert connect_kwargs(Settings(DB_PREPARE_THRESHOLD=5)) == {"prepare_threshold": 5}
+    assert connect_kwargs(Settings(DB_PREPARE_THRESHOLD=0)) == {"prepare_threshold": 0}
+    assert connect_kwargs(Settings(DB_PREPARE_THRESHOLD=-1)) == {"prepare_threshold": None}
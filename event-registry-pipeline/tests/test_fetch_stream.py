@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from erp.config import Settings
+from erp.ingestion import streaming
+from erp.ingestion.fetch_open311 import stream_window
+from erp.models import RawEvent
+
+
+def _settings(**overrides) -> Settings:
+    values = {
+        "OPEN311_BASE_URL": "https://open311.test",
+        "OPEN311_PAGE_SIZE": 2,
+        "OPEN311_MAX_RETRIES": 0,
+    }
+    values.update(overrides)
+    return Settings(**values)
+
+
+def _transport(total: int, page_size: int, seen_pages: list[int]) -> httpx.MockTransport:
+    def handler(request: httpx.Request) -> httpx.Response:
+        page = int(request.url.params["page"])
+        seen_pages.append(page)
+        start = (page - 1) * page_size
+        items = [
+            {"service_request_id": f"{seq}-2026"}
+            for seq in range(start + 1, min(start + page_size, total) + 1)
+        ]
+        return httpx.Response(200, json=items)
+
+    return httpx.MockTransport(handler)
+
+
+def _collect(total: int, prefetch_pages: int) -> tuple[list[str], list[int]]:
+    settings = _settings()
+    seen_pages: list[int] = []
+
+    async def run() -> list[str]:
+        transport = _transport(total, settings.open311_page_size, seen_pages)
+        async with httpx.AsyncClient(transport=transport) as client:
+            return [
+                event.service_request_id
+                async for event in stream_window(
+                    "2026-01-01",
+                    "2026-01-02",
+                    settings,
+                    prefetch_pages=prefetch_pages,
+                    client=client,
+                )
+            ]
+
+    return asyncio.run(run()), seen_pages
+
+
+def test_stream_window_yields_all_pages_in_order():
+    ids, _ = _collect(total=7, prefetch_pages=3)
+    assert ids == [f"{seq}-2026" for seq in range(1, 8)]
+
+
+def test_stream_window_stops_on_empty_page():
+    ids, seen_pages = _collect(total=4, prefetch_pages=2)
+    assert ids == ["1-2026", "2-2026", "3-2026", "4-2026"]
+    # Pages are prefetched ahead, but never more than the prefetch depth past the end.
+    assert max(seen_pages) <= 3 + 2
+
+
+def _fake_stream(total: int, produced: list[int], fail_after: int | None = None):
+    async def fake(since, until, settings=None, prefetch_pages=None, client=None):
+        for seq in range(1, total + 1):
+            if fail_after is not None and seq > fail_after:
+                raise httpx.ConnectError("boom")
+            produced.append(seq)
+            yield RawEvent(service_request_id=f"{seq}-2026")
+
+    return fake
+
+
+def test_stream_batches_applies_backpressure(monkeypatch) -> None:
+    produced: list[int] = []
+    monkeypatch.setattr(streaming, "stream_window", _fake_stream(1000, produced))
+
+    batches = streaming.stream_batches(
+        "2026-01-01", "2026-01-02", _settings(), batch_size=10, max_pending_batches=2
+    )
+    first = next(batches)
+    time.sleep(0.2)
+
+    assert [event.service_request_id for event in first][:2] == ["1-2026", "2-2026"]
+    # One batch consumed, two queued and one being filled at most.
+    assert len(produced) <= 10 * 4 + 1
+    rest = list(batches)
+    assert sum(len(batch) for batch in rest) == 990
+
+
+def test_stream_batches_reraises_fetch_errors(monkeypatch) -> None:
+    monkeypatch.setattr(streaming, "stream_window", _fake_stream(50, [], fail_after=25))
+
+    with pytest.raises(httpx.ConnectError):
+        list(streaming.stream_batches("2026-01-01", "2026-01-02", _settings(), batch_size=10))
@@ -0,0 +1,92 @@
+import httpx
+
+from erp.config import Settings
+from erp.ingestion.gap_fill import fetch_ids
+
+
+def _settings(**overrides) -> Settings:
+    values = {
+        "OPEN311_BASE_URL": "https://open311.test",
+        "OPEN311_GAP_FILL_BATCH_SIZE": 3,
+        "OPEN311_MAX_WORKERS": 1,
+        "OPEN311_MAX_RETRIES": 0,
+    }
+    values.update(overrides)
+    return Settings(**values)
+
+
+def _client(handler) -> httpx.Client:
+    return httpx.Client(transport=httpx.MockTransport(handler))
+
+
+def test_fetch_ids_packs_ids_and_reports_missing():
+    existing = {"1-2026", "2-2026", "4-2026"}
+    calls: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        requested = request.url.params["service_request_id"].split(",")
+        return httpx.Response(
+            200, json=[{"service_request_id": srid} for srid in requested if srid in existing]
+        )
+
+    ids = ["1-2026", "2-2026", "3-2026", "4-2026", "5-2026"]
+    with _client(handler) as client:
+        result = fetch_ids(ids, _settings(), client=client)
+
+    assert calls == ["/requests.json", "/requests.json"]
+    assert set(result.found) == existing
+    assert sorted(result.missing) == ["3-2026", "5-2026"]
+    assert result.failed == []
+
+
+def test_fetch_ids_separates_transient_failures_from_404():
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/requests.json":
+            return httpx.Response(503)
+        if request.url.path == "/requests/1-2026.json":
+            return httpx.Response(200, json=[{"service_request_id": "1-2026"}])
+        if request.url.path == "/requests/2-2026.json":
+            return httpx.Response(404)
+        return httpx.Response(502)
+
+    with _client(handler) as client:
+        result = fetch_ids(["1-2026", "2-2026", "3-2026"], _settings(), client=client)
+
+    assert list(result.found) == ["1-2026"]
+    assert result.missing == ["2-2026"]
+    assert result.failed == ["3-2026"]
+
+
+def test_fetch_ids_falls_back_when_filter_is_ignored():
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/requests.json":
+            return httpx.Response(200, json=[{"service_request_id": "99-2026"}])
+        return httpx.Response(404)
+
+    with _client(handler) as client:
+        result = fetch_ids(["1-2026", "2-2026"], _settings(), client=client)
+
+    assert result.found == {}
+    assert result.missing == ["1-2026", "2-2026"]
+
+
+def test_fetch_ids_caps_batches_at_page_size_and_reprobes_full_pages():
+    batches: list[tuple[list[str], str]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/requests.json":
+            requested = request.url.params["service_request_id"].split(",")
+            batches.append((requested, request.url.params["limit"]))
+            # The first ID fills the page with two rows and pushes the second out.
+            first = {"service_request_id": requested[0]}
+            return httpx.Response(200, json=[first, first])
+        return httpx.Response(200, json=[{"service_request_id": request.url.path[10:-5]}])
+
+    ids = ["1-2026", "2-2026", "3-2026", "4-2026"]
+    with _client(handler) as client:
+        result = fetch_ids(ids, _settings(OPEN311_PAGE_SIZE=2), client=client)
+
+    assert batches == [(["1-2026", "2-2026"], "2"), (["3-2026", "4-2026"], "2")]
+    assert sorted(result.found) == ids
+    assert result.missing == []
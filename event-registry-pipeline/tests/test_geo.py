@@ -0,0 +1,17 @@
+import math
+import random
+
+from erp.utils.geo import distance_meters, grid_cell, neighbour_cells
+
+
+def test_neighbour_cells_cover_every_point_within_radius():
+    rng = random.Random(7)
+    for _ in range(2000):
+        radius = rng.choice([5.0, 15.0, 250.0])
+        lat, lon = rng.uniform(-70, 70), rng.uniform(-170, 170)
+        distance, bearing = rng.uniform(0, radius), rng.uniform(0, 2 * math.pi)
+        other_lat = lat + distance * math.cos(bearing) / 111_195
+        other_lon = lon + distance * math.sin(bearing) / (111_195 * math.cos(math.radians(lat)))
+        if distance_meters(lat, lon, other_lat, other_lon) > radius:
+            continue
+        assert grid_cell(other_lat, other_lon, radius) in neighbour_cells(lat, lon, radius)
@@ -1,4 +1,8 @@
-from erp.ingestion.incremental import compute_gap_ids, max_sequence_for_year
+from erp.ingestion.incremental import (
+    compute_gap_ids,
+    max_sequence_for_year,
+    probe_sequence_frontier,
+)
 
 
 def test_compute_gap_ids_builds_expected_range():
@@ -16,3 +20,19 @@ def test_max_sequence_for_year():
     ids = ["1-2025", "20-2025", "5-2026", "17-2025"]
     assert max_sequence_for_year(ids, 2025) == 20
     assert max_sequence_for_year(ids, 2026) == 5
+
+
+def test_probe_sequence_frontier_uses_logarithmic_probes():
+    probes: list[int] = []
+
+    def is_present(sequence: int) -> bool:
+        probes.append(sequence)
+        return sequence <= 1234
+
+    assert probe_sequence_frontier(100, is_present) == 1234
+    assert len(probes) <= 2 * 12
+
+
+def test_probe_sequence_frontier_without_new_ids():
+    assert probe_sequence_frontier(50, lambda sequence: sequence <= 50) == 50
+    assert probe_sequence_frontier(None, lambda sequence: False) is None
@@ -0,0 +1,148 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import orjson
+
+from erp.config import Settings
+from erp.labeling.batch import read_results, request_key
+from erp.labeling.common.schemas import Phase1Output
+from erp.labeling.llm.gemini import request_body
+from erp.labeling.llm.gemini_batch import GeminiBatchProvider
+
+
+class _StubBatchApi(BaseHTTPRequestHandler):
+    """Files + Batch API stub: a batch succeeds on its first poll.
+
+    Requests whose input contains "kaputt" get a response that does not
+    validate; requests containing "fehlt" get an error line.
+    """
+
+    files: dict[str, bytes] = {}
+    batches: dict[str, str] = {}
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _json(self, payload: dict, headers: dict | None = None) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        path = self.path.split("?")[0]
+        if path == "/upload/v1beta/files":
+            assert self.headers["X-Goog-Upload-Command"] == "start"
+            upload_url = f"http://{self.headers['Host']}/upload-session/1"
+            self._json({}, headers={"X-Goog-Upload-URL": upload_url})
+        elif path == "/upload-session/1":
+            assert self.headers["X-Goog-Upload-Command"] == "upload, finalize"
+            self.files["files/input-1"] = body
+            self._json({"file": {"name": "files/input-1"}})
+        elif path == "/v1beta/models/stub-model:batchGenerateContent":
+            batch = json.loads(body)["batch"]
+            assert batch["input_config"]["file_name"] == "files/input-1"
+            self.batches["batches/1"] = batch["display_name"]
+            self._json({"name": "batches/1", "metadata": {"state": "BATCH_STATE_PENDING"}})
+        else:
+            self.send_error(404)
+
+    def do_GET(self) -> None:
+        path = self.path.split("?")[0]
+        if path == "/v1beta/batches":
+            operations = [
+                {"name": name, "metadata": {"displayName": display_name}}
+                for name, display_name in self.batches.items()
+            ]
+            self._json({"operations": operations})
+        elif path == "/v1beta/batches/1":
+            self.files["files/result-1"] = self._results(self.files["files/input-1"])
+            self._json(
+                {
+                    "name": "batches/1",
+                    "metadata": {"state": "BATCH_STATE_SUCCEEDED"},
+                    "done": True,
+                    "response": {"responsesFile": "files/result-1"},
+                }
+            )
+        elif path == "/download/v1beta/files/result-1:download":
+            data = self.files["files/result-1"]
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        else:
+            self.send_error(404)
+
+    @staticmethod
+    def _results(requests: bytes) -> bytes:
+        lines = []
+        for line in requests.splitlines():
+            item = json.loads(line)
+            prompt = item["request"]["contents"][0]["parts"][0]["text"]
+            if "fehlt" in prompt:
+                lines.append({"key": item["key"], "error": {"code": 500, "message": "internal"}})
+                continue
+            output = {"label": "true", "confidence": 0.9, "evidence": ["Radweg"]}
+            if "kaputt" in prompt:
+                output = {"label": "vielleicht"}
+            response = {
+                "candidates": [{"content": {"parts": [{"text": json.dumps(output)}]}}],
+                "usageMetadata": {"promptTokenCount": 100, "candidatesTokenCount": 20},
+            }
+            lines.append({"key": item["key"], "response": response})
+        return b"".join(orjson.dumps(line) + b"\n" for line in lines)
+
+
+def test_batch_provider_round_trip_against_stub_server(tmp_path) -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubBatchApi)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    settings = Settings(
+        GOOGLE_API_KEY="test",
+        GEMINI_API_BASE_URL=f"http://127.0.0.1:{server.server_port}/v1beta",
+    )
+    request_file = tmp_path / "phase1.requests.jsonl"
+    inputs = {"1-2026": "Scherben auf dem Radweg", "2-2026": "kaputt", "3-2026": "fehlt"}
+    request_file.write_bytes(
+        b"".join(
+            orjson.dumps(
+                {
+                    "key": request_key(srid, f"hash-{srid}"),
+                    "request": request_body(settings, f"PROMPT\n\nINPUT:\n{text}\n"),
+                }
+            )
+            + b"\n"
+            for srid, text in inputs.items()
+        )
+    )
+
+    provider = GeminiBatchProvider(settings)
+    try:
+        input_file = provider.upload(request_file, "erp-phase1-1")
+        assert provider.find("erp-phase1-1") is None
+        batch_name = provider.create("stub-model", input_file, "erp-phase1-1")
+        assert provider.find("erp-phase1-1") == batch_name
+        status = provider.get(batch_name)
+        assert status.done and status.state == "SUCCEEDED"
+        result_path = tmp_path / "phase1.results.jsonl"
+        provider.download(status.result_file, result_path)
+    finally:
+        provider.close()
+        server.shutdown()
+
+    results = {
+        result.service_request_id: result for result in read_results(result_path, Phase1Output)
+    }
+    assert results["1-2026"].input_hash == "hash-1-2026"
+    assert results["1-2026"].output == Phase1Output(
+        label="true", confidence=0.9, evidence=["Radweg"]
+    )
+    assert (results["1-2026"].prompt_tokens, results["1-2026"].output_tokens) == (100, 20)
+    assert results["2-2026"].output is None and "label" in results["2-2026"].error
+    assert results["3-2026"].output is None and results["3-2026"].error == "internal"
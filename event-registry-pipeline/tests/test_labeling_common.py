@@ -8,6 +8,7 @@ from erp.labeling.common.schemas import (
     truncate_evidence,
     truncate_reasoning,
 )
+from erp.labeling.llm.gemini import packed_response_schema, parse_packed
 
 
 def test_bike_related_mapping():
@@ -38,3 +39,31 @@ def test_phase2_schema_validates_category():
     assert ok.category == PHASE2_CATEGORIES[0]
     with pytest.raises(ValueError):
         Phase2Output(category="Not a category", confidence=0.5, evidence=["x"], reasoning="r")
+
+
+def test_parse_packed_keeps_valid_items_of_requested_ids():
+    text = """```json
+    [
+      {"service_request_id": "1-2026", "category": "Other / Unklar", "confidence": 0.7},
+      {"service_request_id": "2-2026", "category": "Kein Kategorie", "confidence": 0.7},
+      {"service_request_id": "9-2026", "category": "Other / Unklar", "confidence": 0.7},
+      {"service_request_id": "1-2026", "category": "Other / Unklar", "confidence": 0.1}
+    ]
+    ```"""
+    outputs = parse_packed(text, Phase2Output, ["1-2026", "2-2026", "3-2026"])
+    # Invalid (2), unknown (9) and repeated (1) items are dropped.
+    assert list(outputs) == ["1-2026"]
+    assert outputs["1-2026"].confidence == 0.7
+
+
+def test_packed_response_schema_keys_items_by_service_request_id():
+    schema = packed_response_schema(Phase1Output)
+    assert schema["type"] == "ARRAY"
+    item = schema["items"]
+    assert item["properties"]["service_request_id"] == {"type": "STRING"}
+    assert item["properties"]["label"]["enum"] == ["true", "false", "uncertain"]
+    assert item["required"] == ["service_request_id", *Phase1Output.model_fields]
+
+    assert packed_response_schema(Phase2Output)["items"]["properties"]["category"]["enum"] == list(
+        PHASE2_CATEGORIES
+    )
@@ -0,0 +1,242 @@
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+from erp.config import Settings
+from erp.labeling.common import engine
+from erp.labeling.common import sink as sink_module
+from erp.labeling.common.cache import LabelCache
+from erp.labeling.common.engine import Candidate, label_events
+from erp.labeling.common.sink import LabelSink
+from erp.labeling.common.schemas import Phase1Output
+from erp.labeling.llm.gemini import GeminiResult, TokenUsage
+from erp.labeling.phase1.runner import PHASE1
+
+
+class _SlowClient:
+    """Answers every prompt after a short delay and tracks requests in flight."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.prompts: list[str] = []
+
+    def generate_structured(self, prompt: str, schema: type) -> tuple:
+        with self.lock:
+            self.prompts.append(prompt)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.01)
+        with self.lock:
+            self.in_flight -= 1
+        if "fail" in prompt:
+            return None, 10, 2, "invalid JSON"
+        return Phase1Output(label="true", confidence=0.9), 10, 1, None
+
+
+def _candidates(count: int) -> list[Candidate]:
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        Candidate(
+            service_request_id=f"{seq}-2026",
+            title="Radweg",
+            description_redacted="fail" if seq % 5 == 0 else f"Scherben Nr. {seq}",
+            requested_at=start + timedelta(hours=seq),
+            year=2026,
+            sequence_number=seq,
+            near_duplicate_of=None,
+        )
+        for seq in range(1, count + 1)
+    ]
+
+
+def test_label_events_bounds_requests_in_flight_and_keeps_counters() -> None:
+    client = _SlowClient()
+    candidates = _candidates(20)
+
+    stats = label_events(
+        PHASE1,
+        candidates,
+        client,
+        "PROMPT",
+        Settings(LABELING_CACHE_ENABLED=False),
+        label_run_id=1,
+        prompt_version="p1_test",
+        model_id="stub",
+        dry_run=True,
+        concurrency=4,
+    )
+
+    assert client.max_in_flight == 4
+    assert (stats.attempted, stats.inserted, stats.failures, stats.skipped) == (20, 16, 4, 0)
+    # Dry runs count labels as inserted but record no frontier, as before.
+    assert stats.first_labeled_service_request_id is None
+
+
+class _PackingClient(_SlowClient):
+    """Answers packed prompts except for IDs ending in 3 (missing) or 4 (invalid)."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.packs: list[list[str]] = []
+        self.usage = TokenUsage()
+
+    def generate_structured(self, prompt: str, schema: type) -> tuple:
+        self.usage.add(GeminiResult(text="", latency_ms=10, prompt_tokens=100, output_tokens=20))
+        return super().generate_structured(prompt, schema)
+
+    def generate_packed(self, prompt: str, schema: type, ids: list[str]) -> tuple:
+        with self.lock:
+            self.packs.append(list(ids))
+        self.usage.add(GeminiResult("", 30, 100 + 10 * len(ids), 20 * len(ids)))
+        answered = [srid for srid in ids if srid.split("-")[0][-1] not in "34"]
+        outputs = {srid: Phase1Output(label="false", confidence=0.8) for srid in answered}
+        return outputs, 30, None if len(answered) == len(ids) else "items missing or invalid"
+
+
+def test_label_events_packs_inputs_and_retries_unanswered_items_singly() -> None:
+    client = _PackingClient()
+
+    stats = label_events(
+        PHASE1,
+        _candidates(20),
+        client,
+        "PROMPT",
+        Settings(LABELING_CACHE_ENABLED=False),
+        label_run_id=1,
+        prompt_version="p1_test",
+        model_id="stub",
+        dry_run=True,
+        concurrency=2,
+        pack_size=8,
+    )
+
+    assert [len(ids) for ids in client.packs] == [8, 8, 4]
+    assert client.packs[0][:2] == ["1-2026", "2-2026"]
+    # 3, 4, 13 and 14 went unanswered in their pack and are retried alone.
+    retried = sorted(prompt.split("Nr. ")[-1].strip() for prompt in client.prompts)
+    assert retried == ["13", "14", "3", "4"]
+    assert (stats.attempted, stats.inserted, stats.failures) == (20, 20, 0)
+    assert (stats.prompt_tokens, stats.output_tokens) == (3 * 100 + 200 + 4 * 100, 400 + 4 * 20)
+    assert stats.tokens_per_event == (900 + 480) / 20
+
+
+class _NoStoredLabels:
+    def execute(self, query: str, params: tuple) -> None:
+        self.params = params
+
+    def fetchall(self) -> list:
+        return []
+
+
+def test_label_events_coalesces_identical_inputs_and_reuses_cached_labels(monkeypatch) -> None:
+    @contextmanager
+    def fake_db_cursor(settings):
+        yield _NoStoredLabels()
+
+    cache = LabelCache(max_size=100)
+    monkeypatch.setattr(engine, "db_cursor", fake_db_cursor)
+    monkeypatch.setattr(engine, "label_cache", lambda max_size: cache)
+    client = _SlowClient()
+
+    def run():
+        return label_events(
+            PHASE1,
+            _candidates(20),
+            client,
+            "PROMPT",
+            Settings(LABELING_CACHE_ENABLED=True),
+            label_run_id=1,
+            prompt_version="p1_test",
+            model_id="stub",
+            dry_run=True,
+            concurrency=20,
+        )
+
+    # Events 5, 10, 15, 20 share one input ("fail"); the rest are distinct.
+
+    first = run()
+    assert len(client.prompts) == first.attempted == first.cache_misses == 17
+    assert first.cache_hits == 3
+    assert (first.inserted, first.failures) == (16, 4)
+    assert len(cache) == 16
+
+    second = run()
+    assert len(client.prompts) == 17 + 1  # only the failed input is asked again
+    assert (second.cache_hits, second.cache_misses) == (19, 1)
+    assert (second.inserted, second.failures) == (16, 4)
+
+
+class _ReturningCursor:
+    """Reports every buffered row except ``existing`` as inserted."""
+
+    def __init__(self, existing: set[str]) -> None:
+        self.existing = existing
+        self.statements: list[tuple[str, list]] = []
+
+    def execute(self, query: str, params: list) -> None:
+        self.statements.append((query, params))
+        # 8 params per row: srid, model, prompt_version, input_hash + 4 output columns
+        rows = [params[i : i + 8] for i in range(0, len(params), 8)]
+        self.returned = [(row[0], row[3]) for row in rows if row[0] not in self.existing]
+
+    def fetchall(self) -> list[tuple[str, str]]:
+        return self.returned
+
+
+def test_label_sink_flushes_one_statement_and_splits_by_returning(monkeypatch) -> None:
+    cursor = _ReturningCursor(existing={"2-2026"})
+
+    @contextmanager
+    def fake_db_cursor(settings):
+        yield cursor
+
+    monkeypatch.setattr(sink_module, "db_cursor", fake_db_cursor)
+    sink = LabelSink(PHASE1, Settings(), "stub", "p1_test", flush_rows=3, flush_seconds=60)
+    candidates = _candidates(3)
+    for candidate in candidates:
+        assert not sink.due()
+        sink.add(candidate, f"hash-{candidate.sequence_number}", (True, 0.9, ["e"], "r"))
+
+    assert sink.due() and "2-2026" in sink
+    inserted, present = sink.flush()
+
+    assert len(cursor.statements) == 1
+    assert "returning service_request_id, input_hash" in cursor.statements[0][0]
+    assert inserted == [candidates[0], candidates[2]]
+    assert present == [candidates[1]]
+    assert len(sink) == 0 and sink.seconds_until_due() is None
+
+
+def test_reused_near_duplicate_labels_move_the_frontier(monkeypatch) -> None:
+    @contextmanager
+    def fake_db_cursor(settings):
+        yield _NoStoredLabels()
+
+    monkeypatch.setattr(engine, "db_cursor", fake_db_cursor)
+    monkeypatch.setattr(engine, "reuse_label", lambda cursor, **kwargs: True)
+    candidates = [
+        Candidate(**{**vars(candidate), "near_duplicate_of": "1-2025"})
+        for candidate in _candidates(3)
+    ]
+    client = _SlowClient()
+
+    stats = label_events(
+        PHASE1,
+        candidates,
+        client,
+        "PROMPT",
+        Settings(LABELING_CACHE_ENABLED=False, NEAR_DUPLICATE_REUSE_LABELS=True),
+        label_run_id=1,
+        prompt_version="p1_test",
+        model_id="stub",
+        dry_run=False,
+    )
+
+    assert not client.prompts
+    assert (stats.reused, stats.inserted) == (3, 3)
+    assert stats.first_labeled_service_request_id == "1-2026"
+    assert stats.last_labeled_service_request_id == "3-2026"
+    assert stats.max_requested_at == candidates[-1].requested_at
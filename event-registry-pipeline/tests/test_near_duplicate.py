@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta, timezone
+
+from erp.ingestion.near_duplicate import (
+    NearDuplicateEntry,
+    NearDuplicateIndex,
+    minhash_signature,
+    similarity,
+)
+
+
+_GLASS = "Glasscherben auf dem Radweg an der Ampel Höhe Hausnummer 12, bitte entfernen"
+_GLASS_VARIANT = "Glasscherben auf dem Radweg an der Ampel Höhe Hausnummer 12 bitte entfernen!!"
+_OTHER = "Laterne defekt seit drei Tagen, Gehweg komplett dunkel"
+
+
+def _entry(srid: str, text: str, hours: int = 0) -> NearDuplicateEntry:
+    return NearDuplicateEntry(
+        service_request_id=srid,
+        requested_at=datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(hours=hours),
+        lat=50.0,
+        lon=6.0,
+        service_name="Wilder Müll",
+        signature=minhash_signature(text),
+    )
+
+
+def test_minhash_similarity_separates_variants_from_unrelated_text():
+    assert minhash_signature(_GLASS) == minhash_signature(_GLASS)
+    assert similarity(minhash_signature(_GLASS), minhash_signature(_GLASS_VARIANT)) >= 0.8
+    assert similarity(minhash_signature(_GLASS), minhash_signature(_OTHER)) < 0.2
+
+
+def test_lsh_index_returns_only_band_sharing_recent_entries():
+    index = NearDuplicateIndex(timedelta(hours=72), bands=16)
+    index.add(_entry("1-2026", _GLASS))
+    index.add(_entry("2-2026", _OTHER))
+
+    probe = _entry("3-2026", _GLASS_VARIANT, hours=5)
+    assert [c.service_request_id for c in index.candidates(probe)] == ["1-2026"]
+
+    index.advance(probe.requested_at + timedelta(days=10))
+    assert len(index) == 0
+    assert index.candidates(probe) == []
@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+
+import httpx
+
+from erp.config import Settings
+from erp.ingestion.planner import Shard, fetch_sharded, plan_shards
+
+
+def test_plan_shards_splits_into_days():
+    shards = plan_shards("2026-01-01", "2026-01-04", shard_hours=24)
+    assert [shard.bounds() for shard in shards] == [
+        ("2026-01-01", "2026-01-02"),
+        ("2026-01-02", "2026-01-03"),
+        ("2026-01-03", "2026-01-04"),
+    ]
+
+
+def test_shard_bisect_respects_minimum_span():
+    shard = Shard(datetime(2026, 1, 1), datetime(2026, 1, 5))
+    left, right = shard.bisect(timedelta(days=1))
+    assert left.bounds() == ("2026-01-01", "2026-01-03")
+    assert right.bounds() == ("2026-01-03", "2026-01-05")
+    assert Shard(datetime(2026, 1, 1), datetime(2026, 1, 2)).bisect(timedelta(days=1)) is None
+
+
+def test_default_minimum_bisects_day_shards_by_hour():
+    min_span = timedelta(hours=Settings().open311_shard_min_hours)
+    left, right = Shard(datetime(2026, 1, 1), datetime(2026, 1, 2)).bisect(min_span)
+    assert left.bounds() == ("2026-01-01", "2026-01-01T12:00:00Z")
+    assert right.bounds() == ("2026-01-01T12:00:00Z", "2026-01-02")
+    assert Shard(datetime(2026, 1, 1), datetime(2026, 1, 1, 1)).bisect(min_span) is None
+
+
+def test_fetch_sharded_bisects_full_shards_and_merges():
+    # Two events per day; page size 1 and one page per shard forces bisection
+    # down to single days, which are then paged to the end.
+    by_day = {
+        f"2026-01-0{day}": [f"{day * 10 + n}-2026" for n in (1, 2)] for day in range(1, 5)
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        start = datetime.fromisoformat(request.url.params["start_date"])
+        end = datetime.fromisoformat(request.url.params["end_date"])
+        page = int(request.url.params["page"])
+        ids: list[str] = []
+        day = start
+        while day < end:
+            ids.extend(by_day.get(day.date().isoformat(), []))
+            day += timedelta(days=1)
+        items = [{"service_request_id": srid} for srid in ids[page - 1 : page]]
+        return httpx.Response(200, json=items)
+
+    settings = Settings(
+        OPEN311_BASE_URL="https://open311.test",
+        OPEN311_PAGE_SIZE=1,
+        OPEN311_SHARD_MAX_PAGES=1,
+        OPEN311_SHARD_MIN_HOURS=24,
+        OPEN311_MAX_WORKERS=4,
+        OPEN311_MAX_RETRIES=0,
+    )
+    with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+        events = fetch_sharded(
+            "2026-01-01", "2026-01-05", settings, shard_hours=48, client=client
+        )
+
+    ids = [event.service_request_id for event in events]
+    assert sorted(ids) == sorted(srid for day in by_day.values() for srid in day)
+    assert len(ids) == len(set(ids))
@@ -141,3 +141,329 @@ def test_quality_gate_sets_has_media_flag():
     assert decision.normalized is not None
     assert decision.normalized.has_media is True
     assert decision.normalized.media_path == "2026-01/test.jpg"
+
+
+class _RecordingChecker:
+    def __init__(self, existing: dict[str, str]) -> None:
+        self.existing = existing  # normalized description -> service_request_id
+        self.batch_calls = 0
+        self.single_calls = 0
+
+    def find_duplicate(self, key, requested_at, service_request_id=None):
+        self.single_calls += 1
+        match = self.existing.get(key.description)
+        return match if match != service_request_id else None
+
+    def find_duplicates(self, probes):
+        self.batch_calls += 1
+        found = {}
+        for probe in probes:
+            match = self.find_duplicate(probe.key, probe.requested_at, probe.service_request_id)
+            if match:
+                found[probe] = match
+        return found
+
+
+def test_evaluate_batch_matches_sequential_evaluate():
+    events = [
+        _base_event(service_request_id="1-2026", description="Known in DB"),
+        _base_event(service_request_id="2-2026", description="Fresh report"),
+        _base_event(service_request_id="3-2026", description="Fresh report"),
+        _base_event(service_request_id="4-2026", description="test"),
+        _base_event(service_request_id="5-2026", description=""),
+        _base_event(service_request_id="6-2026", description="Re-fetched itself"),
+    ]
+    existing = {"known in db": "99-2026", "re-fetched itself": "6-2026"}
+
+    sequential_gate = QualityGate(duplicate_checker=_RecordingChecker(existing))
+    expected = [sequential_gate.evaluate(event) for event in events]
+
+    checker = _RecordingChecker(existing)
+    batched = QualityGate(duplicate_checker=checker).evaluate_batch(events)
+
+    assert [d.reason for d in batched] == [d.reason for d in expected] == [
+        "duplicate_strict",
+        "accepted",
+        "duplicate_strict",
+        "spam_text",
+        "accepted",
+        "accepted",
+    ]
+    assert batched[0].details["duplicate_of"] == "99-2026"
+    assert batched[2].details["duplicate_of"] == "2-2026"
+    assert checker.batch_calls == 1
+
+
+def test_dedupe_key_ignores_urls_whitespace_and_case():
+    first = _base_event(description="Müll  am Weg https://example.com/x", lat=50.93815)
+    second = _base_event(description="müll am weg", lat=50.938149999)
+
+    first_key = QualityGate().evaluate(first).normalized.dedupe_key
+    second_key = QualityGate().evaluate(second).normalized.dedupe_key
+
+    assert first_key is not None and len(first_key) == 64
+    assert first_key == second_key
+    assert QualityGate().evaluate(_base_event(description="")).normalized.dedupe_key is None
+
+
+def test_duplicate_index_evicts_behind_high_water_mark():
+    from datetime import datetime, timedelta, timezone
+
+    from erp.ingestion.quality_gate import DuplicateEntry, DuplicateIndex, DuplicateKey
+
+    key = DuplicateKey("x", 50.0, 6.0, None, None)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    index = DuplicateIndex(timedelta(hours=24))
+    for day in range(10):
+        at = start + timedelta(days=day)
+        index.add(key, DuplicateEntry(f"{day + 1}-2026", at))
+        index.advance(at)
+
+    assert len(index) <= 3
+    assert index.find(key, start + timedelta(days=9, hours=1)) == "10-2026"
+    assert index.find(key, start + timedelta(days=9), "10-2026") == "9-2026"
+    assert index.horizon is not None and index.horizon > start
+
+
+def test_warm_index_skips_per_event_db_lookups():
+    from erp.ingestion.quality_gate import StoredDuplicate
+    from erp.utils.time import parse_requested_at
+
+    class _RangeChecker(_RecordingChecker):
+        def __init__(self) -> None:
+            super().__init__({})
+            self.ranges = []
+
+        def load_range(self, start, end):
+            self.ranges.append((start, end))
+            return [
+                StoredDuplicate(
+                    service_request_id="99-2026",
+                    requested_at=parse_requested_at("2026-01-15T20:00:00+01:00"),
+                    description="Known in DB",
+                    lat=50.0,
+                    lon=6.0,
+                    service_name="Wilder Müll",
+                    address_string="50859 Köln, Teststraße 1",
+                )
+            ]
+
+    checker = _RangeChecker()
+    gate = QualityGate(duplicate_checker=checker, warm_index=True)
+    decisions = gate.evaluate_batch(
+        [
+            _base_event(service_request_id="1-2026", description="Known in DB"),
+            _base_event(service_request_id="2-2026", description="Fresh report"),
+        ]
+    )
+
+    assert [d.reason for d in decisions] == ["duplicate_strict", "accepted"]
+    assert decisions[0].details["duplicate_of"] == "99-2026"
+    assert checker.batch_calls == 0
+    assert len(checker.ranges) == 1
+
+    gate.evaluate_batch([_base_event(service_request_id="3-2026", description="Other")])
+    assert len(checker.ranges) == 1  # already covered, nothing reloaded
+
+
+def test_near_duplicate_is_accepted_with_review_reason():
+    from erp.config import Settings
+
+    gate = QualityGate(settings=Settings(NEAR_DUPLICATE_ENABLED=True))
+    decisions = gate.evaluate_batch(
+        [
+            _base_event(
+                service_request_id="1-2026",
+                description="Glasscherben auf dem Radweg an der Ampel, bitte entfernen",
+            ),
+            _base_event(
+                service_request_id="2-2026",
+                description="Glasscherben auf dem Radweg an der Ampel bitte entfernen!",
+                lat=50.0002,
+            ),
+        ]
+    )
+
+    assert [d.reason for d in decisions] == ["accepted", "accepted"]
+    assert decisions[0].normalized.near_duplicate_of is None
+    assert decisions[1].normalized.near_duplicate_of == "1-2026"
+    assert decisions[1].normalized.minhash_bands
+    assert decisions[1].review_reason == "near_duplicate"
+
+
+def test_radius_duplicates_match_across_rounding_boundary():
+    from erp.config import Settings
+
+    events = [
+        _base_event(service_request_id="1-2026", lat=50.00004999),
+        _base_event(service_request_id="2-2026", lat=50.00005001),
+        _base_event(service_request_id="3-2026", lat=50.0005),
+    ]
+
+    rounded = QualityGate().evaluate_batch(events)
+    by_radius = QualityGate(settings=Settings(DUPLICATE_RADIUS_METERS=10)).evaluate_batch(events)
+
+    assert [d.reason for d in rounded] == ["accepted", "accepted", "accepted"]
+    assert [d.reason for d in by_radius] == ["accepted", "duplicate_strict", "accepted"]
+    assert by_radius[1].details["duplicate_of"] == "1-2026"
+
+
+def test_columnar_evaluate_batch_matches_evaluate():
+    import random
+
+    import pytest
+
+    from erp.ingestion import columnar
+
+    if not columnar.HAS_NUMPY:
+        pytest.skip("numpy not installed (extra 'batch')")
+
+    variants = {
+        "service_request_id": [
+            "12-2026",
+            "",
+            None,
+            "+12-2026",
+            " 12-2026",
+            "12-2026\x00",
+            "1_0-2026",
+            "0-2026",
+            "12-1999",
+            "12-2101",
+            "99999999999999999999999-2026",
+            "122026",
+            "12-20-26",
+            "١٢-2026",
+            "12-²026",
+            "abc-2026",
+        ],
+        "requested_datetime": [
+            "2026-01-15T23:34:39+01:00",
+            "2026-01-15T22:00:00Z",
+            "2026-01-15",
+            "",
+            None,
+            "not a date",
+            "2026-13-01T00:00:00",
+        ],
+        "lat": [50.0, None, 91.0, -90.0, float("nan")],
+        "long": [6.0, None, -181.0, 180.0],
+        "service_name": ["Wilder Müll", "", None, "Unbekannt"],
+        "title": ["Test", "", "   ", None, "\x00"],
+        "address_string": ["50859 Köln", "", " \t", "\x00"],
+        "status": ["open", "CLOSED ", " Open", "pending", "", None, "\x00open"],
+        "description": ["Glas auf dem Radweg", "test", "", "https://x.y/z", "Glas  auf dem RADWEG"],
+    }
+
+    def _dump(decision):
+        normalized = getattr(decision, "normalized", None)
+        return normalized.model_dump() if normalized else None
+
+    rng = random.Random(5)
+    events = [
+        _base_event(**{field: rng.choice(values) for field, values in variants.items()})
+        for _ in range(400)
+    ]
+    events += [_base_event(service_request_id=f"{n}-2026") for n in range(1, 40)]
+
+    gate = QualityGate()
+    sequential = [gate.evaluate(event) for event in events]
+    batched = QualityGate().evaluate_batch(events)
+
+    assert len(events) >= columnar.COLUMNAR_MIN_BATCH
+    assert [d.reason for d in batched] == [d.reason for d in sequential]
+    assert [getattr(d, "details", None) for d in batched] == [
+        getattr(d, "details", None) for d in sequential
+    ]
+    assert [_dump(d) for d in batched] == [_dump(d) for d in sequential]
+    assert len({d.reason for d in sequential}) > 8
+
+
+def test_columnar_coord_keys_match_decimal_rounding():
+    import random
+
+    import pytest
+
+    np = pytest.importorskip("numpy")
+    from erp.ingestion.columnar import coord_keys
+    from erp.utils.hashing import coord_key
+
+    rng = random.Random(3)
+    values = [round(rng.uniform(-180, 180), rng.choice([2, 5, 8, 12])) for _ in range(5000)]
+    values += [0.00005, -0.00005, 50.00005, 50.000049995, -0.0, 1e-9, 179.99995, 6.123456785]
+
+    assert coord_keys(np.array(values)) == [coord_key(value) for value in values]
+
+
+def test_evaluate_parallel_matches_evaluate_batch():
+    import random
+    from datetime import timedelta
+
+    from erp.config import Settings
+    from erp.ingestion.quality_gate import StoredDuplicate, gate_executor
+    from erp.utils.time import parse_requested_at
+
+    start = parse_requested_at("2026-01-15T08:00:00+01:00")
+    stored = [
+        StoredDuplicate(
+            "90-2026",
+            start - timedelta(hours=2),
+            "Glas auf dem Radweg",
+            50.0,
+            6.0,
+            "Wilder Müll",
+            "50859 Köln",
+        ),
+        StoredDuplicate("91-2026", start, "Ampel  defekt", 50.0, 6.0, "Wilder Müll", "50859 Köln"),
+    ]
+
+    class _StoredChecker(_RecordingChecker):
+        def load_range(self, range_start, range_end):
+            return [row for row in stored if range_start <= row.requested_at <= range_end]
+
+        def find_near_candidates(self, probes):
+            return {}
+
+    phrases = [
+        "Glas auf dem Radweg",
+        "glas auf dem  RADWEG https://x.y/1",
+        "Ampel defekt",
+        "Schlagloch in der Fahrbahn an der Ecke, bitte reparieren",
+        "Schlagloch in der Fahrbahn an der Ecke bitte reparieren!",
+        "test",
+        "",
+        None,
+    ]
+    rng = random.Random(7)
+    events = [
+        _base_event(
+            service_request_id=f"{n}-2026",
+            requested_datetime=(start + timedelta(minutes=17 * n)).isoformat(),
+            description=rng.choice(phrases),
+            lat=50.0 + rng.choice([0.0, 0.00001, 0.01]),
+        )
+        for n in range(1, 120)
+    ]
+    settings = Settings(NEAR_DUPLICATE_ENABLED=True)
+
+    def _dump(decision):
+        normalized = getattr(decision, "normalized", None)
+        return (
+            decision.reason,
+            getattr(decision, "details", None),
+            getattr(decision, "review_reason", None),
+            normalized.model_dump() if normalized else None,
+        )
+
+    batched = QualityGate(
+        settings=settings, duplicate_checker=_StoredChecker({}), warm_index=True
+    ).evaluate_batch(events)
+    with gate_executor(3) as executor:
+        parallel = QualityGate(
+            settings=settings, duplicate_checker=_StoredChecker({}), warm_index=True
+        ).evaluate_parallel(events, workers=3, executor=executor)
+
+    assert [_dump(d) for d in parallel] == [_dump(d) for d in batched]
+    winners = {d.details["duplicate_of"] for d in batched if d.reason == "duplicate_strict"}
+    assert {"90-2026", "91-2026"} <= winners and len(winners) > 2
+    assert any(getattr(d, "review_reason", None) == "near_duplicate" for d in batched)
@@ -0,0 +1,12 @@
+from erp.utils.text import NormalizedText, input_hash, is_link_only, llm_input, normalize_for_dedupe
+
+
+def test_normalized_text_matches_single_purpose_helpers():
+    for raw in ["Müll  am Weg https://x.y/z", "www.example.com/a", " TEST ", "", "a.b"]:
+        text = NormalizedText.from_text(raw, title="Titel")
+        has_text = bool(raw.strip())
+        assert text.has_text is has_text
+        assert text.dedupe == (normalize_for_dedupe(raw) if has_text else "")
+        assert text.link_only is (has_text and is_link_only(raw))
+        assert text.spam is (raw.strip().lower() == "test")
+        assert text.input_hash == input_hash(llm_input("Titel", raw if has_text else None))
@@ -0,0 +1,36 @@
+from decimal import Decimal
+
+import pytest
+
+from erp.ingestion.upsert import _numeric, _raw_values, upsert_events, write_raw
+from erp.models import RawEvent
+
+
+def test_copy_numeric_matches_float8_cast() -> None:
+    assert _numeric(None) is None
+    assert _numeric(50.123456789) == Decimal("50.123456789")
+    assert _numeric(0.1 + 0.2) == Decimal("0.3")
+    assert _numeric(6.95) == Decimal("6.95")
+
+
+def test_raw_values_are_typed_for_binary_copy() -> None:
+    payload = {"service_request_id": "1-2026", "lat": 50.5, "long": 6.5, "status": "Open"}
+    event = RawEvent.model_validate({**payload, "payload": payload})
+
+    insert_row = _raw_values(7, event)
+    copy_row = _raw_values(7, event, binary=True)
+
+    assert insert_row[:6] == copy_row[:6] == [7, "1-2026", None, None, None, "open"]
+    assert (insert_row[6], insert_row[7]) == (50.5, 6.5)
+    assert (copy_row[6], copy_row[7]) == (Decimal("50.5"), Decimal("6.5"))
+    assert copy_row[11].obj == payload
+
+
+def test_write_raw_rejects_unknown_bulk_load() -> None:
+    with pytest.raises(ValueError):
+        write_raw(1, [], bulk_load="csv")
+
+
+def test_upsert_events_rejects_unknown_mode() -> None:
+    with pytest.raises(ValueError):
+        upsert_events(1, [], mode="replace")